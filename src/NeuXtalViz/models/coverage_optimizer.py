@@ -0,0 +1,890 @@
+import collections
+import multiprocessing
+import time
+
+import numpy as np
+
+from NeuXtalViz.models.goniometer import compose_rotations
+
+
+class CoverageEvaluator:
+    """
+    Asymmetric unit reflections observed at goniometer settings.
+
+    Parameters
+    ----------
+    predictor : ReflectionPredictor
+        Reflection predictor of the orientation matrix.
+    footprint : DetectorFootprint
+        Detector ray classifier.
+    statistics : ReflectionStatistics
+        Statistics engine defining the asymmetric unit keys.
+    axes : 2d array
+        Rotation axis unit vectors.
+    polarities : 1d array
+        Sense of rotation of each axis.
+    wavelength : 2-element list
+        Wavelength band.
+
+    """
+
+    def __init__(
+        self, predictor, footprint, statistics, axes, polarities, wavelength
+    ):
+        self.predictor = predictor
+        self.footprint = footprint
+        self.statistics = statistics
+
+        self.axes = np.asarray(axes, dtype=float)
+        self.polarities = np.asarray(polarities, dtype=float)
+
+        self.wavelength = wavelength
+
+    def keys(self, settings):
+        """
+        Key indices observed at each setting.
+
+        Parameters
+        ----------
+        settings : 2d array
+            Angle of each axis for each setting in degrees.
+
+        Returns
+        -------
+        keys : list of 1d arrays of int
+            Sorted unique key indices of each setting.
+
+        """
+
+        settings = np.asarray(settings, dtype=float)
+
+        if len(settings) == 0:
+            return []
+
+        n = settings.shape[1]
+
+        Rs = compose_rotations(self.axes[:n], self.polarities[:n], settings)
+
+        keys = []
+
+        for R in Rs:
+            peaks = self.predictor.predict(R, self.wavelength, self.footprint)
+
+            hkls = np.column_stack([peaks[col] for col in ["h", "k", "l"]])
+
+            ind = self.statistics.key_indices(hkls)
+
+            keys.append(np.unique(ind[ind >= 0]))
+
+        return keys
+
+
+class GeneCache:
+    """
+    Least recently used cache of the key sets of goniometer settings.
+
+    Entries are keyed by the rounded angles of all axes and evicted
+    oldest first once their total size exceeds the memory budget. The
+    cache is bound to the context of the prediction (instrument,
+    orientation matrix, wavelength band, symmetry, spacing limits) and
+    emptied whenever that context changes.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        Memory budget of the stored key sets. Default is 64 MiB.
+    decimals : int, optional
+        Angle rounding in decimal places of a degree. Default is 2.
+
+    """
+
+    def __init__(self, max_bytes=64 * 1024**2, decimals=2):
+        self.max_bytes = max_bytes
+        self.decimals = decimals
+
+        self.context = None
+
+        self.keys = collections.OrderedDict()
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _key(self, setting):
+        return tuple(np.round(setting, self.decimals).tolist())
+
+    def bind(self, context):
+        """
+        Use the cache for a prediction context, emptying it if the
+        context changed.
+
+        """
+
+        if context != self.context:
+            self.clear()
+            self.context = context
+
+    def clear(self):
+        self.keys.clear()
+        self.nbytes = 0
+
+    def get(self, setting):
+        """
+        Cached key set of a setting or ``None``.
+
+        """
+
+        key = self._key(setting)
+
+        keys = self.keys.get(key)
+
+        if keys is not None:
+            self.keys.move_to_end(key)
+
+        return keys
+
+    def put(self, setting, keys):
+        """
+        Store the key set of a setting.
+
+        """
+
+        key = self._key(setting)
+
+        if key in self.keys:
+            self.nbytes -= self.keys.pop(key).nbytes
+
+        while self.keys and self.nbytes + keys.nbytes > self.max_bytes:
+            _, old = self.keys.popitem(last=False)
+            self.nbytes -= old.nbytes
+
+        self.keys[key] = keys
+        self.nbytes += keys.nbytes
+
+
+_evaluator = None
+
+
+def _initialize(evaluator):
+    global _evaluator
+    _evaluator = evaluator
+
+
+def _evaluate(settings):
+    return _evaluator.keys(settings)
+
+
+class CoverageOptimizer:
+    """
+    Base of goniometer setting optimizers for reflection coverage.
+
+    A gene is a vector of the free goniometer angles. The asymmetric unit
+    keys observed by each gene are looked up in the gene cache or
+    predicted in batches, across a process pool if requested. Every
+    improvement of the best completeness is recorded with its elapsed
+    time and number of predictions, from which the time to reach a
+    target completeness follows.
+
+    Parameters
+    ----------
+    evaluator : CoverageEvaluator
+        Key set predictor of goniometer settings.
+    limits : list of 2-element lists
+        Lower and upper limit of each axis in degrees.
+    observed : 1d array of int, optional
+        Key indices already observed by the fixed orientations.
+    n_proc : int, optional
+        Number of worker processes. Default is 1, evaluating in process.
+    cache : GeneCache, optional
+        Key sets of previously predicted settings, shared across
+        optimizations of the same context. Default is a private cache.
+    seed : int, optional
+        Seed of the random number generator of the optimizer.
+
+    """
+
+    def __init__(
+        self,
+        evaluator,
+        limits,
+        observed=None,
+        n_proc=1,
+        cache=None,
+        seed=None,
+    ):
+        self.evaluator = evaluator
+
+        limits = np.asarray(limits, dtype=float)
+
+        self.free = ~np.isclose(limits[:, 0], limits[:, 1])
+
+        self.limits = limits
+
+        self.lower = limits[self.free, 0]
+        self.upper = limits[self.free, 1]
+
+        self.n_keys = len(evaluator.statistics.keys)
+
+        self.observed = np.zeros(self.n_keys, dtype=bool)
+
+        if observed is not None:
+            self.observed[observed] = True
+
+        self.n_proc = n_proc
+
+        self.pool = None
+
+        self.cache = GeneCache() if cache is None else cache
+
+        self.rng = np.random.default_rng(seed)
+
+        self.trace = []
+        self.evaluations = 0
+        self.start = time.perf_counter()
+
+    def settings(self, genes):
+        """
+        Full goniometer settings of free angle genes.
+
+        Parameters
+        ----------
+        genes : 2d array
+            Free angles of each gene.
+
+        Returns
+        -------
+        settings : 2d array
+            Angle of each axis for each gene.
+
+        """
+
+        genes = np.asarray(genes, dtype=float).reshape(-1, self.free.sum())
+
+        settings = np.tile(self.limits[:, 0], (len(genes), 1))
+        settings[:, self.free] = genes
+
+        return settings
+
+    def generation(self, n):
+        """
+        Random genes within the goniometer limits.
+
+        Angles are rounded to the resolution of the gene cache.
+
+        """
+
+        delta = self.upper - self.lower
+
+        genes = self.lower + delta * self.rng.random((n, len(delta)))
+
+        return np.round(genes, self.cache.decimals)
+
+    def evaluate(self, genes):
+        """
+        Observed key indices of each gene.
+
+        Parameters
+        ----------
+        genes : 2d array
+            Free angles of each gene.
+
+        Returns
+        -------
+        keys : list of 1d arrays of int
+            Key indices observed by each gene.
+
+        """
+
+        settings = self.settings(genes)
+
+        keys = [self.cache.get(setting) for setting in settings]
+
+        missing = [i for i, gene_keys in enumerate(keys) if gene_keys is None]
+
+        if len(missing) == 0:
+            return keys
+
+        settings = settings[missing]
+
+        if self.n_proc > 1 and len(settings) > 1:
+            if self.pool is None:
+                context = multiprocessing.get_context("spawn")
+                self.pool = context.Pool(
+                    self.n_proc,
+                    initializer=_initialize,
+                    initargs=(self.evaluator,),
+                )
+
+            n = min(len(settings), self.n_proc * 4)
+
+            batches = self.pool.map(_evaluate, np.array_split(settings, n))
+
+            evaluated = [gene_keys for batch in batches for gene_keys in batch]
+
+        else:
+            evaluated = self.evaluator.keys(settings)
+
+        self.evaluations += len(settings)
+
+        for i, setting, gene_keys in zip(missing, settings, evaluated):
+            self.cache.put(setting, gene_keys)
+            keys[i] = gene_keys
+
+        return keys
+
+    def fitness(self, keys):
+        """
+        Completeness of each individual in percent.
+
+        Parameters
+        ----------
+        keys : list of lists of 1d arrays of int
+            Key indices observed by each gene of each individual.
+
+        Returns
+        -------
+        fit : 1d array
+            Completeness of each individual.
+
+        """
+
+        fit = []
+
+        for individual in keys:
+            observed = self.observed.copy()
+            observed[np.concatenate([[], *individual]).astype(int)] = True
+            fit.append(100 * observed.sum() / max(self.n_keys, 1))
+
+        return np.array(fit)
+
+    @property
+    def elapsed(self):
+        """
+        Seconds since the optimizer was created.
+
+        """
+
+        return time.perf_counter() - self.start
+
+    def record(self, completeness):
+        """
+        Record the best completeness reached so far.
+
+        Parameters
+        ----------
+        completeness : float
+            Completeness of the current best solution in percent.
+
+        """
+
+        if len(self.trace) == 0 or completeness > self.trace[-1][1]:
+            self.trace.append((self.elapsed, completeness, self.evaluations))
+
+    def time_to_target(self, target):
+        """
+        Time and predictions needed to reach a target completeness.
+
+        Parameters
+        ----------
+        target : float
+            Completeness in percent.
+
+        Returns
+        -------
+        elapsed : float
+            Seconds since the optimizer was created or ``None`` if the
+            target was not reached.
+        evaluations : int
+            Number of predicted settings or ``None``.
+
+        """
+
+        for elapsed, completeness, evaluations in self.trace:
+            if completeness >= target:
+                return elapsed, evaluations
+
+        return None, None
+
+    def close(self):
+        """
+        Shut down the worker processes.
+
+        """
+
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def steps(self, n_orient, **options):
+        """
+        Optimization steps of the strategy.
+
+        Parameters
+        ----------
+        n_orient : int
+            Number of orientations to optimize.
+
+        Yields
+        ------
+        values : list of lists
+            Free angles of each orientation of the best solution so far.
+        completeness : float
+            Completeness of the best solution so far in percent.
+
+        """
+
+        raise NotImplementedError
+
+    def n_steps(self, n_orient, **options):
+        """
+        Number of optimization steps the strategy yields when it runs to
+        the end.
+
+        Parameters
+        ----------
+        n_orient : int
+            Number of orientations to optimize.
+
+        Returns
+        -------
+        n : int
+            Number of steps, including the initial solution.
+
+        """
+
+        raise NotImplementedError
+
+    def iterate(
+        self,
+        n_orient,
+        max_time=None,
+        patience=None,
+        tolerance=0.01,
+        cancel=None,
+        **options,
+    ):
+        """
+        Stream the best solution after each optimization step.
+
+        The optimization ends when the strategy is exhausted, the time
+        budget is spent, the completeness has not improved by more than
+        the tolerance for a number of steps or it is cancelled.
+
+        Parameters
+        ----------
+        n_orient : int
+            Number of orientations to optimize.
+        max_time : float, optional
+            Time budget in seconds. Default is unlimited.
+        patience : int, optional
+            Number of steps without improvement before stopping. Default
+            is unlimited.
+        tolerance : float, optional
+            Smallest completeness improvement in percent. Default is 0.01.
+        cancel : callable, optional
+            Returns ``True`` when the optimization should stop.
+        **options
+            Parameters of the strategy.
+
+        Yields
+        ------
+        values : list of lists
+            Free angles of each orientation of the best solution so far.
+        completeness : float
+            Completeness of the best solution so far in percent.
+
+        """
+
+        steps = self.steps(n_orient, **options)
+
+        best, stale = None, 0
+
+        try:
+            for values, completeness in steps:
+                self.record(completeness)
+
+                yield values, completeness
+
+                if best is None or completeness > best + tolerance:
+                    best, stale = completeness, 0
+                else:
+                    stale += 1
+
+                if cancel is not None and cancel():
+                    break
+                elif max_time is not None and self.elapsed > max_time:
+                    break
+                elif patience is not None and stale >= patience:
+                    break
+
+        finally:
+            steps.close()
+            self.close()
+
+    def optimize(self, n_orient, **options):
+        """
+        Optimize the coverage of a number of additional orientations.
+
+        Parameters
+        ----------
+        n_orient : int
+            Number of orientations to optimize.
+        **options
+            Stopping criteria of ``iterate`` and parameters of the
+            strategy.
+
+        Returns
+        -------
+        values : list of lists
+            Free angles of each orientation.
+
+        """
+
+        values = None
+
+        for values, _ in self.iterate(n_orient, **options):
+            pass
+
+        return values
+
+
+class GeneticOptimizer(CoverageOptimizer):
+    """
+    Genetic optimization of goniometer settings.
+
+    Individuals are sets of genes. The key sets of the genes are carried
+    along through crossover, so the fitness of an individual is the
+    completeness of the union of its genes' keys with those of the fixed
+    orientations and only mutated genes are predicted again.
+
+    """
+
+    def initialization(self, n_orient, n_indiv):
+        genes = self.generation(n_indiv * n_orient)
+
+        keys = self.evaluate(genes)
+
+        genes = genes.reshape(n_indiv, n_orient, -1)
+        keys = [
+            keys[j * n_orient : (j + 1) * n_orient] for j in range(n_indiv)
+        ]
+
+        return genes, keys
+
+    def crossover(self, genes, keys, n_elite, best, selection):
+        n_orient = genes.shape[1]
+
+        children, children_keys = [], []
+
+        for elite in best:
+            children.append(genes[elite].copy())
+            children_keys.append(list(keys[elite]))
+
+        for parents in selection:
+            k = self.rng.integers(1, max(n_orient, 2))
+
+            p, q = parents
+
+            children.append(np.concatenate([genes[p][:k], genes[q][k:]]))
+            children.append(np.concatenate([genes[q][:k], genes[p][k:]]))
+
+            children_keys.append(keys[p][:k] + keys[q][k:])
+            children_keys.append(keys[q][:k] + keys[p][k:])
+
+        n_indiv = len(genes)
+
+        return np.array(children[:n_indiv]), children_keys[:n_indiv]
+
+    def mutation(self, genes, keys, mutation_rate):
+        mutate = self.rng.random(genes.shape[:2]) < mutation_rate
+
+        indiv, orient = np.nonzero(mutate)
+
+        genes[indiv, orient] = self.generation(len(indiv))
+
+        mutated = self.evaluate(genes[indiv, orient])
+
+        for j, i, gene_keys in zip(indiv, orient, mutated):
+            keys[j][i] = gene_keys
+
+        return genes, keys
+
+    def steps(
+        self, n_orient, n_indiv=100, n_gener=50, n_elite=2, mutation_rate=0.15
+    ):
+        """
+        Generations of the genetic algorithm.
+
+        Parameters
+        ----------
+        n_orient : int
+            Number of orientations to optimize.
+        n_indiv : int, optional
+            Number of individuals of the population. Default is 100.
+        n_gener : int, optional
+            Number of generations. Default is 50.
+        n_elite : int, optional
+            Number of best individuals kept in each generation. Default
+            is 2.
+        mutation_rate : float, optional
+            Probability of regenerating each gene. Default is 0.15.
+
+        Yields
+        ------
+        values : list of lists
+            Free angles of each orientation of the best individual so far.
+        completeness : float
+            Fitness of the best individual so far.
+
+        """
+
+        genes, keys = self.initialization(n_orient, n_indiv)
+
+        fit = self.fitness(keys)
+
+        j = np.argmax(fit)
+
+        best, values = fit[j], genes[j].tolist()
+
+        yield values, best
+
+        for _ in range(n_gener):
+            ranking = np.argsort(fit)
+
+            elite = ranking[-n_elite:]
+
+            fraction = (fit + 1e-6) / np.sum(fit + 1e-6)
+
+            selection = []
+
+            while len(selection) < (n_indiv - n_elite + 1) // 2:
+                selection.append(
+                    self.rng.choice(
+                        np.arange(n_indiv),
+                        size=2,
+                        p=fraction,
+                        replace=False,
+                    )
+                )
+
+            genes, keys = self.crossover(
+                genes, keys, n_elite, elite, selection
+            )
+
+            genes, keys = self.mutation(genes, keys, mutation_rate)
+
+            fit = self.fitness(keys)
+
+            j = np.argmax(fit)
+
+            if fit[j] > best:
+                best, values = fit[j], genes[j].tolist()
+
+            yield values, best
+
+    def n_steps(
+        self, n_orient, n_indiv=100, n_gener=50, n_elite=2, mutation_rate=0.15
+    ):
+        return n_gener + 1
+
+
+class GreedyOptimizer(CoverageOptimizer):
+    """
+    Greedy maximum coverage over a grid of candidate settings.
+
+    All settings of the goniometer scan grid are predicted once. The
+    candidate adding the most unobserved keys is then selected one
+    orientation at a time, with the gains of all candidates updated by a
+    single weighted bin count per selection.
+
+    """
+
+    def candidates(self, step):
+        """
+        Free angles of the candidate grid.
+
+        Parameters
+        ----------
+        step : float
+            Angular step in degrees along each free axis.
+
+        Returns
+        -------
+        genes : 2d array
+            Free angles of each candidate.
+
+        """
+
+        grid = np.meshgrid(
+            *[
+                np.arange(lower, upper + step, step)
+                for lower, upper in zip(self.lower, self.upper)
+            ],
+            indexing="ij",
+        )
+
+        genes = np.column_stack([angles.ravel() for angles in grid])
+        genes = np.clip(genes, self.lower, self.upper)
+
+        return np.round(genes, self.cache.decimals)
+
+    def steps(self, n_orient, step=5):
+        """
+        Selections of the greedy maximum coverage.
+
+        Parameters
+        ----------
+        n_orient : int
+            Number of orientations to optimize.
+        step : float, optional
+            Angular step of the candidate grid in degrees. Default is 5.
+
+        Yields
+        ------
+        values : list of lists
+            Free angles of each orientation selected so far.
+        completeness : float
+            Completeness of the selected orientations in percent.
+
+        """
+
+        genes = self.candidates(step)
+
+        keys = self.evaluate(genes)
+
+        self.close()
+
+        owner = np.repeat(np.arange(len(keys)), [len(ind) for ind in keys])
+
+        flat = np.concatenate([[], *keys]).astype(int)
+
+        observed = self.observed.copy()
+
+        values = []
+
+        for _ in range(n_orient):
+            gain = np.bincount(
+                owner, weights=~observed[flat], minlength=len(keys)
+            )
+
+            j = np.argmax(gain)
+
+            observed[keys[j]] = True
+
+            values.append(genes[j].tolist())
+
+            yield list(values), 100 * observed.sum() / max(self.n_keys, 1)
+
+    def n_steps(self, n_orient, step=5):
+        return n_orient
+
+
+class AnnealingOptimizer(CoverageOptimizer):
+    """
+    Simulated annealing of goniometer settings on continuous angles.
+
+    Each step moves the angles of one orientation by a random offset.
+    Observation counts per key are kept so that the change of
+    completeness follows from the key sets of the old and new setting
+    only. Worse moves are accepted with a probability decreasing with
+    the temperature.
+
+    """
+
+    def steps(self, n_orient, n_iter=2000, step=10, temperature=1):
+        """
+        Sweeps of simulated annealing moves.
+
+        Each sweep makes one move per orientation.
+
+        Parameters
+        ----------
+        n_orient : int
+            Number of orientations to optimize.
+        n_iter : int, optional
+            Number of moves. Default is 2000.
+        step : float, optional
+            Initial standard deviation of the moves in degrees. Default
+            is 10.
+        temperature : float, optional
+            Initial temperature in percent completeness. Default is 1.
+
+        Yields
+        ------
+        values : list of lists
+            Free angles of each orientation of the best solution so far.
+        completeness : float
+            Completeness of the best solution so far in percent.
+
+        """
+
+        genes = self.generation(n_orient)
+
+        keys = self.evaluate(genes)
+
+        counts = np.zeros(self.n_keys, dtype=int)
+
+        for ind in keys:
+            counts[ind] += 1
+
+        scale = 100 / max(self.n_keys, 1)
+
+        current = np.sum(self.observed | (counts > 0)) * scale
+
+        best, values = current, genes.tolist()
+
+        yield values, best
+
+        cooling = 0.01 ** (1 / max(n_iter, 1))
+
+        for move in range(n_iter):
+            i = self.rng.integers(n_orient)
+
+            gene = genes[i] + self.rng.normal(0, step, len(self.lower))
+            gene = np.clip(gene, self.lower, self.upper)
+            gene = np.round(gene, self.cache.decimals)
+
+            new = self.evaluate(gene[np.newaxis])[0]
+            old = keys[i]
+
+            counts[old] -= 1
+
+            lost = np.sum((counts[old] == 0) & ~self.observed[old])
+            gained = np.sum((counts[new] == 0) & ~self.observed[new])
+
+            delta = (gained - lost) * scale
+
+            accept = delta >= 0
+
+            if not accept:
+                accept = self.rng.random() < np.exp(delta / temperature)
+
+            if accept:
+                counts[new] += 1
+
+                genes[i], keys[i] = gene, new
+
+                current += delta
+
+                if current > best:
+                    best, values = current, genes.tolist()
+
+            else:
+                counts[old] += 1
+
+            temperature *= cooling
+            step = max(step * cooling, 10.0**-self.cache.decimals)
+
+            if (move + 1) % n_orient == 0 or move + 1 == n_iter:
+                yield values, best
+
+    def n_steps(self, n_orient, n_iter=2000, step=10, temperature=1):
+        return 1 + -(-n_iter // n_orient)
+
+
+optimizers = {
+    "genetic": GeneticOptimizer,
+    "greedy": GreedyOptimizer,
+    "annealing": AnnealingOptimizer,
+}
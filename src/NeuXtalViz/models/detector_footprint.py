@@ -0,0 +1,469 @@
+import numpy as np
+
+from scipy import ndimage
+from scipy.spatial import cKDTree
+
+
+def scattering_directions(gamma, nu):
+    """
+    Unit vectors of scattering angles in the laboratory frame.
+
+    Parameters
+    ----------
+    gamma : array-like
+        In-plane scattering angle in degrees.
+    nu : array-like
+        Out-of-plane scattering angle in degrees.
+
+    Returns
+    -------
+    directions : 2d array
+        Unit vectors of each angle pair.
+
+    """
+
+    gamma = np.deg2rad(gamma)
+    nu = np.deg2rad(nu)
+
+    return np.column_stack(
+        [
+            np.cos(nu) * np.sin(gamma),
+            np.sin(nu),
+            np.cos(nu) * np.cos(gamma),
+        ]
+    )
+
+
+def pixel_pitches(directions, tree, k=16):
+    """
+    Local pixel and tube pitch of each detector pixel.
+
+    The nearest neighbour of a pixel gives the pixel pitch and the
+    direction along its tube. The tube pitch is the distance across the
+    tube to the nearest neighbour lying more across than along it. Pixels
+    without such a neighbour among the ``k`` nearest are queried again
+    with more neighbours, so long tubes of fine pixels are resolved.
+
+    Parameters
+    ----------
+    directions : 2d array
+        Unit vector of each pixel.
+    tree : cKDTree
+        Tree of the pixel directions.
+    k : int, optional
+        Initial number of neighbours queried. Default is 16.
+
+    Returns
+    -------
+    along, across : 2d arrays
+        Unit vectors along and across the tube of each pixel.
+    pitch_along, pitch_across : 1d arrays
+        Pixel and tube pitch of each pixel.
+
+    """
+
+    n = len(directions)
+
+    along = np.zeros((n, 3))
+    across = np.zeros((n, 3))
+    pitch_along = np.full(n, np.inf)
+    pitch_across = np.full(n, np.inf)
+
+    if n < 2:
+        return along, across, pitch_along, pitch_across
+
+    todo = np.arange(n)
+
+    k = min(k, n)
+
+    while len(todo) > 0:
+        chunk_size = max(1, 2**22 // k)
+
+        for start in range(0, len(todo), chunk_size):
+            rows = todo[start : start + chunk_size]
+
+            normal = directions[rows]
+
+            dist, ind = tree.query(normal, k=k)
+
+            offsets = directions[ind[:, 1:]] - normal[:, np.newaxis]
+
+            u = offsets[:, 0]
+            u = u - np.sum(u * normal, axis=1)[:, np.newaxis] * normal
+            u /= np.linalg.norm(u, axis=1)[:, np.newaxis]
+
+            w = np.cross(normal, u)
+
+            d_u = np.abs(np.einsum("ikj,ij->ik", offsets, u))
+            d_w = np.abs(np.einsum("ikj,ij->ik", offsets, w))
+
+            along[rows] = u
+            across[rows] = w
+            pitch_along[rows] = dist[:, 1]
+            pitch_across[rows] = np.where(d_w > d_u, d_w, np.inf).min(axis=1)
+
+        todo = todo[~np.isfinite(pitch_across[todo])]
+
+        if k == n:
+            pitch_across[todo] = pitch_along[todo]
+            break
+
+        k = min(4 * k, n)
+
+    return along, across, pitch_along, pitch_across
+
+
+class DetectorFootprint:
+    """
+    Angular footprint of detector pixels for batched ray classification.
+
+    Pixel directions are indexed in a KD-tree. A scattered ray hits the
+    detector if its offset from the nearest pixel lies within a rectangle
+    spanned by that pixel's pitch along its tube and the tube pitch
+    across it, so rays into gaps, masked pixels and uncovered solid angle
+    miss even where tubes are much coarser than their pixels.
+
+    Parameters
+    ----------
+    gamma : 1d array
+        In-plane scattering angle of each pixel in degrees.
+    nu : 1d array
+        Out-of-plane scattering angle of each pixel in degrees.
+    det_ID : 1d array
+        Detector ID of each pixel.
+    scale : float, optional
+        Acceptance half-width relative to the pixel and tube pitch.
+        Default is 0.55, slightly more than half so that neighbouring
+        acceptance regions overlap.
+
+    """
+
+    def __init__(self, gamma, nu, det_ID, scale=0.55):
+        self.det_ID = np.asarray(det_ID)
+
+        self.directions = scattering_directions(gamma, nu)
+
+        self.tree = cKDTree(self.directions)
+
+        self.along, self.across, pitch_along, pitch_across = pixel_pitches(
+            self.directions, self.tree
+        )
+
+        self.scale = scale
+
+        self.half_along = scale * pitch_along
+        self.half_across = scale * pitch_across
+
+        # chord length bound of accepted rays, with slack for curvature
+        self.reach = 1.01 * np.max(
+            np.hypot(self.half_along, self.half_across), initial=0
+        )
+
+    def pixels(self, kf):
+        """
+        Pixel index hit by each scattered wavevector.
+
+        Parameters
+        ----------
+        kf : 2d array
+            Scattered wavevectors in the laboratory frame.
+
+        Returns
+        -------
+        ind : 1d array of int
+            Pixel index of each ray or -1 where nothing is hit.
+
+        """
+
+        kf = np.asarray(kf, dtype=float).reshape(-1, 3)
+
+        pixels = np.full(len(kf), -1, dtype=int)
+
+        if len(kf) == 0 or len(self.det_ID) == 0:
+            return pixels
+
+        norm = np.linalg.norm(kf, axis=1)
+        valid = norm > 0
+
+        rays = kf[valid] / norm[valid, None]
+
+        _, ind = self.tree.query(rays, distance_upper_bound=self.reach)
+
+        near = np.flatnonzero(ind < len(self.det_ID))
+
+        rays, ind = rays[near], ind[near]
+
+        offset = rays - self.directions[ind]
+
+        d_u = np.abs(np.sum(offset * self.along[ind], axis=1))
+        d_w = np.abs(np.sum(offset * self.across[ind], axis=1))
+
+        hit = (d_u <= self.half_along[ind]) & (d_w <= self.half_across[ind])
+
+        pixels[np.flatnonzero(valid)[near[hit]]] = ind[hit]
+
+        return pixels
+
+    def detector_ids(self, kf):
+        """
+        Detector hit by each scattered wavevector.
+
+        Parameters
+        ----------
+        kf : 2d array
+            Scattered wavevectors in the laboratory frame.
+
+        Returns
+        -------
+        ids : 1d array of int
+            Detector ID of each ray or -1 where nothing is hit.
+
+        """
+
+        pixels = self.pixels(kf)
+
+        ids = np.full(len(pixels), -1, dtype=int)
+
+        hit = pixels >= 0
+        ids[hit] = self.det_ID[pixels[hit]]
+
+        return ids
+
+    def hit(self, kf):
+        """
+        Whether each scattered wavevector hits a detector.
+
+        Parameters
+        ----------
+        kf : 2d array
+            Scattered wavevectors in the laboratory frame.
+
+        Returns
+        -------
+        hit : 1d array of bool
+            Detector hit mask.
+
+        """
+
+        return self.pixels(kf) >= 0
+
+    def boundary(self):
+        """
+        Pixels bordering a region that misses the detector.
+
+        A pixel is on the boundary if a ray towards any of its eight
+        neighbour positions, one pitch along or across its tube, misses.
+        This finds detector edges, gaps and masked pixels alike.
+
+        Returns
+        -------
+        boundary : 1d array of bool
+            Whether each pixel is on the boundary.
+
+        """
+
+        boundary = np.zeros(len(self.det_ID), dtype=bool)
+
+        finite = np.flatnonzero(
+            np.isfinite(self.half_along) & np.isfinite(self.half_across)
+        )
+
+        step_u = (
+            self.along[finite]
+            * (self.half_along[finite] / self.scale)[:, np.newaxis]
+        )
+        step_w = (
+            self.across[finite]
+            * (self.half_across[finite] / self.scale)[:, np.newaxis]
+        )
+
+        for i in [-1, 0, 1]:
+            for j in [-1, 0, 1]:
+                if i != 0 or j != 0:
+                    probe = self.directions[finite] + i * step_u + j * step_w
+                    boundary[finite] |= ~self.hit(probe)
+
+        return boundary
+
+
+def scattering_angles(kf):
+    """
+    Scattering angles of wavevectors in the laboratory frame.
+
+    Parameters
+    ----------
+    kf : 2d array
+        Scattered wavevectors.
+
+    Returns
+    -------
+    gamma : 1d array
+        In-plane scattering angle in degrees.
+    nu : 1d array
+        Out-of-plane scattering angle in degrees.
+
+    """
+
+    kf = np.asarray(kf, dtype=float).reshape(-1, 3)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = np.linalg.norm(kf, axis=1)
+
+        gamma = np.rad2deg(np.arctan2(kf[:, 0], kf[:, 2]))
+        nu = np.rad2deg(np.arcsin(kf[:, 1] / k))
+
+    return gamma, nu
+
+
+class FootprintRaster:
+    """
+    Rasterized detector footprint for constant-time ray classification.
+
+    The footprint is classified once at the centres of a grid of
+    scattering angles. Cells within reach of a boundary pixel of the
+    footprint, or next to a cell of the other class, are edge cells.
+    Rays falling into the remaining cells, which are entirely hit or
+    entirely missed, are classified by a table lookup and only rays in
+    edge cells are passed on to the KD-tree. Gaps and masked pixels
+    narrower than a cell are therefore kept.
+
+    Parameters
+    ----------
+    footprint : DetectorFootprint
+        Detector ray classifier.
+    resolution : float, optional
+        Cell size in degrees. Default is 0.25.
+
+    """
+
+    def __init__(self, footprint, resolution=0.25):
+        self.footprint = footprint
+        self.resolution = resolution
+
+        gamma, nu = scattering_angles(footprint.tree.data)
+
+        margin = resolution + np.rad2deg(min(footprint.reach, np.pi))
+
+        self.nu_min = max(np.min(nu, initial=0) - margin, -90)
+        nu_max = min(np.max(nu, initial=0) + margin, 90)
+
+        n_gamma = int(np.ceil(360 / resolution))
+        n_nu = max(int(np.ceil((nu_max - self.nu_min) / resolution)), 1)
+
+        gamma_centres = -180 + (np.arange(n_gamma) + 0.5) * resolution
+        nu_centres = self.nu_min + (np.arange(n_nu) + 0.5) * resolution
+
+        g, n = np.meshgrid(gamma_centres, nu_centres, indexing="ij")
+
+        hit = footprint.hit(scattering_directions(g.ravel(), n.ravel()))
+        hit = hit.reshape(n_gamma, n_nu)
+
+        modes = ["wrap", "nearest"]
+
+        upper = ndimage.maximum_filter(hit, size=3, mode=modes)
+        lower = ndimage.minimum_filter(hit, size=3, mode=modes)
+
+        edge = upper != lower
+
+        edge |= self.cells_near(footprint, footprint.boundary(), n_nu)
+
+        self.state = np.where(edge, -1, hit).astype(np.int8)
+
+    def cells_near(self, footprint, pixels, n_nu):
+        """
+        Cells overlapping the acceptance region of pixels.
+
+        The angular box around each pixel is added to a summed-area
+        table, so the cost does not depend on the box sizes.
+
+        Parameters
+        ----------
+        footprint : DetectorFootprint
+            Detector ray classifier.
+        pixels : 1d array of bool
+            Pixels to mark.
+        n_nu : int
+            Number of cells along the out-of-plane angle.
+
+        Returns
+        -------
+        near : 2d array of bool
+            Whether each cell overlaps the region of any pixel.
+
+        """
+
+        n_gamma = int(np.ceil(360 / self.resolution))
+
+        reach = np.hypot(footprint.half_along, footprint.half_across)
+
+        pixels = pixels & np.isfinite(reach)
+
+        gamma, nu = scattering_angles(footprint.directions[pixels])
+
+        extent = np.rad2deg(1.01 * reach[pixels]) + self.resolution
+
+        cos_nu = np.cos(np.deg2rad(np.minimum(np.abs(nu) + extent, 89.9)))
+
+        width = np.minimum(extent / cos_nu, 180)
+
+        i0 = np.floor((gamma - width + 180) / self.resolution).astype(int)
+        i1 = np.floor((gamma + width + 180) / self.resolution).astype(int)
+
+        j0 = np.floor((nu - extent - self.nu_min) / self.resolution)
+        j1 = np.floor((nu + extent - self.nu_min) / self.resolution)
+
+        j0 = np.clip(j0, 0, n_nu - 1).astype(int)
+        j1 = np.clip(j1, 0, n_nu - 1).astype(int)
+
+        table = np.zeros((3 * n_gamma + 1, n_nu + 1), dtype=int)
+
+        i0, i1 = i0 + n_gamma, i1 + n_gamma + 1
+
+        np.add.at(table, (i0, j0), 1)
+        np.add.at(table, (i1, j0), -1)
+        np.add.at(table, (i0, j1 + 1), -1)
+        np.add.at(table, (i1, j1 + 1), 1)
+
+        table = table.cumsum(axis=0).cumsum(axis=1)
+
+        near = table[: 3 * n_gamma, :n_nu] > 0
+
+        return near.reshape(3, n_gamma, n_nu).any(axis=0)
+
+    def hit(self, kf):
+        """
+        Whether each scattered wavevector hits a detector.
+
+        Parameters
+        ----------
+        kf : 2d array
+            Scattered wavevectors in the laboratory frame.
+
+        Returns
+        -------
+        hit : 1d array of bool
+            Detector hit mask.
+
+        """
+
+        kf = np.asarray(kf, dtype=float).reshape(-1, 3)
+
+        gamma, nu = scattering_angles(kf)
+
+        n_gamma, n_nu = self.state.shape
+
+        i = np.floor((gamma + 180) / self.resolution).astype(int) % n_gamma
+        j = np.floor((nu - self.nu_min) / self.resolution)
+
+        inside = (j >= 0) & (j < n_nu)
+
+        state = np.zeros(len(kf), dtype=np.int8)
+        state[inside] = self.state[i[inside], j[inside].astype(int)]
+
+        hit = state == 1
+
+        edge = state == -1
+
+        hit[edge] = self.footprint.hit(kf[edge])
+
+        return hit
@@ -0,0 +1,127 @@
+import os
+
+import numpy as np
+
+from NeuXtalViz.models.disk_cache import cache_directory, content_hash
+
+
+def group_labels(shape, grouping):
+    """
+    Group label of every pixel of rectangular banks.
+
+    Parameters
+    ----------
+    shape : 3-element tuple
+        Number of banks, columns and rows.
+    grouping : str
+        Columns by rows of pixels per group, e.g. ``4x4``.
+
+    Returns
+    -------
+    labels : 3d array
+        Integer group label ordered by bank, column group and row group.
+
+    """
+
+    c, r = [int(val) for val in grouping.split("x")]
+
+    n_banks, cols, rows = shape
+
+    n_cols = -(-cols // c)
+    n_rows = -(-rows // r)
+
+    i = np.arange(n_banks)[:, None, None]
+    j = (np.arange(cols) // c)[None, :, None]
+    k = (np.arange(rows) // r)[None, None, :]
+
+    return (i * n_cols + j) * n_rows + k
+
+
+def grouping_pattern(det_map, grouping, mask=None):
+    """
+    ``GroupDetectors`` pattern of grouped rectangular bank pixels.
+
+    Groups appear in bank, column and row order with the pixels of each
+    group in their original order.
+
+    Parameters
+    ----------
+    det_map : 3d array
+        Detector index map of banks, columns and rows.
+    grouping : str
+        Columns by rows of pixels per group, e.g. ``4x4``.
+    mask : 1d array, optional
+        Pixels to include in flattened order. Default is all pixels.
+
+    Returns
+    -------
+    pattern : str
+        Comma separated groups of plus separated detectors.
+
+    """
+
+    labels = group_labels(det_map.shape, grouping).ravel()
+    ids = np.asarray(det_map).ravel()
+
+    if mask is not None:
+        labels = labels[mask]
+        ids = ids[mask]
+
+    if len(ids) == 0:
+        return ""
+
+    sort = np.argsort(labels, kind="stable")
+
+    labels = labels[sort]
+    ids = ids[sort].astype(int).astype(str)
+
+    split = np.flatnonzero(np.diff(labels)) + 1
+
+    return ",".join("+".join(group) for group in np.split(ids, split))
+
+
+def cached_grouping_pattern(instrument, det_map, grouping, mask=None):
+    """
+    Grouping pattern reused from disk when previously computed.
+
+    Parameters
+    ----------
+    instrument : str
+        Instrument name.
+    det_map : 3d array
+        Detector index map of banks, columns and rows.
+    grouping : str
+        Columns by rows of pixels per group, e.g. ``4x4``.
+    mask : 1d array, optional
+        Pixels to include in flattened order. Default is all pixels.
+
+    Returns
+    -------
+    pattern : str
+        Comma separated groups of plus separated detectors.
+
+    """
+
+    det_map = np.asarray(det_map)
+
+    if mask is not None:
+        mask = np.asarray(mask, dtype=bool)
+
+    key = content_hash(instrument, grouping, det_map, mask)
+
+    filename = os.path.join(
+        cache_directory("grouping"), "{}_{}.txt".format(instrument, key)
+    )
+
+    if os.path.exists(filename):
+        with open(filename, "r") as f:
+            return f.read()
+
+    pattern = grouping_pattern(det_map, grouping, mask)
+
+    tmp = filename + ".{}.tmp".format(os.getpid())
+    with open(tmp, "w") as f:
+        f.write(pattern)
+    os.replace(tmp, filename)
+
+    return pattern
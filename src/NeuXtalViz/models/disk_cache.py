@@ -0,0 +1,292 @@
+import os
+import hashlib
+
+import numpy as np
+
+
+def cache_directory(name):
+    """
+    Directory of a persistent cache, created if needed.
+
+    The root is ``NEUXTALVIZ_CACHE`` if set, otherwise
+    ``~/.cache/NeuXtalViz``.
+
+    Parameters
+    ----------
+    name : str
+        Cache subdirectory.
+
+    Returns
+    -------
+    path : str
+        Cache directory.
+
+    """
+
+    root = os.environ.get("NEUXTALVIZ_CACHE")
+
+    if root is None:
+        root = os.path.join(os.path.expanduser("~"), ".cache", "NeuXtalViz")
+
+    path = os.path.join(root, name)
+
+    os.makedirs(path, exist_ok=True)
+
+    return path
+
+
+def content_hash(*items):
+    """
+    Stable hash of arrays, strings and numbers.
+
+    Parameters
+    ----------
+    items : array-like, str or number
+        Hashed content.
+
+    Returns
+    -------
+    key : str
+        Hexadecimal digest.
+
+    """
+
+    digest = hashlib.sha1()
+
+    for item in items:
+        if isinstance(item, np.ndarray):
+            digest.update(str(item.dtype).encode())
+            digest.update(str(item.shape).encode())
+            digest.update(np.ascontiguousarray(item).tobytes())
+        else:
+            digest.update(repr(item).encode())
+        digest.update(b"\0")
+
+    return digest.hexdigest()
+
+
+def file_hash(filename):
+    """
+    Hash of a file's contents, or an empty string if it does not exist.
+
+    Parameters
+    ----------
+    filename : str
+        Path to file.
+
+    Returns
+    -------
+    key : str
+        Hexadecimal digest.
+
+    """
+
+    if filename == "" or not os.path.exists(filename):
+        return ""
+
+    digest = hashlib.sha1()
+
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def cache_file(name, key, suffix=".npz"):
+    """
+    Path of a file belonging to a cache entry.
+
+    Parameters
+    ----------
+    name : str
+        Cache subdirectory.
+    key : str
+        Cache entry key.
+    suffix : str, optional
+        File suffix. Default is ``.npz``.
+
+    Returns
+    -------
+    filename : str
+        Path to file.
+
+    """
+
+    return os.path.join(cache_directory(name), key + suffix)
+
+
+def cache_entries(name):
+    """
+    Files of each entry in a persistent cache.
+
+    Entries are the files sharing a key before the first dot. Partially
+    written temporary files are ignored.
+
+    Parameters
+    ----------
+    name : str
+        Cache subdirectory.
+
+    Returns
+    -------
+    entries : dict
+        Paths of the files of each entry by key.
+
+    """
+
+    path = cache_directory(name)
+
+    entries = {}
+
+    for filename in os.listdir(path):
+        if filename.endswith(".tmp"):
+            continue
+        key = filename.split(".")[0]
+        entries.setdefault(key, []).append(os.path.join(path, filename))
+
+    return entries
+
+
+def touch_entry(name, key):
+    """
+    Mark a cache entry as recently used.
+
+    Parameters
+    ----------
+    name : str
+        Cache subdirectory.
+    key : str
+        Cache entry key.
+
+    """
+
+    for filename in cache_entries(name).get(key, []):
+        try:
+            os.utime(filename)
+        except OSError:
+            pass
+
+
+def remove_entry(name, key):
+    """
+    Remove every file of a cache entry.
+
+    Parameters
+    ----------
+    name : str
+        Cache subdirectory.
+    key : str
+        Cache entry key.
+
+    """
+
+    for filename in cache_entries(name).get(key, []):
+        try:
+            os.remove(filename)
+        except OSError:
+            pass
+
+
+def evict_entries(name, max_bytes, keep=()):
+    """
+    Remove least recently used entries until the cache fits its budget.
+
+    An entry's last use is the newest modification time of its files,
+    which loading refreshes.
+
+    Parameters
+    ----------
+    name : str
+        Cache subdirectory.
+    max_bytes : int
+        Size budget of the cache.
+    keep : list of str, optional
+        Keys never evicted.
+
+    """
+
+    usage = []
+
+    for key, filenames in cache_entries(name).items():
+        try:
+            stats = [os.stat(filename) for filename in filenames]
+        except OSError:
+            continue
+        last_use = max(stat.st_mtime for stat in stats)
+        size = sum(stat.st_size for stat in stats)
+        usage.append((last_use, key, size, filenames))
+
+    total = sum(size for _, _, size, _ in usage)
+
+    for _, key, size, filenames in sorted(usage):
+        if total <= max_bytes:
+            break
+        if key in keep:
+            continue
+        for filename in filenames:
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+        total -= size
+
+
+def load_arrays(name, key):
+    """
+    Arrays previously stored in a persistent cache.
+
+    Parameters
+    ----------
+    name : str
+        Cache subdirectory.
+    key : str
+        Cache entry key.
+
+    Returns
+    -------
+    arrays : dict or None
+        Stored arrays by name, or `None` if there is no usable entry.
+
+    """
+
+    filename = cache_file(name, key)
+
+    if not os.path.exists(filename):
+        return None
+
+    try:
+        with np.load(filename, allow_pickle=False) as data:
+            arrays = {item: data[item] for item in data.files}
+    except (OSError, ValueError, EOFError):
+        return None
+
+    touch_entry(name, key)
+
+    return arrays
+
+
+def save_arrays(name, key, **arrays):
+    """
+    Store arrays in a persistent cache.
+
+    The archive is written to a temporary file and moved into place so
+    that concurrent readers never see a partial entry.
+
+    Parameters
+    ----------
+    name : str
+        Cache subdirectory.
+    key : str
+        Cache entry key.
+    arrays : dict
+        Arrays stored by name.
+
+    """
+
+    filename = cache_file(name, key)
+
+    tmp = filename + ".{}.tmp".format(os.getpid())
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, filename)
@@ -0,0 +1,326 @@
+import csv
+
+import numpy as np
+
+from NeuXtalViz.models.peak_store import peak_dtype
+
+
+class ExperimentPlan:
+    """
+    Columnar table of planned goniometer settings.
+
+    Every column is a NumPy array so the plan is converted to and from
+    table workspaces, CSV and binary files a column at a time.
+
+    Parameters
+    ----------
+    pv : str
+        Title column name.
+    names : list of str
+        Free goniometer angle names.
+    titles : list of str
+        Scan title of each setting.
+    settings : 2d array
+        Free goniometer angles of each setting.
+    comments : list of str
+        Comment of each setting.
+    counts : list of str
+        Counting mode of each setting.
+    values : list of float
+        Counting value of each setting.
+    use : list of bool
+        Whether each setting is used.
+
+    """
+
+    def __init__(
+        self, pv, names, titles, settings, comments, counts, values, use
+    ):
+        self.pv = str(pv)
+        self.names = [str(name) for name in names]
+
+        n = len(use)
+
+        self.titles = np.array(titles, dtype=str).reshape(n)
+        self.settings = np.array(settings, dtype=float).reshape(
+            n, len(self.names)
+        )
+        self.comments = np.array(comments, dtype=str).reshape(n)
+        self.counts = np.array(counts, dtype=str).reshape(n)
+        self.values = np.array(values, dtype=float).reshape(n)
+        self.use = np.array(use, dtype=bool).reshape(n)
+
+    def __len__(self):
+        return len(self.use)
+
+    def table(self):
+        """
+        Plan rows as lists for the plan view.
+
+        Returns
+        -------
+        titles, settings, comments, counts, values, use : lists
+            Columns of the plan.
+
+        """
+
+        return (
+            self.titles.tolist(),
+            self.settings.tolist(),
+            self.comments.tolist(),
+            self.counts.tolist(),
+            self.values.tolist(),
+            self.use.tolist(),
+        )
+
+    def columns(self, active=False):
+        """
+        Named columns of the plan.
+
+        Parameters
+        ----------
+        active : bool, optional
+            Only keep used settings and drop the use column. Default is
+            `False`.
+
+        Returns
+        -------
+        columns : dict
+            Column arrays by header.
+
+        """
+
+        keep = self.use if active else np.ones(len(self), dtype=bool)
+
+        columns = {self.pv: self.titles[keep]}
+
+        for name, angles in zip(self.names, self.settings[keep].T):
+            columns[name] = np.round(angles, 2)
+
+        columns["Comment"] = self.comments[keep]
+        columns["Wait For"] = self.counts[keep]
+        columns["Value"] = self.values[keep]
+
+        if not active:
+            columns["Use"] = self.use
+
+        return columns
+
+    def to_workspace(self, table):
+        """
+        Fill an empty table workspace with the plan.
+
+        Parameters
+        ----------
+        table : ITableWorkspace
+            Empty table workspace.
+
+        """
+
+        types = ["str"] + ["float"] * len(self.names)
+        types += ["str", "str", "float", "bool"]
+
+        columns = self.columns()
+
+        for column_type, name in zip(types, columns.keys()):
+            table.addColumn(column_type, name)
+
+        for row in zip(*[column.tolist() for column in columns.values()]):
+            table.addRow(list(row))
+
+    @classmethod
+    def from_workspace(cls, table):
+        """
+        Plan stored in a table workspace.
+
+        Parameters
+        ----------
+        table : ITableWorkspace
+            Plan table with title, angle, comment, counting, value and
+            use columns.
+
+        Returns
+        -------
+        plan : ExperimentPlan
+            Columnar plan.
+
+        """
+
+        headers = table.getColumnNames()
+
+        columns = [table.column(col) for col in range(len(headers))]
+
+        n = table.rowCount()
+
+        settings = np.array(columns[1:-4], dtype=float).T.reshape(
+            n, len(headers) - 5
+        )
+
+        return cls(
+            headers[0], headers[1:-4], columns[0], settings, *columns[-4:]
+        )
+
+    def save_csv(self, filename):
+        """
+        Write the used settings to a CSV file.
+
+        Parameters
+        ----------
+        filename : str
+            Path to CSV file.
+
+        """
+
+        columns = self.columns(active=True)
+
+        with open(filename, mode="w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns.keys())
+            writer.writerows(
+                zip(*[column.tolist() for column in columns.values()])
+            )
+
+    @classmethod
+    def load_csv(cls, filename):
+        """
+        Plan written to a CSV file.
+
+        Parameters
+        ----------
+        filename : str
+            Path to CSV file.
+
+        Returns
+        -------
+        plan : ExperimentPlan
+            Columnar plan with every setting used.
+
+        """
+
+        with open(filename, newline="") as f:
+            reader = csv.reader(f)
+            headers = next(reader)
+            rows = list(reader)
+
+        columns = np.array(rows, dtype=str).reshape(len(rows), len(headers))
+
+        n = len(rows)
+
+        return cls(
+            headers[0],
+            headers[1:-3],
+            columns[:, 0],
+            columns[:, 1:-3].astype(float),
+            columns[:, -3],
+            columns[:, -2],
+            columns[:, -1].astype(float),
+            np.ones(n, dtype=bool),
+        )
+
+    def arrays(self):
+        """
+        Plan columns for a binary archive.
+
+        Returns
+        -------
+        arrays : dict
+            Plan arrays by name.
+
+        """
+
+        return {
+            "pv": np.array(self.pv),
+            "names": np.array(self.names, dtype=str),
+            "titles": self.titles,
+            "settings": self.settings,
+            "comments": self.comments,
+            "counts": self.counts,
+            "values": self.values,
+            "use": self.use,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Plan stored in a binary archive.
+
+        Parameters
+        ----------
+        arrays : dict
+            Plan arrays by name.
+
+        Returns
+        -------
+        plan : ExperimentPlan
+            Columnar plan.
+
+        """
+
+        return cls(
+            arrays["pv"].item(),
+            arrays["names"].tolist(),
+            arrays["titles"],
+            arrays["settings"],
+            arrays["comments"],
+            arrays["counts"],
+            arrays["values"],
+            arrays["use"],
+        )
+
+
+def save_plan_archive(filename, plan, peaks, **metadata):
+    """
+    Write a plan with its predicted reflections to a binary archive.
+
+    Parameters
+    ----------
+    filename : str
+        Path to archive.
+    plan : ExperimentPlan
+        Columnar plan.
+    peaks : structured array
+        Reflections of every setting with ``peak_dtype`` fields.
+    metadata : dict
+        Experiment arrays, strings and numbers stored by name.
+
+    """
+
+    arrays = {"meta_" + key: np.asarray(val) for key, val in metadata.items()}
+
+    with open(filename, "wb") as f:
+        np.savez_compressed(
+            f,
+            peaks=np.asarray(peaks, dtype=peak_dtype),
+            **plan.arrays(),
+            **arrays,
+        )
+
+
+def load_plan_archive(filename):
+    """
+    Plan and predicted reflections stored in a binary archive.
+
+    Parameters
+    ----------
+    filename : str
+        Path to archive.
+
+    Returns
+    -------
+    plan : ExperimentPlan
+        Columnar plan.
+    peaks : structured array
+        Reflections of every setting.
+    metadata : dict
+        Experiment arrays by name.
+
+    """
+
+    with np.load(filename, allow_pickle=False) as data:
+        arrays = {key: data[key] for key in data.files}
+
+    metadata = {
+        key[5:]: val for key, val in arrays.items() if key.startswith("meta_")
+    }
+
+    return ExperimentPlan.from_arrays(arrays), arrays["peaks"], metadata
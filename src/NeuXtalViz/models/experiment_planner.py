@@ -1,18 +1,9 @@
 import os
 
-import csv
-import itertools
 
 from mantid.simpleapi import (
     CreatePeaksWorkspace,
-    PredictPeaks,
-    FilterPeaks,
-    CombinePeaksWorkspaces,
-    SortPeaksWorkspace,
-    AddPeakHKL,
-    CountReflections,
     SetUB,
-    SetGoniometer,
     LoadNexus,
     SaveNexus,
     LoadIsawUB,
@@ -24,16 +15,12 @@ from mantid.simpleapi import (
     MaskDetectors,
     ExtractMonitors,
     PreprocessDetectorsToMD,
-    GroupDetectors,
     MaskBTP,
     AddSampleLog,
     CreateSampleWorkspace,
     CreateEmptyTableWorkspace,
-    DeleteTableRows,
-    CloneWorkspace,
     DeleteWorkspace,
     RenameWorkspace,
-    RenameWorkspaces,
     HasUB,
     mtd,
 )
@@ -41,13 +28,41 @@ from mantid.simpleapi import (
 from mantid.kernel import V3D
 from mantid.geometry import PointGroupFactory
 
-from collections import defaultdict
-
 import numpy as np
-from scipy.spatial.transform import Rotation
 
 from NeuXtalViz.models.base_model import NeuXtalVizModel
 from NeuXtalViz.config.instruments import beamlines
+from NeuXtalViz.models.detector_footprint import (
+    DetectorFootprint,
+    FootprintRaster,
+)
+from NeuXtalViz.models.goniometer import RotationCache, compose_rotations
+from NeuXtalViz.models.orientation_index import OrientationIndex
+from NeuXtalViz.models.peak_store import PeakStore
+from NeuXtalViz.models.experiment_plan import (
+    ExperimentPlan,
+    load_plan_archive,
+    save_plan_archive,
+)
+from NeuXtalViz.models.coverage_optimizer import (
+    CoverageEvaluator,
+    GeneCache,
+    optimizers,
+)
+from NeuXtalViz.models.reflection_statistics import (
+    CoverageCounter,
+    ReflectionStatistics,
+)
+from NeuXtalViz.models.reflection_predictor import (
+    ReflectionPredictor,
+    d_spacing,
+)
+from NeuXtalViz.models.disk_cache import (
+    content_hash,
+    file_hash,
+    load_arrays,
+    save_arrays,
+)
 
 # lattice_centering_dict = {
 #     'P': 'Primitive',
@@ -183,167 +198,247 @@ crystal_system_point_groups = {
     "Cubic": ["23", "m-3", "432", "-43m", "m-3m"],
 }
 
-centering_conditions = {
-    "P": lambda h, k, l: True,
-    "I": lambda h, k, l: (h + k + l) % 2 == 0,
-    "F": lambda h, k, l: (h % 2 == k % 2 == l % 2),
-    "C": lambda h, k, l: k % 2 == 0 and l % 2 == 0,
-    "A": lambda h, k, l: h % 2 == 0 and l % 2 == 0,
-    "B": lambda h, k, l: h % 2 == 0 and k % 2 == 0,
-    "R": lambda h, k, l: True,
-    "Robv": lambda h, k, l: (-h + k + l) % 3 == 0,
-    "Rrev": lambda h, k, l: (h - k + l) % 3 == 0,
-}
-
 
 class ExperimentModel(NeuXtalVizModel):
     def __init__(self):
         super(ExperimentModel, self).__init__()
 
+        self.instrument_cache_key = None
+        self.footprint = None
+        self.raster = None
+        self.rotation_cache = RotationCache(chunk_size=16384)
+
+        self.predictor = None
+        self.peak_store = PeakStore()
+        self.plan = None
+        self.loaded_peaks = None
+        self.counters = None
+        self.counter_cache = {}
+
+        self.gene_cache = GeneCache()
+
         CreatePeaksWorkspace(
             NumberOfPeaks=0,
             OutputType="LeanElasticPeak",
             OutputWorkspace="coverage",
         )
 
+    def instrument_key(self, instrument, logs, cal, mask):
+        """
+        Cache key of an initialized instrument.
+
+        Parameters
+        ----------
+        instrument : str
+            Beamline name.
+        logs : dict
+            Goniometer motor values.
+        cal : str
+            Detector calibration file.
+        mask : str
+            Detector mask file.
+
+        Returns
+        -------
+        key : str
+            Hexadecimal digest.
+
+        """
+
+        beamline = beamlines[instrument]
+
+        return content_hash(
+            self.get_instrument_name(instrument),
+            sorted((key, float(value)) for key, value in logs.items()),
+            beamline["BankPixels"],
+            beamline["MaskEdges"],
+            beamline["MaskBanks"],
+            file_hash(cal),
+            file_hash(mask),
+        )
+
     def initialize_instrument(self, instrument, logs, cal, mask):
-        inst = self.get_instrument_name(instrument)
+        """
+        Prepare the detector coverage of an instrument.
 
-        if not mtd.doesExist("instrument"):
-            LoadEmptyInstrument(
-                InstrumentName=inst, OutputWorkspace="instrument"
-            )
+        Detector arrays are read from the instrument cache when available
+        and the Mantid instrument workspace is only built, and discarded
+        again, when they are not.
 
-            for key in logs.keys():
-                AddSampleLog(
-                    Workspace="instrument",
-                    LogName=key,
-                    LogText=str(logs[key]),
-                    LogType="Number Series",
-                    NumberType="Double",
-                )
+        Parameters
+        ----------
+        instrument : str
+            Beamline name.
+        logs : dict
+            Goniometer motor values.
+        cal : str
+            Detector calibration file.
+        mask : str
+            Detector mask file.
 
-            if len(logs.keys()) > 0:
-                LoadInstrument(
-                    Workspace="instrument",
-                    RewriteSpectraMap=False,
-                    InstrumentName=inst,
-                )
+        """
 
-            if cal != "" and os.path.exists(cal):
-                if os.path.splitext(cal)[1] == ".xml":
-                    LoadParameterFile(Workspace="instrument", Filename=cal)
-                else:
-                    LoadIsawDetCal(InputWorkspace="instrument", Filename=cal)
+        key = self.instrument_key(instrument, logs, cal, mask)
 
-            if mask != "" and os.path.exists(mask):
-                if not mtd.doesExist("mask"):
-                    LoadMask(
-                        Instrument=inst, InputFile=mask, OutputWOrkspace="mask"
-                    )
-                MaskDetectors(Workspace="instrument", MaskedWorkspace="mask")
+        if self.instrument_cache_key == key:
+            return
 
-            ExtractMonitors(
-                InputWorkspace="instrument",
-                MonitorWorkspace="monitors",
-                DetectorWorkspace="instrument",
-            )
+        self.instrument_args = (instrument, logs, cal, mask)
 
-            cols, rows = beamlines[instrument]["BankPixels"]
-            mask_cols, mask_rows = beamlines[instrument]["MaskEdges"]
+        detectors = load_arrays("instrument", key)
 
-            MaskBTP(
-                Workspace="instrument",
-                Instrument=inst,
-                Tube="0-{},{}-{}".format(mask_cols, cols - mask_cols, cols),
-            )
+        if detectors is None:
+            self.load_instrument()
 
-            MaskBTP(
-                Workspace="instrument",
-                Instrument=inst,
-                Pixel="0-{},{}-{}".format(mask_rows, rows - mask_rows, rows),
-            )
+            detectors = {
+                "det_ID": self.det_ID,
+                "L2": self.L2,
+                "two_theta": self.two_theta,
+                "azimuthal": self.azimuthal,
+                "gamma": self.gamma,
+                "nu": self.nu,
+            }
 
-            banks = beamlines[instrument]["MaskBanks"]
+            save_arrays("instrument", key, **detectors)
 
-            for bank in banks:
-                MaskBTP(
-                    Workspace="instrument",
-                    Instrument=inst,
-                    Bank=bank,
-                )
+        else:
+            self.det_ID = detectors["det_ID"]
+            self.L2 = detectors["L2"]
+            self.two_theta = detectors["two_theta"]
+            self.azimuthal = detectors["azimuthal"]
+            self.gamma = detectors["gamma"]
+            self.nu = detectors["nu"]
 
-            PreprocessDetectorsToMD(
-                InputWorkspace="instrument", OutputWorkspace="detectors"
-            )
+        self.footprint = None
+        self.raster = None
+
+        self.instrument_cache_key = key
 
-            grouping = beamlines[instrument]["Grouping"]
+    def get_detector_footprint(self):
+        """
+        Angular detector footprint, built on first use.
 
-            c, r = [int(val) for val in grouping.split("x")]
-            shape = (-1, cols, rows)
+        Returns
+        -------
+        footprint : DetectorFootprint
+            Batched ray-to-detector classifier.
 
-            det_map = np.array(mtd["detectors"].column(5)).reshape(*shape)
+        """
 
-            shape = det_map.shape
-            i, j, k = np.meshgrid(
-                np.arange(shape[0]),
-                np.arange(shape[1]),
-                np.arange(shape[2]),
-                indexing="ij",
+        if self.footprint is None:
+            self.footprint = DetectorFootprint(
+                self.gamma, self.nu, self.det_ID
             )
-            mask = np.array(mtd["detectors"].column(7)) == 0
 
-            keys = np.stack((i, j // c, k // r), axis=-1)
-            keys_flat = keys.reshape(-1, keys.shape[-1])
-            det_map_flat = det_map.ravel()[mask].astype(str)
-            grouped_ids = defaultdict(list)
+        return self.footprint
 
-            for key, detector_id in zip(map(tuple, keys_flat), det_map_flat):
-                grouped_ids[key].append(detector_id)
+    def get_footprint_raster(self):
+        """
+        Rasterized detector footprint, built on first use.
 
-            detector_list = ",".join(
-                "+".join(group) for group in grouped_ids.values()
-            )
+        Returns
+        -------
+        raster : FootprintRaster
+            Table lookup ray-to-detector classifier.
 
-            GroupDetectors(
-                InputWorkspace="instrument",
-                OutputWorkspace="instrument",
-                GroupingPattern=detector_list,
-            )
+        """
+
+        if self.raster is None:
+            self.raster = FootprintRaster(self.get_detector_footprint())
+
+        return self.raster
+
+    def load_instrument(self):
+        instrument, logs, cal, mask = self.instrument_args
+
+        inst = self.get_instrument_name(instrument)
+
+        LoadEmptyInstrument(InstrumentName=inst, OutputWorkspace="instrument")
 
-            CreatePeaksWorkspace(
-                InstrumentWorkspace="instrument",
-                NumberOfPeaks=0,
-                OutputType="LeanElasticPeak",
-                OutputWorkspace="peak",
+        for key in logs.keys():
+            AddSampleLog(
+                Workspace="instrument",
+                LogName=key,
+                LogText=str(logs[key]),
+                LogType="Number Series",
+                NumberType="Double",
             )
 
-            CreatePeaksWorkspace(
-                InstrumentWorkspace="instrument",
-                NumberOfPeaks=0,
-                OutputType="Peak",
-                OutputWorkspace="peaks",
+        if len(logs.keys()) > 0:
+            LoadInstrument(
+                Workspace="instrument",
+                RewriteSpectraMap=False,
+                InstrumentName=inst,
             )
 
-            CreatePeaksWorkspace(
-                InstrumentWorkspace="instrument",
-                NumberOfPeaks=0,
-                OutputType="Peak",
-                OutputWorkspace="combined",
+        if cal != "" and os.path.exists(cal):
+            if os.path.splitext(cal)[1] == ".xml":
+                LoadParameterFile(Workspace="instrument", Filename=cal)
+            else:
+                LoadIsawDetCal(InputWorkspace="instrument", Filename=cal)
+
+        if mask != "" and os.path.exists(mask):
+            if not mtd.doesExist("mask"):
+                LoadMask(
+                    Instrument=inst, InputFile=mask, OutputWOrkspace="mask"
+                )
+            MaskDetectors(Workspace="instrument", MaskedWorkspace="mask")
+
+        ExtractMonitors(
+            InputWorkspace="instrument",
+            MonitorWorkspace="monitors",
+            DetectorWorkspace="instrument",
+        )
+
+        cols, rows = beamlines[instrument]["BankPixels"]
+        mask_cols, mask_rows = beamlines[instrument]["MaskEdges"]
+
+        MaskBTP(
+            Workspace="instrument",
+            Instrument=inst,
+            Tube="0-{},{}-{}".format(mask_cols, cols - mask_cols, cols),
+        )
+
+        MaskBTP(
+            Workspace="instrument",
+            Instrument=inst,
+            Pixel="0-{},{}-{}".format(mask_rows, rows - mask_rows, rows),
+        )
+
+        banks = beamlines[instrument]["MaskBanks"]
+
+        for bank in banks:
+            MaskBTP(
+                Workspace="instrument",
+                Instrument=inst,
+                Bank=bank,
             )
 
-            L2 = np.array(mtd["detectors"].column(1))[mask]
-            tt = np.array(mtd["detectors"].column(2))[mask]
-            az = np.array(mtd["detectors"].column(3))[mask]
-            det_ID = np.array(mtd["detectors"].column(4))[mask]
+        PreprocessDetectorsToMD(
+            InputWorkspace="instrument", OutputWorkspace="detectors"
+        )
+
+        mask = np.array(mtd["detectors"].column(7)) == 0
+
+        L2 = np.array(mtd["detectors"].column(1))[mask]
+        tt = np.array(mtd["detectors"].column(2))[mask]
+        az = np.array(mtd["detectors"].column(3))[mask]
+        det_ID = np.array(mtd["detectors"].column(4))[mask]
+
+        x = L2 * np.sin(tt) * np.cos(az)
+        y = L2 * np.sin(tt) * np.sin(az)
+        z = L2 * np.cos(tt)
 
-            x = L2 * np.sin(tt) * np.cos(az)
-            y = L2 * np.sin(tt) * np.sin(az)
-            z = L2 * np.cos(tt)
+        self.det_ID = det_ID.copy()
+        self.L2 = L2
+        self.two_theta = tt
+        self.azimuthal = az
+        self.nu = np.rad2deg(np.arcsin(y / L2))
+        self.gamma = np.rad2deg(np.arctan2(x, z))
 
-            self.det_ID = det_ID.copy()
-            self.nu = np.rad2deg(np.arcsin(y / L2))
-            self.gamma = np.rad2deg(np.arctan2(x, z))
+        for ws in ["instrument", "monitors", "detectors"]:
+            if mtd.doesExist(ws):
+                DeleteWorkspace(Workspace=ws)
 
     def get_calibration_file_path(self, instrument):
         inst = beamlines[instrument]
@@ -364,14 +459,11 @@ class ExperimentModel(NeuXtalVizModel):
         )
 
     def remove_instrument(self):
-        if mtd.doesExist("instrument"):
-            DeleteWorkspace(Workspace="instrument")
+        self.instrument_cache_key = None
 
-        if mtd.doesExist("cobmined"):
-            DeleteWorkspace(Workspace="cobmined")
-
-        if mtd.doesExist("filtered"):
-            DeleteWorkspace(Workspace="filtered")
+        self.peak_store.clear()
+        self.counters = None
+        self.counter_cache.clear()
 
     def get_crystal_system_point_groups(self, crystal_system):
         return crystal_system_point_groups[crystal_system]
@@ -383,32 +475,11 @@ class ExperimentModel(NeuXtalVizModel):
         return str(point_group), str(centering)
 
     def create_plan(self, table):
-        pv, names, titles, settings, comments, counts, values, use = table
+        self.plan = ExperimentPlan(*table)
 
         CreateEmptyTableWorkspace(OutputWorkspace="plan")
 
-        mtd["plan"].addColumn("str", pv)
-
-        for name in names:
-            mtd["plan"].addColumn("float", name)
-
-        mtd["plan"].addColumn("str", "Comment")
-        mtd["plan"].addColumn("str", "Wait For")
-        mtd["plan"].addColumn("float", "Value")
-        mtd["plan"].addColumn("bool", "Use")
-
-        for title, setting, comment, count, value, active in zip(
-            titles, settings, comments, counts, values, use
-        ):
-            row = {}
-            row[pv] = title
-            for angle, name in zip(setting, names):
-                row[name] = np.round(angle, 2)
-            row["Comment"] = comment
-            row["Wait For"] = count
-            row["Value"] = value
-            row["Use"] = active
-            mtd["plan"].addRow(row)
+        self.plan.to_workspace(mtd["plan"])
 
     def create_sample(self, instrument, mode, UB, wavelength, d_min):
         CreateSampleWorkspace(OutputWorkspace="sample")
@@ -557,31 +628,110 @@ class ExperimentModel(NeuXtalVizModel):
         return beamlines[instrument]["Wavelength"]
 
     def save_plan(self, filename):
-        plan_dict = mtd["plan"].toDict().copy()
-        use_angle = plan_dict["Use"]
+        self.plan.save_csv(filename)
 
-        for key in plan_dict.keys():
-            items = plan_dict[key]
-            items = [item for item, use in zip(items, use_angle) if use]
-            plan_dict[key] = items
+    def save_experiment(self, filename):
+        if mtd.doesExist("plan"):
+            if filename.endswith(".npz"):
+                self.save_plan_archive(filename)
+            else:
+                SaveNexus(InputWorkspace="plan", Filename=filename)
+                if mtd.doesExist("sample"):
+                    SaveNexus(
+                        InputWorkspace="sample",
+                        Filename=filename,
+                        Append=True,
+                    )
 
-        plan_dict.pop("Use")
+    def save_plan_archive(self, filename):
+        """
+        Write the plan, experiment settings and predicted reflections to
+        a binary plan file.
+
+        Parameters
+        ----------
+        filename : str
+            Path to binary plan file.
+
+        """
+
+        config, symm = self.experiment_settings("sample")
+
+        instrument, mode, wl, d_min, lims, vals, cal, mask = config
+        cs, pg, lc = symm
+
+        save_plan_archive(
+            filename,
+            self.plan,
+            self.peak_store.peaks,
+            UB=mtd["sample"].sample().getOrientedLattice().getUB().copy(),
+            instrument=instrument,
+            mode=mode,
+            wavelength=np.array(wl, dtype=float).reshape(-1),
+            d_min=d_min,
+            limits=np.array(lims, dtype=float).reshape(-1, 2),
+            motors=np.array(vals, dtype=float),
+            cal=cal,
+            mask=mask,
+            crystal_system=cs,
+            point_group=pg,
+            lattice_centering=lc,
+        )
 
-        with open(filename, mode="w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=plan_dict.keys())
-            writer.writeheader()
-            for row in zip(*plan_dict.values()):
-                writer.writerow(dict(zip(plan_dict.keys(), row)))
+    def experiment_settings(self, sample):
+        """
+        Experiment settings stored in the logs of a sample workspace.
+
+        Parameters
+        ----------
+        sample : str
+            Sample workspace name.
+
+        Returns
+        -------
+        config : tuple
+            Instrument, mode, wavelength, minimum d-spacing, goniometer
+            limits, motor values, calibration and mask files.
+        symm : tuple
+            Crystal system, point group and lattice centering.
+
+        """
+
+        run = mtd[sample].run()
+
+        instrument = run.getProperty("instrument").value
+        mode = run.getProperty("mode").value
+        wl_min = run.getProperty("lamda_min").value
+        wl_max = run.getProperty("lamda_max").value
+        d_min = run.getProperty("d_min").value
+        cs = run.getProperty("crystal_system").value
+        pg = run.getProperty("point_group").value
+        lc = run.getProperty("lattice_centering").value
+        lims = run.getProperty("limits").value
+        mask = run.getProperty("mask").value
+        cal = run.getProperty("cal").value
+        lims = np.array(lims).reshape(-1, 2).tolist()
+        vals = []
+        if run.hasProperty("motors"):
+            vals = run.getProperty("motors").value
 
-    def save_experiment(self, filename):
-        if mtd.doesExist("plan"):
-            SaveNexus(InputWorkspace="plan", Filename=filename)
-            if mtd.doesExist("sample"):
-                SaveNexus(
-                    InputWorkspace="sample", Filename=filename, Append=True
-                )
+        if np.isclose(wl_min, wl_max):
+            wl = wl_min
+        else:
+            wl = [wl_min, wl_max]
+
+        config = (instrument, mode, wl, d_min, lims, vals, cal, mask)
+        symm = (cs, pg, lc)
+
+        return config, symm
 
     def load_experiment(self, filename):
+        self.peak_store.clear()
+        self.loaded_peaks = None
+
+        if filename.endswith(".npz"):
+            return self.load_plan_archive(filename)
+
         LoadNexus(Filename=filename, OutputWorkspace="experiment")
 
         plan, sample = mtd["experiment"].getNames()
@@ -591,51 +741,86 @@ class ExperimentModel(NeuXtalVizModel):
 
         self.set_UB(UB)
 
-        instrument = mtd[sample].run().getProperty("instrument").value
-        mode = mtd[sample].run().getProperty("mode").value
-        wl_min = mtd[sample].run().getProperty("lamda_min").value
-        wl_max = mtd[sample].run().getProperty("lamda_max").value
-        d_min = mtd[sample].run().getProperty("d_min").value
-        cs = mtd[sample].run().getProperty("crystal_system").value
-        pg = mtd[sample].run().getProperty("point_group").value
-        lc = mtd[sample].run().getProperty("lattice_centering").value
-        lims = mtd[sample].run().getProperty("limits").value
-        mask = mtd[sample].run().getProperty("mask").value
-        cal = mtd[sample].run().getProperty("cal").value
-        lims = np.array(lims).reshape(-1, 2).tolist()
-        vals = []
-        if mtd[sample].run().hasProperty("motors"):
-            vals = mtd[sample].run().getProperty("motors").value
+        config, symm = self.experiment_settings(sample)
 
-        if np.isclose(wl_min, wl_max):
-            wl = wl_min
-        else:
-            wl = [wl_min, wl_max]
+        self.plan = ExperimentPlan.from_workspace(mtd[plan])
 
-        cols = mtd[plan].columnCount() - 5
-        rows = mtd[plan].rowCount()
+        return self.plan.table(), config, symm
 
-        titles = mtd[plan].column(0)
-        comments = mtd[plan].column(cols + 1)
-        counts = mtd[plan].column(cols + 2)
-        values = mtd[plan].column(cols + 3)
-        use = mtd[plan].column(cols + 4)
+    def load_plan_archive(self, filename):
+        """
+        Read a binary plan file and keep its predicted reflections.
 
-        settings = []
-        for row in range(rows):
-            angles = []
-            for col in range(cols):
-                angle = mtd[plan].cell(row, col + 1)
-                angles.append(angle)
-            settings.append(angles)
+        The reflections are only put into the peak store by
+        ``restore_predictions``, once the instrument of the plan has been
+        set up, since switching instruments clears the store.
 
-        plan = (titles, settings, comments, counts, values, use)
-        config = (instrument, mode, wl, d_min, lims, vals, cal, mask)
-        symm = (cs, pg, lc)
+        Parameters
+        ----------
+        filename : str
+            Path to binary plan file.
+
+        Returns
+        -------
+        plan : tuple
+            Titles, settings, comments, counts, values and use columns.
+        config : tuple
+            Instrument, mode, wavelength, minimum d-spacing, goniometer
+            limits, motor values, calibration and mask files.
+        symm : tuple
+            Crystal system, point group and lattice centering.
 
-        return plan, config, symm
+        """
+
+        self.plan, peaks, meta = load_plan_archive(filename)
+
+        UB = meta["UB"]
+        SetUB(Workspace="coverage", UB=UB)
+
+        self.set_UB(UB)
+
+        wl = meta["wavelength"].tolist()
+        if np.isclose(wl[0], wl[-1]):
+            wl = wl[0]
+
+        config = (
+            meta["instrument"].item(),
+            meta["mode"].item(),
+            wl,
+            meta["d_min"].item(),
+            meta["limits"].tolist(),
+            meta["motors"].tolist(),
+            meta["cal"].item(),
+            meta["mask"].item(),
+        )
+
+        symm = (
+            meta["crystal_system"].item(),
+            meta["point_group"].item(),
+            meta["lattice_centering"].item(),
+        )
+
+        self.loaded_peaks = peaks
+
+        return self.plan.table(), config, symm
+
+    def restore_predictions(self):
+        """
+        Put the reflections of a loaded binary plan into the peak store.
+
+        """
+
+        if self.loaded_peaks is not None:
+            self.peak_store.restore(self.loaded_peaks, len(self.plan))
+            self.loaded_peaks = None
+
+    def get_number_of_predictions(self):
+        return len(self.peak_store)
 
     def generate_axes(self, axes, polarities):
+        self.axes_vectors = np.array(axes, dtype=float)
+        self.axes_polarities = np.array(polarities, dtype=float)
+
         self.axes = [None] * 6
 
         for i, (axis, polarity) in enumerate(zip(axes, polarities)):
@@ -653,43 +838,40 @@ class ExperimentModel(NeuXtalVizModel):
                 col += 1
         return setting
 
-    def _calculate_matrices(self, axes, polarities, limits, step):
-        self.generate_axes(axes, polarities)
+    def get_orientation_index(self, axes, polarities, limits, step):
+        """
+        Orientation index of the current sample and goniometer scan.
 
-        free = 0
-        for limit in limits:
-            free += 1 - np.isclose(limit[0], limit[1])
-        step *= free
+        The index streams the rotation matrices of the scan from the
+        rotation cache, so every query holds one chunk of settings at a
+        time.
 
-        angular_coverage = []
-        for limit in limits:
-            angular_coverage.append(np.arange(limit[0], limit[1] + step, step))
+        Parameters
+        ----------
+        axes : list
+            Goniometer rotation axes.
+        polarities : list
+            Sense of rotation of each axis.
+        limits : list of 2-element lists
+            Lower and upper limit of each axis.
+        step : float
+            Angular step.
 
-        axes = np.array(axes)
-        polarities = np.array(polarities)
+        Returns
+        -------
+        index : OrientationIndex
+            Rotated reciprocal bases of each chunk of settings.
 
-        angle_settings = np.meshgrid(*angular_coverage, indexing="ij")
-        angle_settings = np.reshape(angle_settings, (len(polarities), -1)).T
+        """
 
-        angles = angle_settings.copy()
-
-        angle_settings = angle_settings * polarities
-        angle_settings = np.deg2rad(angle_settings)
-
-        rotation_vectors = angle_settings[..., None] * axes
-        rotation_vectors = rotation_vectors.reshape(-1, 3)
+        UB = mtd["coverage"].sample().getOrientedLattice().getUB().copy()
 
-        all_rotations = Rotation.from_rotvec(rotation_vectors).as_matrix()
-        all_rotations = all_rotations.reshape(*angle_settings.shape, 3, 3)
+        self.generate_axes(axes, polarities)
 
-        Rs = []
-        for i in range(all_rotations.shape[0]):
-            R = np.eye(3)
-            for j in range(all_rotations.shape[1]):
-                R = R @ all_rotations[i, j, :, :]
-            Rs.append(R)
+        def chunks():
+            return self.rotation_cache.iterate(axes, polarities, limits, step)
 
-        return Rs, angles
+        return OrientationIndex(UB, chunks)
 
     def individual_peak(
         self, hkl, wavelength, axes, polarities, limits, equiv, pg, step=1
@@ -698,24 +880,13 @@ class ExperimentModel(NeuXtalVizModel):
 
         hkls = pg.getEquivalents(hkl) if equiv else [hkl]
 
-        angles, angles_gamma, angles_nu, angles_lamda = [], [], [], []
-
-        for hkl in hkls:
-            settings, values = self.calculate_individual_peak(
-                hkl, wavelength, axes, polarities, limits, step
-            )
-
-            gamma, nu, lamda = values
+        self.comment = "(" + " ".join(np.array(hkls[-1]).astype(str)) + ")"
 
-            angles.append(settings)
-            angles_gamma.append(gamma)
-            angles_nu.append(nu)
-            angles_lamda.append(lamda)
+        angles, values = self.calculate_individual_peaks(
+            hkls, wavelength, axes, polarities, limits, step
+        )
 
-        angles = np.row_stack(angles)
-        gamma = np.concatenate(angles_gamma)
-        nu = np.concatenate(angles_nu)
-        lamda = np.concatenate(angles_lamda)
+        gamma, nu, lamda = values
 
         self.angles = angles
         self.angles_gamma = gamma
@@ -728,73 +899,55 @@ class ExperimentModel(NeuXtalVizModel):
 
         return gamma, nu, lamda
 
-    def calculate_individual_peak(
-        self, hkl, wavelength, axes, polarities, limits, step=1
+    def calculate_individual_peaks(
+        self, hkls, wavelength, axes, polarities, limits, step=1
     ):
-        self.comment = "(" + " ".join(np.array(hkl).astype(str)) + ")"
+        """
+        Goniometer settings observing any of several reflections.
+
+        All reflections are projected with the cached orientation index.
+
+        Parameters
+        ----------
+        hkls : list
+            Miller indices of each reflection.
+        wavelength : 2-element list
+            Wavelength band.
+        axes : list
+            Goniometer rotation axes.
+        polarities : list
+            Sense of rotation of each axis.
+        limits : list of 2-element lists
+            Lower and upper limit of each axis.
+        step : float, optional
+            Angular step. Default is 1.
+
+        Returns
+        -------
+        settings : 2d array
+            Goniometer angles of each observation ordered by reflection.
+        gamma, nu, lamda : 1d arrays
+            Scattering angles and wavelength of each observation.
+
+        """
 
         if np.isclose(wavelength[0], wavelength[1]):
             wavelength = [0.975 * wavelength[0], 1.025 * wavelength[1]]
 
-        FilterPeaks(
-            InputWorkspace="peak",
-            OutputWorkspace="peak",
-            FilterVariable="RunNumber",
-            FilterValue=-1,
-            Operator="=",
-        )
-
-        UB = mtd["coverage"].sample().getOrientedLattice().getUB().copy()
-
-        SetUB(Workspace="peak", UB=UB)
-
-        AddPeakHKL(Workspace="peak", HKL=hkl)
-
-        Q_sample = mtd["peak"].getPeak(0).getQSampleFrame()
-
-        Q = np.sqrt(np.dot(Q_sample, Q_sample))
-
-        Rs, angles = self._calculate_matrices(axes, polarities, limits, step)
+        index = self.get_orientation_index(axes, polarities, limits, step)
 
-        mtd["peak"].run().getGoniometer().setR(np.eye(3))
-        mtd["peaks"].run().getGoniometer().setR(np.eye(3))
+        hkls = np.array(hkls, dtype=float).reshape(-1, 3)
 
-        Q_lab = np.einsum("kij,j->ki", Rs, Q_sample)
+        return index.reflections(hkls, wavelength, self.get_footprint_raster())
 
-        lamda = -4 * np.pi * Q_lab[:, 2] / Q**2
-        mask = (lamda > wavelength[0]) & (lamda < wavelength[1])
-
-        k = 2 * np.pi / lamda
-
-        ki = k[:, np.newaxis] * np.array([0, 0, 1])
-        kf = Q_lab + ki
-
-        gamma = np.rad2deg(np.arctan2(kf[:, 0], kf[:, 2]))[mask]
-        nu = np.rad2deg(np.arcsin(kf[:, 1] / k))[mask]
-        lamda = lamda[mask]
-
-        settings = angles[mask]
-
-        if len(lamda) > 0:
-            k = 2 * np.pi / lamda
-            Qx = k * np.cos(np.deg2rad(nu)) * np.sin(np.deg2rad(gamma))
-            Qy = k * np.sin(np.deg2rad(nu))
-            Qz = k * (np.cos(np.deg2rad(nu)) * np.cos(np.deg2rad(gamma)) - 1)
-
-            mask = []
-            for i in range(len(k)):
-                peak = mtd["peaks"].createPeak(V3D(Qx[i], Qy[i], Qz[i]))
-                mask.append(peak.getDetectorID() in self.det_ID)
-
-            mask = np.array(mask)
-
-            gamma = gamma[mask]
-            nu = nu[mask]
-            lamda = lamda[mask]
-
-            settings = settings[mask]
+    def calculate_individual_peak(
+        self, hkl, wavelength, axes, polarities, limits, step=1
+    ):
+        self.comment = "(" + " ".join(np.array(hkl).astype(str)) + ")"
 
-        return settings, (gamma, nu, lamda)
+        return self.calculate_individual_peaks(
+            [hkl], wavelength, axes, polarities, limits, step
+        )
 
     def simultaneous_peaks(
         self,
@@ -813,37 +966,14 @@ class ExperimentModel(NeuXtalVizModel):
         hkls_1 = pg.getEquivalents(hkl_1) if equiv else [hkl_1]
         hkls_2 = pg.getEquivalents(hkl_2) if equiv else [hkl_2]
 
-        pairs = list(itertools.product(hkls_1, hkls_2))
-
-        angles, angles_gamma, angles_nu, angles_lamda = [], [], [], []
-
-        angles_gamma_alt, angles_nu_alt, angles_lamda_alt = [], [], []
-
-        for hkl_1, hkl_2 in pairs:
-            settings, values0, values1 = self.simultaneous_peaks_hkl(
-                hkl_1, hkl_2, wavelength, axes, polarities, limits, step
-            )
+        self.comment = "(" + " ".join(np.array(hkls_1[-1]).astype(str)) + ")"
 
-            gamma0, nu0, lamda0 = values0
-            gamma1, nu1, lamda1 = values1
-
-            angles.append(settings)
-            angles_gamma.append(gamma0)
-            angles_nu.append(nu0)
-            angles_lamda.append(lamda0)
-
-            angles_gamma_alt.append(gamma1)
-            angles_nu_alt.append(nu1)
-            angles_lamda_alt.append(lamda1)
-
-        angles = np.row_stack(angles)
-        gamma = np.concatenate(angles_gamma)
-        nu = np.concatenate(angles_nu)
-        lamda = np.concatenate(angles_lamda)
+        angles, values0, values1 = self.calculate_simultaneous_peaks(
+            hkls_1, hkls_2, wavelength, axes, polarities, limits, step
+        )
 
-        gamma_alt = np.concatenate(angles_gamma_alt)
-        nu_alt = np.concatenate(angles_nu_alt)
-        lamda_alt = np.concatenate(angles_lamda_alt)
+        gamma, nu, lamda = values0
+        gamma_alt, nu_alt, lamda_alt = values1
 
         self.angles = angles
         self.angles_gamma = gamma
@@ -856,110 +986,59 @@ class ExperimentModel(NeuXtalVizModel):
 
         return (gamma, nu, lamda), (gamma_alt, nu_alt, lamda_alt)
 
-    def simultaneous_peaks_hkl(
-        self, hkl_1, hkl_2, wavelength, axes, polarities, limits, step=1
+    def calculate_simultaneous_peaks(
+        self, hkls_1, hkls_2, wavelength, axes, polarities, limits, step=1
     ):
-        self.comment = "(" + " ".join(np.array(hkl_1).astype(str)) + ")"
+        """
+        Goniometer settings observing pairs of reflections together.
+
+        Each reflection is projected once with the cached orientation
+        index and every pair is the joint mask of its two reflections.
+
+        Parameters
+        ----------
+        hkls_1, hkls_2 : list
+            Miller indices of the first and second reflections of pairs.
+        wavelength : 2-element list
+            Wavelength band.
+        axes : list
+            Goniometer rotation axes.
+        polarities : list
+            Sense of rotation of each axis.
+        limits : list of 2-element lists
+            Lower and upper limit of each axis.
+        step : float, optional
+            Angular step. Default is 1.
+
+        Returns
+        -------
+        settings : 2d array
+            Goniometer angles of each observation ordered by pair.
+        values0, values1 : 3-element tuples of 1d arrays
+            Scattering angles and wavelength of both reflections.
+
+        """
 
         if np.isclose(wavelength[0], wavelength[1]):
             wavelength = [0.975 * wavelength[0], 1.025 * wavelength[1]]
 
-        FilterPeaks(
-            InputWorkspace="peak",
-            OutputWorkspace="peak",
-            FilterVariable="RunNumber",
-            FilterValue=-1,
-            Operator="=",
-        )
-
-        UB = mtd["coverage"].sample().getOrientedLattice().getUB().copy()
+        index = self.get_orientation_index(axes, polarities, limits, step)
 
-        SetUB(Workspace="peak", UB=UB)
+        hkls_1 = np.array(hkls_1, dtype=float).reshape(-1, 3)
+        hkls_2 = np.array(hkls_2, dtype=float).reshape(-1, 3)
 
-        AddPeakHKL(Workspace="peak", HKL=hkl_1)
-        AddPeakHKL(Workspace="peak", HKL=hkl_2)
-
-        Q0_sample = mtd["peak"].getPeak(0).getQSampleFrame()
-        Q1_sample = mtd["peak"].getPeak(1).getQSampleFrame()
-
-        Q0 = np.sqrt(np.dot(Q0_sample, Q0_sample))
-        Q1 = np.sqrt(np.dot(Q1_sample, Q1_sample))
-
-        Rs, angles = self._calculate_matrices(axes, polarities, limits, step)
-
-        Q0_lab = np.einsum("kij,j->ki", Rs, Q0_sample)
-        Q1_lab = np.einsum("kij,j->ki", Rs, Q1_sample)
-
-        lamda0 = -4 * np.pi * Q0_lab[:, 2] / Q0**2
-        lamda1 = -4 * np.pi * Q1_lab[:, 2] / Q1**2
-
-        mask = (
-            (lamda0 > wavelength[0])
-            & (lamda0 < wavelength[1])
-            & (lamda1 > wavelength[0])
-            & (lamda1 < wavelength[1])
+        return index.pairs(
+            hkls_1, hkls_2, wavelength, self.get_footprint_raster()
         )
 
-        k0 = 2 * np.pi / lamda0
-        k1 = 2 * np.pi / lamda1
-
-        k0i = k0[:, np.newaxis] * np.array([0, 0, 1])
-        k1i = k1[:, np.newaxis] * np.array([0, 0, 1])
-
-        k0f = Q0_lab + k0i
-        k1f = Q1_lab + k1i
-
-        gamma0 = np.rad2deg(np.arctan2(k0f[:, 0], k0f[:, 2]))[mask]
-        gamma1 = np.rad2deg(np.arctan2(k1f[:, 0], k1f[:, 2]))[mask]
-
-        nu0 = np.rad2deg(np.arcsin(k0f[:, 1] / k0))[mask]
-        nu1 = np.rad2deg(np.arcsin(k1f[:, 1] / k1))[mask]
-
-        lamda0 = lamda0[mask]
-        lamda1 = lamda1[mask]
-
-        angles = angles[mask]
-
-        if len(lamda0) > 0:
-            k0 = 2 * np.pi / lamda0
-            k1 = 2 * np.pi / lamda1
-
-            Q0x = k0 * np.cos(np.deg2rad(nu0)) * np.sin(np.deg2rad(gamma0))
-            Q1x = k1 * np.cos(np.deg2rad(nu1)) * np.sin(np.deg2rad(gamma1))
-
-            Q0y = k0 * np.sin(np.deg2rad(nu0))
-            Q1y = k1 * np.sin(np.deg2rad(nu1))
-
-            Q0z = k0 * (
-                np.cos(np.deg2rad(nu0)) * np.cos(np.deg2rad(gamma0)) - 1
-            )
-            Q1z = k1 * (
-                np.cos(np.deg2rad(nu1)) * np.cos(np.deg2rad(gamma1)) - 1
-            )
-
-            mask = []
-            for i in range(len(k1)):
-                peak0 = mtd["peaks"].createPeak(V3D(Q0x[i], Q0y[i], Q0z[i]))
-                peak1 = mtd["peaks"].createPeak(V3D(Q1x[i], Q1y[i], Q1z[i]))
-                mask.append(
-                    (peak0.getDetectorID() in self.det_ID)
-                    & (peak1.getDetectorID() in self.det_ID)
-                )
-
-            mask = np.array(mask)
-
-            gamma0 = gamma0[mask]
-            gamma1 = gamma1[mask]
-
-            nu0 = nu0[mask]
-            nu1 = nu1[mask]
-
-            lamda0 = lamda0[mask]
-            lamda1 = lamda1[mask]
-
-            angles = angles[mask]
+    def simultaneous_peaks_hkl(
+        self, hkl_1, hkl_2, wavelength, axes, polarities, limits, step=1
+    ):
+        self.comment = "(" + " ".join(np.array(hkl_1).astype(str)) + ")"
 
-        return angles, (gamma0, nu0, lamda0), (gamma1, nu1, lamda1)
+        return self.calculate_simultaneous_peaks(
+            [hkl_1], [hkl_2], wavelength, axes, polarities, limits, step
+        )
 
     def get_angles(self, gamma, nu):
         if len(self.angles_gamma) > 0:
@@ -1006,234 +1085,162 @@ class ExperimentModel(NeuXtalVizModel):
 
         return values
 
+    def get_reflection_predictor(self, UB, d_min, d_max):
+        """
+        Reflection predictor of an orientation matrix, rebuilt only when
+        the matrix or spacing limits change.
+
+        """
+
+        predictor = self.predictor
+
+        if predictor is None or not predictor.matches(UB, d_min, d_max):
+            self.predictor = ReflectionPredictor(UB, d_min, d_max)
+
+        return self.predictor
+
     def add_orientation(self, angles, wavelength, d_min, rows):
         if np.isclose(wavelength[0], wavelength[1]):
             wavelength = [0.975 * wavelength[0], 1.025 * wavelength[1]]
 
-        axes = np.array(self.axes).copy().tolist()
-        print(axes, angles)
+        UB = mtd["coverage"].sample().getOrientedLattice().getUB().copy()
 
-        for i, angle in enumerate(angles):
-            axes[i] = axes[i].format(angle)
+        d_max = 1.1 * np.max(d_spacing(UB, np.eye(3)))
 
-        ol = mtd["coverage"].sample().getOrientedLattice()
-        UB = ol.getUB().copy()
+        predictor = self.get_reflection_predictor(UB, d_min, d_max)
 
-        SetUB(Workspace="instrument", UB=UB)
+        n = len(angles)
 
-        SetGoniometer(
-            Workspace="instrument",
-            Axis0=axes[0],
-            Axis1=axes[1],
-            Axis2=axes[2],
-            Axis3=axes[3],
-            Axis4=axes[4],
-            Axis5=axes[5],
-        )
+        R = compose_rotations(
+            self.axes_vectors[:n], self.axes_polarities[:n], np.array([angles])
+        )[0]
 
-        d_max = 1.1 * np.max([ol.d(1, 0, 0), ol.d(0, 1, 0), ol.d(0, 0, 1)])
+        peaks = predictor.predict(R, wavelength, self.get_detector_footprint())
 
-        ws = "peaks_orientation_{}".format(rows)
+        self.peak_store.add(rows, peaks)
 
-        PredictPeaks(
-            InputWorkspace="instrument",
-            MinDSpacing=d_min,
-            MaxDSpacing=d_max,
-            WavelengthMin=wavelength[0],
-            WavelengthMax=wavelength[1],
-            ReflectionCondition="Primitive",
-            OutputWorkspace=ws,
-        )
+    def generate_table(self, row):
+        if row == -1:
+            if self.counters is None:
+                return []
 
-        SortPeaksWorkspace(
-            InputWorkspace=ws,
-            ColumnNameToSortBy="DSpacing",
-            SortAscending=False,
-            OutputWorkspace=ws,
-        )
+            hkls, d = self.counters[1].missing()
 
-        columns = ["l", "k", "h"]
+            peaks = np.column_stack([hkls, d, np.zeros_like(d)])
 
-        for col in columns:
-            SortPeaksWorkspace(
-                InputWorkspace=ws,
-                ColumnNameToSortBy=col,
-                SortAscending=False,
-                OutputWorkspace=ws,
-            )
+            sort = np.lexsort([-peaks[:, i] for i in [2, 1, 0, 3]])
 
-        for no in range(mtd[ws].getNumberPeaks() - 1, 0, -1):
-            if (
-                mtd[ws].getPeak(no).getHKL() - mtd[ws].getPeak(no - 1).getHKL()
-            ).norm2() == 0:
-                DeleteTableRows(TableWorkspace=ws, Rows=no)
-
-        for no in range(mtd[ws].getNumberPeaks() - 1, 0, -1):
-            if mtd[ws].getPeak(no).getDetectorID() not in self.det_ID:
-                DeleteTableRows(TableWorkspace=ws, Rows=no)
-
-        SortPeaksWorkspace(
-            InputWorkspace=ws,
-            ColumnNameToSortBy="DSpacing",
-            SortAscending=False,
-            OutputWorkspace=ws,
-        )
+            return peaks[sort].tolist()
 
-        for peak in mtd[ws]:
-            peak.setRunNumber(rows)
+        peaks = self.peak_store.orientation(row)
 
-        mtd["instrument"].run().getGoniometer().setR(np.eye(3))
+        columns = ["h", "k", "l", "d", "wavelength"]
 
-        SetUB(Workspace="combined", UB=UB)
-        CombinePeaksWorkspaces(
-            LHSWorkspace="combined",
-            RHSWorkspace=ws,
-            OutputWorkspace="combined",
-        )
+        return np.column_stack([peaks[col] for col in columns]).tolist()
 
-    def generate_table(self, row):
-        if row == -1 and mtd.doesExist("missing"):
-            CloneWorkspace(InputWorkspace="missing", OutputWorkspace="table")
-        else:
-            FilterPeaks(
-                InputWorkspace="combined",
-                FilterVariable="RunNumber",
-                FilterValue=str(row),
-                Operator="=",
-                OutputWorkspace="table",
-            )
+    def get_symmetry_matrices(self, point_group):
+        """
+        Integer matrices of point group operations acting on hkl.
 
-        SortPeaksWorkspace(
-            InputWorkspace="table",
-            ColumnNameToSortBy="DSpacing",
-            SortAscending=False,
-            OutputWorkspace="table",
-        )
+        Parameters
+        ----------
+        point_group : str
+            Point group symbol.
 
-        columns = ["l", "k", "h"]
+        Returns
+        -------
+        symmetry : 3d array of int
+            Matrix of each symmetry operation.
 
-        for col in columns:
-            SortPeaksWorkspace(
-                InputWorkspace="table",
-                ColumnNameToSortBy=col,
-                SortAscending=False,
-                OutputWorkspace="table",
-            )
+        """
+
+        pg = PointGroupFactory.createPointGroup(point_group)
+
+        matrices = []
+        for op in pg.getSymmetryOperations():
+            columns = [op.transformHKL(V3D(*axis)) for axis in np.eye(3)]
+            matrices.append(np.column_stack([list(col) for col in columns]))
+
+        return np.round(matrices).astype(int)
+
+    def get_coverage_counter(
+        self, point_group, lattice_centering, d_min, d_max, shells
+    ):
+        """
+        Observation counter of a symmetry, reused while the orientation
+        matrix and limits are unchanged so that only changed orientations
+        are recounted.
 
-        SortPeaksWorkspace(
-            InputWorkspace="table",
-            ColumnNameToSortBy="DSpacing",
-            SortAscending=False,
-            OutputWorkspace="table",
+        """
+
+        UB = mtd["coverage"].sample().getOrientedLattice().getUB().copy()
+
+        key = (
+            point_group,
+            lattice_centering,
+            UB.round(8).tobytes(),
+            d_min,
+            d_max,
+            shells,
         )
 
-        h = mtd["table"].column("h")
-        k = mtd["table"].column("k")
-        l = mtd["table"].column("l")
+        counter = self.counter_cache.get(key)
 
-        d = mtd["table"].column("DSpacing")
-        lamda = mtd["table"].column("Wavelength")
+        if counter is None:
+            if len(self.counter_cache) > 8:
+                self.counter_cache.clear()
 
-        return np.array([h, k, l, d, lamda]).T.tolist()
+            symmetry = self.get_symmetry_matrices(point_group)
 
-    def calculate_statistics(self, point_group, lattice_centering, use, d_min):
-        shel_sym, comp_sym, mult_sym, refl_sym = [], [], [], []
-        shel_asym, comp_asym, mult_asym, refl_asym = [], [], [], []
-        if mtd.doesExist("combined"):
-            CloneWorkspace(
-                InputWorkspace="combined", OutputWorkspace="filtered"
+            stats = ReflectionStatistics(
+                UB, symmetry, lattice_centering, d_min, d_max, shells
             )
 
-            rows = np.arange(len(use)).tolist()
+            counter = CoverageCounter(stats)
 
-            for row in rows:
-                if not use[row]:
-                    FilterPeaks(
-                        InputWorkspace="filtered",
-                        FilterVariable="RunNumber",
-                        FilterValue=str(row),
-                        Operator="!=",
-                        OutputWorkspace="filtered",
-                    )
+            self.counter_cache[key] = counter
 
-            if mtd["filtered"].getNumberPeaks() > 0:
-                ol = mtd["combined"].sample().getOrientedLattice()
-                d_max = np.max([ol.d(1, 0, 0), ol.d(0, 1, 0), ol.d(0, 0, 1)])
+        return counter
 
-                d = 1 / np.sqrt(np.linspace(1 / d_max**2, 1 / d_min**2, 5))
+    def calculate_statistics(
+        self, point_group, lattice_centering, use, d_min, shells=4
+    ):
+        sym = asym = [], [], [], []
 
-                pg, lc = self.get_symmetry(point_group, lattice_centering)
+        if len(self.peak_store) > 0:
+            orientations = self.peak_store.orientations
 
-                symmetric = CountReflections(
-                    InputWorkspace="filtered",
-                    PointGroup=pg,
-                    LatticeCentering=lc,
-                    MinDSpacing=d_min,
-                    MaxDSpacing=d_max,
-                    MissingReflectionsWorkspace="missing",
-                )
+            n = sum(len(peaks) for peaks, a in zip(orientations, use) if a)
 
-                unique, completeness, redundancy, multiple, _ = symmetric
-
-                shel_sym = ["Overall"]
-                comp_sym = [completeness * 100]
-                mult_sym = [redundancy]
-                refl_sym = [unique]
-
-                for i in range(len(d) - 1):
-                    symmetric = CountReflections(
-                        InputWorkspace="filtered",
-                        PointGroup=pg,
-                        LatticeCentering=lc,
-                        MinDSpacing=d[i + 1],
-                        MaxDSpacing=d[i],
-                        MissingReflectionsWorkspace="",
-                    )
+            if n == 0:
+                return None
+
+            UB = mtd["coverage"].sample().getOrientedLattice().getUB().copy()
 
-                    unique, completeness, redundancy, multiple = symmetric
+            d_max = np.max(d_spacing(UB, np.eye(3)))
 
-                    shel_sym.append("{:.2f}-{:.2f}".format(d[i], d[i + 1]))
-                    comp_sym.append(completeness * 100)
-                    mult_sym.append(redundancy)
-                    refl_sym.append(unique)
+            pg, lc = self.get_symmetry(point_group, lattice_centering)
 
-                asymmetric = CountReflections(
-                    InputWorkspace="filtered",
-                    PointGroup="1",
-                    LatticeCentering=lc,
-                    MinDSpacing=d_min,
-                    MaxDSpacing=d_max,
-                    MissingReflectionsWorkspace="missing",
+            counters, tables = [], []
+
+            for group in [pg, "1"]:
+                counter = self.get_coverage_counter(
+                    group, lc, d_min, d_max, shells
                 )
 
-                unique, completeness, redundancy, multiple, _ = asymmetric
-
-                shel_asym = ["Overall"]
-                comp_asym = [completeness * 100]
-                mult_asym = [redundancy]
-                refl_asym = [unique]
-
-                for i in range(len(d) - 1):
-                    asymmetric = CountReflections(
-                        InputWorkspace="filtered",
-                        PointGroup="1",
-                        LatticeCentering=lc,
-                        MinDSpacing=d[i + 1],
-                        MaxDSpacing=d[i],
-                        MissingReflectionsWorkspace="",
-                    )
+                counter.update(orientations, use)
 
-                    unique, completeness, redundancy, multiple = asymmetric
+                shel, refl, comp, mult, _ = counter.summary()
 
-                    shel_asym.append("{:.2f}-{:.2f}".format(d[i], d[i + 1]))
-                    comp_asym.append(completeness * 100)
-                    mult_asym.append(redundancy)
-                    refl_asym.append(unique)
-            else:
-                return None
+                tables.append(
+                    (shel, (comp * 100).tolist(), mult.tolist(), refl.tolist())
+                )
 
-        sym = (shel_sym, comp_sym, mult_sym, refl_sym)
-        asym = (shel_asym, comp_asym, mult_asym, refl_asym)
+                counters.append(counter)
+
+            self.counters = counters
+
+            sym, asym = tables
 
         return sym, asym
 
@@ -1254,53 +1261,15 @@ class ExperimentModel(NeuXtalVizModel):
         return rgb
 
     def delete_angles(self, rows):
-        for row in rows:
-            FilterPeaks(
-                InputWorkspace="combined",
-                FilterVariable="RunNumber",
-                FilterValue=str(row),
-                Operator="!=",
-                OutputWorkspace="combined",
-            )
-
-        runs = mtd["combined"].column(0)
-
-        u, new_runs = np.unique(runs, return_index=True)
-
-        for new_run, peak in zip(new_runs.tolist(), mtd["combined"]):
-            peak.setRunNumber(new_run)
+        self.peak_store.delete(rows)
 
     def get_coverage_info(self, point_group, lattice_centering):
-        pg = PointGroupFactory.createPointGroup(point_group)
-
         coverage_dict = {}
 
         UB = mtd["coverage"].sample().getOrientedLattice().getUB().copy()
-        # UB_inv = np.linalg.inv(UB)
-
-        if mtd.doesExist("filtered"):
-            h = mtd["filtered"].column("h")
-            k = mtd["filtered"].column("k")
-            l = mtd["filtered"].column("l")
-
-            hkls = np.array([h, k, l]).T.astype(int).tolist()
-
-            hkl_dict = {}
-            hkl_dict[(0, 0, 0)] = 0
-            for hkl in hkls:
-                if centering_conditions[lattice_centering](*hkl):
-                    equiv_hkls = pg.getEquivalents(hkl)
-                    for equiv_hkl in equiv_hkls:
-                        key = tuple(equiv_hkl)
-                        no = hkl_dict.get(key)
-                        if no is None:
-                            no = 1
-                        else:
-                            no += 1
-                        hkl_dict[key] = no
-
-            nos = np.array([value for value in hkl_dict.values()])
-            hkls = np.array([key for key in hkl_dict.keys()])
+
+        if self.counters is not None and self.counters[0].counts.any():
+            hkls, nos = self.counters[0].coverage()
 
             r = np.sqrt(hkls[:, 0] ** 2 + hkls[:, 1] ** 2 + hkls[:, 2] ** 2)
             theta = np.arccos(hkls[:, 2] / r)
@@ -1327,8 +1296,6 @@ class ExperimentModel(NeuXtalVizModel):
             saturation = np.ones_like(hue)
             lightness = theta / np.pi
 
-            coverage_dict["axis_coords"] = coords
-
             rgb = self.hsl_to_rgb(hue, saturation, lightness)
             coords = np.einsum("ij,nj->ni", 2 * np.pi * UB, hkls)
 
@@ -1337,254 +1304,69 @@ class ExperimentModel(NeuXtalVizModel):
 
             return coverage_dict
 
-    def crystal_plan(self, *args):
-        return CrystalPlan(*args)
-
-
-class CrystalPlan:
-    def __init__(
+    def crystal_plan(
         self,
         use,
         opt,
-        axes,
         limits,
         wavelength,
         d_min,
         point_group,
         lattice_centering,
+        strategy="genetic",
+        n_proc=1,
+        seed=None,
     ):
-        CloneWorkspace(
-            InputWorkspace="combined", OutputWorkspace="crystal_plan"
-        )
-
-        self.instrument = "instrument"
-
-        rows = np.arange(len(use)).tolist()
-
-        for row in rows:
-            if not use[row] or opt[row]:
-                FilterPeaks(
-                    InputWorkspace="crystal_plan",
-                    FilterVariable="RunNumber",
-                    FilterValue=str(row),
-                    Operator="!=",
-                    OutputWorkspace="crystal_plan",
-                )
-
         if np.isclose(wavelength[0], wavelength[1]):
             wavelength = [0.975 * wavelength[0], 1.025 * wavelength[1]]
 
-        self.wavelength = wavelength
-
-        self.axes = axes.copy()
-        self.limits = limits.copy()
-
-        ol = mtd["coverage"].sample().getOrientedLattice()
-        UB = ol.getUB().copy()
-
-        SetUB(Workspace="instrument", UB=UB)
-        SetUB(Workspace="crystal_plan", UB=UB)
-
-        self.UB = UB.copy()
-        self.d_min = d_min
-        self.d_max = 1.1 * np.max(
-            [ol.d(1, 0, 0), ol.d(0, 1, 0), ol.d(0, 0, 1)]
-        )
-        self.offset = len(use)
-
-        self.point_group = point_group
-        self.lattice_centering = lattice_centering
-        self.genes = {}
-
-        # rng seed ---------#
-        np.random.seed(13)  #
-        #####################
-
-    def generation(self, i, j):
-        axes = self.axes.copy()
-        limits = self.limits.copy()
-
-        ax = [None] * 6
-        angles = []
-        for ind, (axis, limit) in enumerate(zip(axes, limits)):
-            delta = limit[1] - limit[0]
-            angle = limit[0] + delta * np.random.random()
-            ax[ind] = axis.format(angle)
-            if not np.isclose(delta, 0):
-                angles.append(angle)
-
-        outname = "peaks_{}_{}".format(i, j)
-
-        self.genes[outname] = angles
-
-        SetGoniometer(
-            Workspace=self.instrument,
-            Axis0=ax[0],
-            Axis1=ax[1],
-            Axis2=ax[2],
-            Axis3=ax[3],
-            Axis4=ax[4],
-            Axis5=ax[5],
-        )
-
-        PredictPeaks(
-            InputWorkspace=self.instrument,
-            CalculateStructureFactors=False,
-            MinDSpacing=self.d_min,
-            MaxDSpacing=self.d_max,
-            WavelengthMin=self.wavelength[0],
-            WavelengthMax=self.wavelength[1],
-            ReflectionCondition="Primitive",
-            OutputWorkspace=outname,
-        )
-
-        for pk in mtd[outname]:
-            pk.setRunNumber(i + self.offset)
-            pk.setIntensity(100)
-            pk.setSigmaIntensity(10)
-
-    def initialization(self, n_orient, n_indiv):
-        fit = []
-        for j in range(n_indiv):
-            for i in range(n_orient):
-                self.generation(i, j)
-            self.recombination(n_orient, j)
-            fit.append(self.fitness("peaks_{}".format(j)))
-
-        return np.array(fit)
-
-    def recombination(self, n_orient, j):
-        individuals = "peaks_{}".format(j)
-        for i in range(n_orient):
-            genes = "peaks_{}_{}".format(i, j)
-            if i == 0:
-                CombinePeaksWorkspaces(
-                    LHSWorkspace="crystal_plan",
-                    RHSWorkspace=genes,
-                    OutputWorkspace=individuals,
-                )
-            else:
-                CombinePeaksWorkspaces(
-                    LHSWorkspace=individuals,
-                    RHSWorkspace=genes,
-                    OutputWorkspace=individuals,
-                )
-
-    def fitness(self, peaks):
-        output = CountReflections(
-            InputWorkspace=peaks,
-            PointGroup=self.point_group,
-            LatticeCentering=self.lattice_centering,
-            MinDSpacing=self.d_min,
-            MaxDSpacing=self.d_max,
-            MissingReflectionsWorkspace="",
-        )
-
-        unique, completeness, redundancy, multiple = output
-
-        return completeness * 100
-
-    def crossover(self, n_orient, n_elite, best, selection):
-        j = 0
-
-        genes = "peaks_{}_{}"
-        genome = "s_{}_{}"
-
-        workspaces = []
-
-        for elite in best:
-            for i in range(n_orient):
-                CloneWorkspace(
-                    InputWorkspace=genes.format(i, elite),
-                    OutputWorkspace=genome.format(i, j),
-                )
-
-                workspaces.append(genome.format(i, j))
-
-            j += 1
-
-        for parents in selection:
-            k = np.random.randint(1, n_orient)
-
-            for i in range(k):
-                CloneWorkspace(
-                    InputWorkspace=genes.format(i, parents[0]),
-                    OutputWorkspace=genome.format(i, j + 0),
-                )
-
-                CloneWorkspace(
-                    InputWorkspace=genes.format(i, parents[1]),
-                    OutputWorkspace=genome.format(i, j + 1),
-                )
-
-                workspaces.append(genome.format(i, j + 0))
-                workspaces.append(genome.format(i, j + 1))
-
-            for i in range(k, n_orient):
-                CloneWorkspace(
-                    InputWorkspace=genes.format(i, parents[1]),
-                    OutputWorkspace=genome.format(i, j + 0),
-                )
-
-                CloneWorkspace(
-                    InputWorkspace=genes.format(i, parents[0]),
-                    OutputWorkspace=genome.format(i, j + 1),
-                )
-
-                workspaces.append(genome.format(i, j + 0))
-                workspaces.append(genome.format(i, j + 1))
-
-            j += 2
-
-        RenameWorkspaces(InputWorkspaces=workspaces, Prefix="peak")
-
-    def mutation(self, n_orient, n_indiv, mutation_rate):
-        fit = []
-        for j in range(n_indiv):
-            for i in range(n_orient):
-                if np.random.random() < mutation_rate:
-                    self.generation(i, j)
-            self.recombination(n_orient, j)
-            fit.append(self.fitness("peaks_{}".format(j)))
-
-        return np.array(fit)
-
-    def optimize(self, n_orient, n_indiv, n_gener, n_elite, mutation_rate):
-        fit = self.initialization(n_orient, n_indiv)
-
-        ranking = np.argsort(fit)
-
-        for _ in range(n_gener):
-            ranking = np.argsort(fit)
+        UB = mtd["coverage"].sample().getOrientedLattice().getUB().copy()
 
-            best = ranking[-n_elite:]
+        d_max = 1.1 * np.max(d_spacing(UB, np.eye(3)))
 
-            fraction = fit / np.sum(fit)
+        pg, lc = self.get_symmetry(point_group, lattice_centering)
 
-            selection = []
+        symmetry = self.get_symmetry_matrices(pg)
 
-            while len(selection) < (n_indiv - n_elite) // 2:
-                selection.append(
-                    np.random.choice(
-                        np.arange(n_indiv), size=2, p=fraction, replace=False
-                    )
-                )
+        stats = ReflectionStatistics(UB, symmetry, lc, d_min, d_max)
 
-            self.crossover(n_orient, n_elite, best, selection)
+        keep = [
+            active and not optimized for active, optimized in zip(use, opt)
+        ]
 
-            fit = self.mutation(n_orient, n_indiv, mutation_rate)
+        peaks = self.peak_store.select(keep)
 
-        ranking = np.argsort(fit)
+        hkls = np.column_stack([peaks[col] for col in ["h", "k", "l"]])
 
-        j = ranking[-1]
+        observed = stats.key_indices(hkls)
 
-        values = []
-        for i in range(n_orient):
-            genes = "peaks_{}_{}".format(i, j)
-            values.append(self.genes[genes])
+        evaluator = CoverageEvaluator(
+            self.get_reflection_predictor(UB, d_min, d_max),
+            self.get_detector_footprint(),
+            stats,
+            self.axes_vectors,
+            self.axes_polarities,
+            wavelength,
+        )
 
-        CloneWorkspace(
-            InputWorkspace="peaks_{}".format(j), OutputWorkspace="combined"
+        self.gene_cache.bind(
+            (
+                self.instrument_cache_key,
+                UB.round(8).tobytes(),
+                d_min,
+                tuple(wavelength),
+                pg,
+                lc,
+                self.axes_vectors.tobytes(),
+                self.axes_polarities.tobytes(),
+            )
         )
 
-        return values
+        return optimizers[strategy](
+            evaluator,
+            limits,
+            observed[observed >= 0],
+            n_proc,
+            self.gene_cache,
+            seed,
+        )
@@ -0,0 +1,225 @@
+import collections
+
+import numpy as np
+
+from scipy.spatial.transform import Rotation
+
+
+def angular_coverage(limits, step):
+    """
+    Goniometer angles scanned along each axis.
+
+    The step is scaled by the number of free axes so that the number of
+    settings grows moderately with the number of free angles.
+
+    Parameters
+    ----------
+    limits : list of 2-element lists
+        Lower and upper limit of each axis in degrees.
+    step : float
+        Angular step in degrees.
+
+    Returns
+    -------
+    coverage : list of 1d arrays
+        Angles of each axis.
+
+    """
+
+    free = 0
+    for limit in limits:
+        free += 1 - np.isclose(limit[0], limit[1])
+    step *= free
+
+    coverage = []
+    for limit in limits:
+        coverage.append(np.arange(limit[0], limit[1] + step, step))
+
+    return coverage
+
+
+def compose_rotations(axes, polarities, angles):
+    """
+    Goniometer rotation matrices of a batch of settings.
+
+    Rotations of each axis are composed as quaternion products over the
+    whole batch, outermost axis first.
+
+    Parameters
+    ----------
+    axes : 2d array
+        Rotation axis unit vectors.
+    polarities : 1d array
+        Sense of rotation of each axis.
+    angles : 2d array
+        Angle of each axis for each setting in degrees.
+
+    Returns
+    -------
+    Rs : 3d array
+        Stack of rotation matrices.
+
+    """
+
+    axes = np.asarray(axes, dtype=float)
+    polarities = np.asarray(polarities, dtype=float)
+
+    rotation_vectors = np.deg2rad(angles * polarities)[..., None] * axes
+
+    R = Rotation.identity(len(angles))
+    for j in range(rotation_vectors.shape[1]):
+        R = R * Rotation.from_rotvec(rotation_vectors[:, j])
+
+    return R.as_matrix().reshape(-1, 3, 3)
+
+
+def iterate_rotations(axes, polarities, limits, step, chunk_size=65536):
+    """
+    Stream goniometer rotation matrices over the scanned settings.
+
+    Settings follow the order of an ``ij``-indexed meshgrid of the axis
+    angles and are generated per chunk from the flat setting index, so
+    only one chunk of matrices is held at a time.
+
+    Parameters
+    ----------
+    axes : 2d array
+        Rotation axis unit vectors.
+    polarities : 1d array
+        Sense of rotation of each axis.
+    limits : list of 2-element lists
+        Lower and upper limit of each axis in degrees.
+    step : float
+        Angular step in degrees.
+    chunk_size : int, optional
+        Number of settings per chunk. Default is 65536.
+
+    Yields
+    ------
+    Rs : 3d array
+        Stack of rotation matrices.
+    angles : 2d array
+        Angle of each axis for each setting in degrees.
+
+    """
+
+    coverage = angular_coverage(limits, step)
+
+    shape = [len(angles) for angles in coverage]
+
+    n = int(np.prod(shape))
+
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+
+        ind = np.unravel_index(np.arange(start, stop), shape)
+
+        angles = np.column_stack([c[i] for c, i in zip(coverage, ind)])
+
+        yield compose_rotations(axes, polarities, angles), angles
+
+
+class RotationCache:
+    """
+    Least recently used cache of goniometer rotation stacks.
+
+    Stacks are keyed by axes, polarities, limits and step and evicted
+    oldest first once their total size exceeds the memory budget. Scans
+    too large for the budget are streamed without being stored.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        Memory budget of the stored stacks. Default is 256 MiB.
+    chunk_size : int, optional
+        Number of settings per yielded chunk. Default is 65536.
+
+    """
+
+    def __init__(self, max_bytes=256 * 1024**2, chunk_size=65536):
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+
+        self.stacks = collections.OrderedDict()
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self.stacks)
+
+    def _key(self, axes, polarities, limits, step):
+        return (
+            tuple(np.asarray(axes, dtype=float).ravel().tolist()),
+            tuple(np.asarray(polarities, dtype=float).ravel().tolist()),
+            tuple(np.asarray(limits, dtype=float).ravel().tolist()),
+            float(step),
+        )
+
+    def _chunks(self, Rs, angles):
+        for start in range(0, len(angles), self.chunk_size):
+            stop = start + self.chunk_size
+            yield Rs[start:stop], angles[start:stop]
+
+    def clear(self):
+        self.stacks.clear()
+        self.nbytes = 0
+
+    def iterate(self, axes, polarities, limits, step):
+        """
+        Rotation matrices of the scanned settings in chunks.
+
+        Parameters
+        ----------
+        axes : 2d array
+            Rotation axis unit vectors.
+        polarities : 1d array
+            Sense of rotation of each axis.
+        limits : list of 2-element lists
+            Lower and upper limit of each axis in degrees.
+        step : float
+            Angular step in degrees.
+
+        Yields
+        ------
+        Rs : 3d array
+            Stack of rotation matrices.
+        angles : 2d array
+            Angle of each axis for each setting in degrees.
+
+        """
+
+        key = self._key(axes, polarities, limits, step)
+
+        stack = self.stacks.get(key)
+
+        if stack is not None:
+            self.stacks.move_to_end(key)
+            yield from self._chunks(*stack)
+            return
+
+        coverage = angular_coverage(limits, step)
+
+        n = int(np.prod([len(angles) for angles in coverage]))
+
+        nbytes = n * (9 + len(coverage)) * np.dtype(float).itemsize
+
+        chunks = iterate_rotations(
+            axes, polarities, limits, step, self.chunk_size
+        )
+
+        if nbytes > self.max_bytes:
+            yield from chunks
+            return
+
+        chunks = list(chunks)
+
+        Rs = np.concatenate([chunk[0] for chunk in chunks])
+        angles = np.concatenate([chunk[1] for chunk in chunks])
+
+        while self.nbytes + nbytes > self.max_bytes:
+            _, (old_Rs, old_angles) = self.stacks.popitem(last=False)
+            self.nbytes -= old_Rs.nbytes + old_angles.nbytes
+
+        self.stacks[key] = Rs, angles
+        self.nbytes += Rs.nbytes + angles.nbytes
+
+        yield from self._chunks(Rs, angles)
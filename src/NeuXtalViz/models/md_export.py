@@ -0,0 +1,272 @@
+import os
+
+import h5py
+
+import numpy as np
+
+export_formats = {
+    ".csv": "ascii",
+    ".txt": "ascii",
+    ".dat": "ascii",
+    ".npz": "npz",
+    ".h5": "hdf5",
+    ".hdf5": "hdf5",
+    ".nxs": "hdf5",
+}
+
+
+def histo_dimensions(signal, error_sq, edges, names, exclude_integrated=True):
+    """
+    Select the exported dimensions of a binned histogram.
+
+    Parameters
+    ----------
+    signal : nd array
+        Binned signal.
+    error_sq : nd array
+        Binned squared error.
+    edges : list of 1d arrays
+        Bin boundaries of each dimension.
+    names : list of str
+        Dimension names.
+    exclude_integrated : bool, optional
+        Drop integrated dimensions with a single bin. Default is `True`.
+
+    Returns
+    -------
+    signal, error_sq : nd arrays
+        Binned values without the excluded dimensions.
+    edges : list of 1d arrays
+        Bin boundaries of the remaining dimensions.
+    names : list of str
+        Remaining dimension names.
+
+    """
+
+    if exclude_integrated:
+        keep = [len(edge) > 2 for edge in edges]
+        axes = tuple(i for i, k in enumerate(keep) if not k)
+        signal = np.squeeze(signal, axis=axes)
+        error_sq = np.squeeze(error_sq, axis=axes)
+        edges = [edge for edge, k in zip(edges, keep) if k]
+        names = [name for name, k in zip(names, keep) if k]
+
+    return signal, error_sq, edges, names
+
+
+def iter_rows(signal, error_sq, edges, chunk_size=65536):
+    """
+    Yield blocks of intensity, error and bin center columns.
+
+    Coordinates are generated per block from the flat bin index so the
+    full coordinate grid is never materialised.
+
+    Parameters
+    ----------
+    signal : nd array
+        Binned signal.
+    error_sq : nd array
+        Binned squared error.
+    edges : list of 1d arrays
+        Bin boundaries of each dimension.
+    chunk_size : int, optional
+        Number of rows per block. Default is 65536.
+
+    Yields
+    ------
+    block : 2d array
+        Rows of intensity, error and coordinates.
+
+    """
+
+    centers = [0.5 * (edge[1:] + edge[:-1]) for edge in edges]
+
+    shape = signal.shape
+
+    for start in range(0, signal.size, chunk_size):
+        stop = min(start + chunk_size, signal.size)
+
+        ind = np.unravel_index(np.arange(start, stop), shape)
+
+        block = np.empty((stop - start, 2 + len(shape)))
+        block[:, 0] = signal[ind]
+        block[:, 1] = np.sqrt(error_sq[ind])
+        for i, (center, j) in enumerate(zip(centers, ind)):
+            block[:, 2 + i] = center[j]
+
+        yield block
+
+
+def save_ascii(
+    filename, signal, error_sq, edges, names, format="%.6e", chunk_size=65536
+):
+    """
+    Stream a histogram to an ASCII column file block by block.
+
+    Parameters
+    ----------
+    filename : str
+        Path to output file.
+    signal : nd array
+        Binned signal.
+    error_sq : nd array
+        Binned squared error.
+    edges : list of 1d arrays
+        Bin boundaries of each dimension.
+    names : list of str
+        Dimension names.
+    format : str, optional
+        Column format. Default is ``%.6e``.
+    chunk_size : int, optional
+        Number of rows per block. Default is 65536.
+
+    """
+
+    header = "# Intensity Error " + " ".join(names) + "\n"
+    header += "#  shape: " + "x".join(str(n) for n in signal.shape) + "\n"
+
+    row = " ".join([format] * (2 + signal.ndim)) + "\n"
+
+    with open(filename, "w") as f:
+        f.write(header)
+        for block in iter_rows(signal, error_sq, edges, chunk_size):
+            f.write((row * len(block)) % tuple(block.ravel()))
+
+
+def save_npz(filename, signal, error_sq, edges, names):
+    """
+    Save a histogram as gridded arrays in a NumPy archive.
+
+    Parameters
+    ----------
+    filename : str
+        Path to output file.
+    signal : nd array
+        Binned signal.
+    error_sq : nd array
+        Binned squared error.
+    edges : list of 1d arrays
+        Bin boundaries of each dimension.
+    names : list of str
+        Dimension names.
+
+    """
+
+    axes = {"D{}".format(i): edge for i, edge in enumerate(edges)}
+
+    np.savez(
+        filename,
+        signal=signal,
+        error=np.sqrt(error_sq),
+        names=np.array(names),
+        **axes,
+    )
+
+
+def save_hdf5(
+    filename, signal, error_sq, edges, names, columnar=False, chunk_size=65536
+):
+    """
+    Save a histogram to HDF5 as gridded arrays or streamed columns.
+
+    Parameters
+    ----------
+    filename : str
+        Path to output file.
+    signal : nd array
+        Binned signal.
+    error_sq : nd array
+        Binned squared error.
+    edges : list of 1d arrays
+        Bin boundaries of each dimension.
+    names : list of str
+        Dimension names.
+    columnar : bool, optional
+        Write one chunked 1d dataset per column instead of gridded arrays.
+        Default is `False`.
+    chunk_size : int, optional
+        Number of rows per block and dataset chunk. Default is 65536.
+
+    """
+
+    with h5py.File(filename, "w") as f:
+        if columnar:
+            n = signal.size
+            chunks = (min(chunk_size, n),)
+            columns = ["Intensity", "Error"]
+            columns += ["D{}".format(i) for i in range(len(edges))]
+            datasets = [
+                f.create_dataset(
+                    column, shape=(n,), dtype=float, chunks=chunks
+                )
+                for column in columns
+            ]
+            start = 0
+            for block in iter_rows(signal, error_sq, edges, chunk_size):
+                stop = start + len(block)
+                for i, dataset in enumerate(datasets):
+                    dataset[start:stop] = block[:, i]
+                start = stop
+            f.attrs["shape"] = signal.shape
+        else:
+            f.create_dataset("signal", data=signal)
+            f.create_dataset("error", data=np.sqrt(error_sq))
+
+        for i, (edge, name) in enumerate(zip(edges, names)):
+            dim = "D{}".format(i)
+            if columnar:
+                dim = "edges_" + dim
+            f.create_dataset(dim, data=edge)
+            f[dim].attrs["long_name"] = name
+
+
+def save_histo(
+    filename,
+    signal,
+    error_sq,
+    edges,
+    names,
+    fmt=None,
+    exclude_integrated=True,
+):
+    """
+    Export a histogram in the format given or implied by the extension.
+
+    Parameters
+    ----------
+    filename : str
+        Path to output file.
+    signal : nd array
+        Binned signal.
+    error_sq : nd array
+        Binned squared error.
+    edges : list of 1d arrays
+        Bin boundaries of each dimension.
+    names : list of str
+        Dimension names.
+    fmt : str, optional
+        One of ``ascii``, ``npz``, ``hdf5`` or ``columnar``. Default is
+        chosen from the file extension, falling back to ``ascii``.
+    exclude_integrated : bool, optional
+        Drop integrated dimensions with a single bin. Default is `True`.
+
+    """
+
+    if fmt is None:
+        ext = os.path.splitext(filename)[1].lower()
+        fmt = export_formats.get(ext, "ascii")
+
+    signal, error_sq, edges, names = histo_dimensions(
+        signal, error_sq, edges, names, exclude_integrated
+    )
+
+    if fmt == "ascii":
+        save_ascii(filename, signal, error_sq, edges, names)
+    elif fmt == "npz":
+        save_npz(filename, signal, error_sq, edges, names)
+    elif fmt == "hdf5":
+        save_hdf5(filename, signal, error_sq, edges, names)
+    elif fmt == "columnar":
+        save_hdf5(filename, signal, error_sq, edges, names, columnar=True)
+    else:
+        raise ValueError("Unknown export format {}".format(fmt))
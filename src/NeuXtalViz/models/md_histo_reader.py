@@ -0,0 +1,238 @@
+import h5py
+
+import numpy as np
+
+
+def lattice_B(a, b, c, alpha, beta, gamma):
+    """
+    Busing-Levy :math:`B`-matrix from lattice parameters.
+
+    Parameters
+    ----------
+    a, b, c : float
+        Lattice constants.
+    alpha, beta, gamma : float
+        Lattice angles in degrees.
+
+    Returns
+    -------
+    B : 3x3 element 2d array
+        Reciprocal lattice matrix.
+
+    """
+
+    alpha, beta, gamma = np.deg2rad([alpha, beta, gamma])
+
+    G = np.array(
+        [
+            [a * a, a * b * np.cos(gamma), a * c * np.cos(beta)],
+            [a * b * np.cos(gamma), b * b, b * c * np.cos(alpha)],
+            [a * c * np.cos(beta), b * c * np.cos(alpha), c * c],
+        ]
+    )
+
+    Gstar = np.linalg.inv(G)
+
+    a_, b_, c_ = np.sqrt(np.diag(Gstar))
+
+    alpha_ = np.arccos(Gstar[1, 2] / (b_ * c_))
+    beta_ = np.arccos(Gstar[0, 2] / (a_ * c_))
+    gamma_ = np.arccos(Gstar[0, 1] / (a_ * b_))
+
+    return np.array(
+        [
+            [a_, b_ * np.cos(gamma_), c_ * np.cos(beta_)],
+            [0, b_ * np.sin(gamma_), -c_ * np.sin(beta_) * np.cos(alpha)],
+            [0, 0, 1 / c],
+        ]
+    )
+
+
+class MDHistoReader:
+    """
+    Lazy reader of MDHistoWorkspace NeXus files written by ``SaveMD``.
+
+    Signal and squared error datasets are accessed directly from the HDF5
+    file, memory-mapped when stored contiguously and read in chunks
+    otherwise. Only the compacted region is ever held in memory.
+
+    Parameters
+    ----------
+    filename : str
+        Path to NeXus file.
+    chunk_size : int, optional
+        Number of planes read per streaming pass. Default is 16.
+
+    """
+
+    def __init__(self, filename, chunk_size=16):
+        self.filename = filename
+        self.chunk_size = chunk_size
+
+        with h5py.File(filename, "r") as f:
+            self.root = self._find_root(f)
+
+            data = f[self.root]["data"]
+
+            n_dims = data["signal"].ndim
+
+            self.edges, self.names, self.units = [], [], []
+
+            for d in range(n_dims):
+                name = "D{}".format(d)
+                dim = data[name]
+                self.edges.append(dim[()].astype(float))
+                self.names.append(self._attribute(dim, "long_name") or name)
+                self.units.append(self._attribute(dim, "units"))
+
+            self.lattice = self._read_lattice(f[self.root])
+            self.W = self._read_W(f[self.root])
+
+    def _find_root(self, f):
+        for key in f.keys():
+            group = f[key]
+            if isinstance(group, h5py.Group) and "data" in group:
+                if "signal" in group["data"]:
+                    return key
+
+        raise KeyError("No MDHistoWorkspace data in {}".format(self.filename))
+
+    def _attribute(self, dataset, name):
+        value = dataset.attrs.get(name, "")
+        if isinstance(value, bytes):
+            value = value.decode()
+        return str(value)
+
+    def _read_lattice(self, group):
+        path = "experiment0/sample/oriented_lattice"
+
+        if path in group:
+            ol = group[path]
+            keys = ["a", "b", "c", "alpha", "beta", "gamma"]
+            return [np.ravel(ol["unit_cell_" + key])[0] for key in keys]
+
+    def _read_W(self, group):
+        path = "experiment0/logs/W_MATRIX/value"
+
+        if path in group:
+            return group[path][()].astype(float).reshape(3, 3)
+
+    def _dataset(self, f, name):
+        dataset = f[self.root]["data"][name]
+
+        offset = dataset.id.get_offset()
+
+        if dataset.chunks is None and offset is not None:
+            return np.memmap(
+                self.filename,
+                dtype=dataset.dtype,
+                mode="r",
+                offset=offset,
+                shape=dataset.shape,
+            )
+
+        return dataset
+
+    def _read_crop(self, f, name, crop):
+        data = self._dataset(f, name)[crop]
+
+        if isinstance(data, np.memmap):
+            return np.array(data, dtype=float)
+
+        return data.astype(float, copy=False)
+
+    def compact_bounds(self):
+        """
+        Bounding box of finite non-zero bins computed in streaming passes.
+
+        Returns
+        -------
+        bounds : list of 2-element tuples
+            Lower and upper (exclusive) bin index along each dimension.
+
+        """
+
+        with h5py.File(self.filename, "r") as f:
+            signal = self._dataset(f, "signal")
+            error_sq = self._dataset(f, "errors_squared")
+
+            n_planes = signal.shape[0]
+
+            occupied = [np.zeros(n, dtype=bool) for n in signal.shape]
+
+            for start in range(0, n_planes, self.chunk_size):
+                stop = min(start + self.chunk_size, n_planes)
+
+                sig = np.asarray(signal[start:stop])
+                err = np.asarray(error_sq[start:stop])
+
+                mask = np.isfinite(sig) & np.isfinite(err) & (sig != 0)
+
+                occupied[0][start:stop] |= mask.any(axis=(1, 2))
+                occupied[1] |= mask.any(axis=(0, 2))
+                occupied[2] |= mask.any(axis=(0, 1))
+
+        bounds = []
+        for occ in occupied[::-1]:
+            ind = np.flatnonzero(occ)
+            if len(ind) == 0:
+                bounds.append((0, len(occ)))
+            else:
+                bounds.append((int(ind[0]), int(ind[-1]) + 1))
+
+        return bounds
+
+    def read(self, bounds=None):
+        """
+        Read the masked signal and squared error within bounds.
+
+        Non-finite bins are set to zero. Arrays are indexed in dimension
+        order as returned by ``getSignalArray``.
+
+        Parameters
+        ----------
+        bounds : list of 2-element tuples, optional
+            Bin index limits of each dimension. Default is everything.
+
+        Returns
+        -------
+        signal, error_sq : 3d arrays
+            Masked signal and squared error.
+        edges : list of 1d arrays
+            Bin boundaries of each dimension.
+
+        """
+
+        if bounds is None:
+            bounds = [(0, len(edge) - 1) for edge in self.edges]
+
+        crop = tuple(slice(lo, hi) for lo, hi in bounds[::-1])
+
+        with h5py.File(self.filename, "r") as f:
+            signal = self._read_crop(f, "signal", crop)
+            error_sq = self._read_crop(f, "errors_squared", crop)
+
+        mask = ~(np.isfinite(signal) & np.isfinite(error_sq))
+
+        signal[mask] = 0
+        error_sq[mask] = 0
+
+        edges = [
+            edge[lo : hi + 1] for edge, (lo, hi) in zip(self.edges, bounds)
+        ]
+
+        return signal.T, error_sq.T, edges
+
+    def get_B(self):
+        """
+        Reciprocal lattice matrix from the stored oriented lattice.
+
+        Returns
+        -------
+        B : 3x3 element 2d array or None
+            :math:`B`-matrix if an oriented lattice exists.
+
+        """
+
+        if self.lattice is not None:
+            return lattice_B(*self.lattice)
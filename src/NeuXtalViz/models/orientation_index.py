@@ -0,0 +1,273 @@
+import numpy as np
+
+from NeuXtalViz.models.detector_footprint import scattering_angles
+
+
+class OrientationIndex:
+    """
+    Streamed reciprocal bases of a scan of goniometer settings.
+
+    The lab frame scattering vector of a reflection at every setting is
+    one matrix product with the rotated reciprocal basis. Bases are formed
+    one chunk of settings at a time, and only the beam component is used
+    to find the settings within the wavelength band, so the full vectors
+    and the detector test are evaluated for those alone. Only the sparse
+    observations of each chunk are kept, so memory does not grow with the
+    number of settings.
+
+    Parameters
+    ----------
+    UB : 2d array
+        Sample orientation matrix.
+    chunks : callable
+        Returns an iterable of rotation matrix stacks and the angle of
+        each axis for each of their settings in degrees, such as
+        ``RotationCache.iterate``.
+
+    """
+
+    def __init__(self, UB, chunks):
+        self.UB = np.array(UB, dtype=float)
+        self.chunks = chunks
+
+    def iterate(self):
+        """
+        Rotated reciprocal bases of each chunk of settings.
+
+        Yields
+        ------
+        offset : int
+            Index of the first setting of the chunk.
+        bases : 3d array
+            Rotated reciprocal basis of each setting.
+        angles : 2d array
+            Angle of each axis for each setting in degrees.
+
+        """
+
+        offset = 0
+
+        for Rs, angles in self.chunks():
+            bases = 2 * np.pi * np.einsum("kij,jl->kil", Rs, self.UB)
+
+            yield offset, bases, angles
+
+            offset += len(angles)
+
+    def admissible(self, bases, hkls, wavelength):
+        """
+        Settings of a chunk bringing each reflection into the band.
+
+        Parameters
+        ----------
+        bases : 3d array
+            Rotated reciprocal basis of each setting.
+        hkls : 2d array
+            Miller indices of each reflection.
+        wavelength : 2-element list
+            Wavelength band.
+
+        Returns
+        -------
+        mask : 2d array of bool
+            Whether each reflection is in the band at each setting.
+
+        """
+
+        Q_sq = np.sum((2 * np.pi * hkls @ self.UB.T) ** 2, axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            lamda = (bases[:, 2, :] @ hkls.T) * (-4 * np.pi / Q_sq)
+
+        return (lamda > wavelength[0]) & (lamda < wavelength[1])
+
+    def observe(self, bases, hkls, mask, footprint):
+        """
+        Detector observations of admissible reflections in a chunk.
+
+        Parameters
+        ----------
+        bases : 3d array
+            Rotated reciprocal basis of each setting.
+        hkls : 2d array
+            Miller indices of each reflection.
+        mask : 2d array of bool
+            Settings to test for each reflection.
+        footprint : DetectorFootprint or FootprintRaster
+            Detector ray classifier.
+
+        Returns
+        -------
+        settings, reflections : 1d arrays of int
+            Setting and reflection index of each observation ordered by
+            setting.
+        gamma, nu, lamda : 1d arrays
+            Scattering angles and wavelength of each observation.
+
+        """
+
+        s, i = np.nonzero(mask)
+
+        Q_lab = np.einsum("nij,nj->ni", bases[s], hkls[i])
+
+        lamda = -4 * np.pi * Q_lab[:, 2] / np.sum(Q_lab**2, axis=1)
+
+        kf = Q_lab
+        kf[:, 2] += 2 * np.pi / lamda
+
+        hit = footprint.hit(kf)
+
+        gamma, nu = scattering_angles(kf[hit])
+
+        return s[hit], i[hit], gamma, nu, lamda[hit]
+
+    def reflections(self, hkls, wavelength, footprint):
+        """
+        Goniometer settings observing any of several reflections.
+
+        Parameters
+        ----------
+        hkls : 2d array
+            Miller indices of each reflection.
+        wavelength : 2-element list
+            Wavelength band.
+        footprint : DetectorFootprint or FootprintRaster
+            Detector ray classifier.
+
+        Returns
+        -------
+        settings : 2d array
+            Goniometer angles of each observation ordered by reflection.
+        gamma, nu, lamda : 1d arrays
+            Scattering angles and wavelength of each observation.
+
+        """
+
+        hkls = np.array(hkls, dtype=float).reshape(-1, 3)
+
+        found = []
+
+        for offset, bases, angles in self.iterate():
+            mask = self.admissible(bases, hkls, wavelength)
+
+            s, i, *values = self.observe(bases, hkls, mask, footprint)
+
+            found.append((offset + s, i, angles[s], *values))
+
+        s, i, settings, gamma, nu, lamda = join_observations(found, 6)
+
+        order = np.lexsort((s, i))
+
+        return settings[order], (gamma[order], nu[order], lamda[order])
+
+    def pairs(self, hkls_1, hkls_2, wavelength, footprint):
+        """
+        Goniometer settings observing pairs of reflections together.
+
+        Settings of each chunk are first restricted to those where both
+        reflections of some pair are in the wavelength band, so the
+        detector is only tested for rays that can still form a pair.
+
+        Parameters
+        ----------
+        hkls_1, hkls_2 : 2d arrays
+            Miller indices of the first and second reflections of pairs.
+        wavelength : 2-element list
+            Wavelength band.
+        footprint : DetectorFootprint or FootprintRaster
+            Detector ray classifier.
+
+        Returns
+        -------
+        settings : 2d array
+            Goniometer angles of each observation ordered by pair.
+        values_1, values_2 : 3-element tuples of 1d arrays
+            Scattering angles and wavelength of both reflections.
+
+        """
+
+        hkls_1 = np.array(hkls_1, dtype=float).reshape(-1, 3)
+        hkls_2 = np.array(hkls_2, dtype=float).reshape(-1, 3)
+
+        n_1, n_2 = len(hkls_1), len(hkls_2)
+
+        found = []
+
+        for offset, bases, angles in self.iterate():
+            mask_1 = self.admissible(bases, hkls_1, wavelength)
+            mask_2 = self.admissible(bases, hkls_2, wavelength)
+
+            joint = mask_1.any(axis=1) & mask_2.any(axis=1)
+
+            mask_1 &= joint[:, np.newaxis]
+            mask_2 &= joint[:, np.newaxis]
+
+            s_1, i_1, *values_1 = self.observe(
+                bases, hkls_1, mask_1, footprint
+            )
+            s_2, i_2, *values_2 = self.observe(
+                bases, hkls_2, mask_2, footprint
+            )
+
+            rows = np.intersect1d(s_1, s_2)
+
+            hit_1 = np.zeros((len(rows), n_1), dtype=bool)
+            hit_2 = np.zeros((len(rows), n_2), dtype=bool)
+
+            keep_1 = np.isin(s_1, rows)
+            keep_2 = np.isin(s_2, rows)
+
+            hit_1[np.searchsorted(rows, s_1[keep_1]), i_1[keep_1]] = True
+            hit_2[np.searchsorted(rows, s_2[keep_2]), i_2[keep_2]] = True
+
+            r, i, j = np.nonzero(
+                hit_1[:, :, np.newaxis] & hit_2[:, np.newaxis]
+            )
+
+            s = rows[r]
+
+            k_1 = np.searchsorted(s_1 * n_1 + i_1, s * n_1 + i)
+            k_2 = np.searchsorted(s_2 * n_2 + i_2, s * n_2 + j)
+
+            found.append(
+                (
+                    offset + s,
+                    i,
+                    j,
+                    angles[s],
+                    *[value[k_1] for value in values_1],
+                    *[value[k_2] for value in values_2],
+                )
+            )
+
+        s, i, j, settings, *values = join_observations(found, 10)
+
+        order = np.lexsort((s, j, i))
+
+        values = [value[order] for value in values]
+
+        return settings[order], tuple(values[:3]), tuple(values[3:])
+
+
+def join_observations(found, n):
+    """
+    Join the observations of every chunk.
+
+    Parameters
+    ----------
+    found : list of tuples of arrays
+        Observation arrays of each chunk.
+    n : int
+        Number of arrays per chunk.
+
+    Returns
+    -------
+    arrays : list of arrays
+        Observation arrays of all chunks.
+
+    """
+
+    if len(found) == 0:
+        return [np.empty(0)] * n
+
+    return [np.concatenate(arrays) for arrays in zip(*found)]
@@ -0,0 +1,167 @@
+import numpy as np
+
+peak_dtype = np.dtype(
+    [
+        ("h", np.int32),
+        ("k", np.int32),
+        ("l", np.int32),
+        ("d", float),
+        ("wavelength", float),
+        ("run", np.int32),
+        ("detector", np.int64),
+    ]
+)
+
+
+class PeakStore:
+    """
+    Columnar store of predicted reflections grouped by orientation.
+
+    Each orientation keeps its own structured array of reflections, so
+    adding or replacing an orientation never copies the others. The
+    combined table is concatenated on demand and cached until the next
+    change.
+
+    """
+
+    def __init__(self):
+        self.orientations = []
+        self._peaks = None
+
+    def __len__(self):
+        return len(self.orientations)
+
+    def add(self, run, peaks):
+        """
+        Set the reflections of an orientation.
+
+        Parameters
+        ----------
+        run : int
+            Orientation index. An existing orientation is replaced, and
+            orientations are appended up to this index if needed.
+        peaks : structured array
+            Reflections with ``peak_dtype`` fields.
+
+        """
+
+        peaks = np.array(peaks, dtype=peak_dtype)
+        peaks["run"] = run
+
+        while len(self.orientations) <= run:
+            self.orientations.append(np.zeros(0, dtype=peak_dtype))
+
+        self.orientations[run] = peaks
+        self._peaks = None
+
+    def restore(self, peaks, n_runs):
+        """
+        Replace all orientations with previously predicted reflections.
+
+        Parameters
+        ----------
+        peaks : structured array
+            Reflections of all orientations with ``peak_dtype`` fields.
+        n_runs : int
+            Number of orientations.
+
+        """
+
+        peaks = np.array(peaks, dtype=peak_dtype)
+        peaks = peaks[np.argsort(peaks["run"], kind="stable")]
+
+        bounds = np.searchsorted(peaks["run"], np.arange(n_runs + 1))
+
+        self.orientations = [
+            peaks[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+        self._peaks = None
+
+    def orientation(self, run):
+        """
+        Reflections of one orientation.
+
+        Parameters
+        ----------
+        run : int
+            Orientation index.
+
+        Returns
+        -------
+        peaks : structured array
+            Reflections of the orientation.
+
+        """
+
+        if run < len(self.orientations):
+            return self.orientations[run]
+
+        return np.zeros(0, dtype=peak_dtype)
+
+    @property
+    def peaks(self):
+        """
+        Reflections of all orientations.
+
+        """
+
+        if self._peaks is None:
+            self._peaks = self.select()
+
+        return self._peaks
+
+    def select(self, use=None):
+        """
+        Reflections of the selected orientations.
+
+        Parameters
+        ----------
+        use : list of bool, optional
+            Orientations to include. Default is all.
+
+        Returns
+        -------
+        peaks : structured array
+            Reflections of the selected orientations.
+
+        """
+
+        if use is None:
+            use = [True] * len(self.orientations)
+
+        blocks = [
+            peaks for peaks, active in zip(self.orientations, use) if active
+        ]
+
+        if len(blocks) == 0:
+            return np.zeros(0, dtype=peak_dtype)
+
+        return np.concatenate(blocks)
+
+    def delete(self, runs):
+        """
+        Remove orientations and renumber the remaining ones.
+
+        Parameters
+        ----------
+        runs : list of int
+            Orientation indices to remove.
+
+        """
+
+        runs = set(runs)
+
+        self.orientations = [
+            peaks
+            for run, peaks in enumerate(self.orientations)
+            if run not in runs
+        ]
+
+        for run, peaks in enumerate(self.orientations):
+            peaks["run"] = run
+
+        self._peaks = None
+
+    def clear(self):
+        self.orientations = []
+        self._peaks = None
@@ -0,0 +1,190 @@
+import numpy as np
+
+
+def crop_occupied(occupied):
+    """
+    Bounding box of the occupied bins of a volume.
+
+    Parameters
+    ----------
+    occupied : 3d array of bool
+        Whether each bin has data.
+
+    Returns
+    -------
+    crop : 3-element tuple of slice
+        Slices of the smallest box containing every occupied bin.
+
+    """
+
+    crop = []
+    for i in range(3):
+        other = tuple(j for j in range(3) if j != i)
+        ind = np.flatnonzero(occupied.any(axis=other))
+        crop.append(slice(ind[0], ind[-1] + 1) if len(ind) else slice(0, 0))
+
+    return tuple(crop)
+
+
+def histogram_percentile(hist, edges, percentile):
+    """
+    Percentile of values summarized by a histogram.
+
+    Parameters
+    ----------
+    hist : 1d array of int
+        Number of values in each bin.
+    edges : 1d array
+        Bin edges.
+    percentile : float
+        Percentile between 0 and 100.
+
+    Returns
+    -------
+    value : float
+        Upper edge of the bin containing the percentile.
+
+    """
+
+    cumulative = np.cumsum(hist)
+
+    rank = percentile / 100 * cumulative[-1]
+
+    return edges[np.searchsorted(cumulative, rank, side="left") + 1]
+
+
+def coarsen_volume(signal, axes, factor):
+    """
+    Histogram with bins summed in cubic blocks.
+
+    Parameters
+    ----------
+    signal : 3d array
+        Histogram signal.
+    axes : 3-element list of 1d arrays
+        Bin centers along each axis.
+    factor : int
+        Number of bins merged along each axis. Trailing bins that do not
+        fill a block are dropped.
+
+    Returns
+    -------
+    signal : 3d array
+        Coarse histogram signal.
+    axes : 3-element list of 1d arrays
+        Bin centers of the coarse histogram.
+
+    """
+
+    n = [size // factor for size in signal.shape]
+
+    blocks = signal[: n[0] * factor, : n[1] * factor, : n[2] * factor]
+
+    signal = blocks.reshape(n[0], factor, n[1], factor, n[2], factor).sum(
+        axis=(1, 3, 5)
+    )
+
+    axes = [
+        np.asarray(axis)[: m * factor].reshape(m, factor).mean(axis=1)
+        for axis, m in zip(axes, n)
+    ]
+
+    return signal, axes
+
+
+def normalize_volume(
+    signal, axes, Q_max, percentile=90, bins=1024, slab_size=16
+):
+    """
+    Logarithmic 8-bit display volume of a Q-sample histogram.
+
+    The volume is cropped to its occupied bins and copied once to single
+    precision. Slabs of the copy are then masked beyond the maximum |Q|,
+    with the radius from the broadcast bin centers, and replaced by their
+    logarithm. The threshold percentile is read from a histogram of the
+    logarithms, and each slab is quantized into the output. Bins that are
+    empty, beyond the maximum |Q| or below the threshold are zero.
+
+    Parameters
+    ----------
+    signal : 3d array
+        Histogram signal, which is not modified.
+    axes : 3-element list of 1d arrays
+        Bin centers along each axis.
+    Q_max : float
+        Maximum |Q| kept in the volume.
+    percentile : float, optional
+        Percentile of the occupied bins below which bins are dropped.
+        Default is 90.
+    bins : int, optional
+        Number of histogram bins of the percentile. Default is 1024.
+    slab_size : int, optional
+        Number of planes along the first axis processed at once. Default
+        is 16.
+
+    Returns
+    -------
+    volume : 3d array of uint8
+        Cropped display volume.
+    axes : 3-element list of 1d arrays
+        Bin centers of the cropped volume.
+
+    """
+
+    crop = crop_occupied(signal > 0)
+
+    data = np.array(signal[crop], dtype=np.float32)
+
+    x, y, z = [np.asarray(axis)[sl] for axis, sl in zip(axes, crop)]
+
+    yz_sq = y[:, np.newaxis] ** 2 + z**2
+
+    slabs = [
+        slice(start, start + slab_size)
+        for start in range(0, len(x), slab_size)
+    ]
+
+    lo, hi = np.inf, -np.inf
+
+    for sl in slabs:
+        block = data[sl]
+
+        valid = block > 0
+        valid &= x[sl, np.newaxis, np.newaxis] ** 2 + yz_sq <= Q_max**2
+
+        np.log10(block, out=block, where=valid)
+        block[~valid] = np.nan
+
+        if valid.any():
+            lo = min(lo, np.nanmin(block))
+            hi = max(hi, np.nanmax(block))
+
+    volume = np.zeros(data.shape, dtype=np.uint8)
+
+    if not lo < hi:
+        volume[np.isfinite(data)] = 255
+        return volume, [x, y, z]
+
+    hist = np.zeros(bins, dtype=np.int64)
+
+    for sl in slabs:
+        hist += np.histogram(data[sl], bins=bins, range=(lo, hi))[0]
+
+    edges = np.linspace(lo, hi, bins + 1)
+
+    threshold = histogram_percentile(hist, edges, percentile)
+
+    scale = 255 / (hi - threshold) if hi > threshold else 0
+
+    for sl in slabs:
+        block = data[sl]
+
+        keep = block > threshold
+
+        block -= threshold
+        block *= scale
+        np.rint(block, out=block)
+
+        np.copyto(volume[sl], block, casting="unsafe", where=keep)
+
+    return volume, [x, y, z]
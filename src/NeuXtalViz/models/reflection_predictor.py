@@ -0,0 +1,153 @@
+import numpy as np
+
+from NeuXtalViz.models.peak_store import peak_dtype
+
+
+def d_spacing(UB, hkls):
+    """
+    Interplanar spacing of reflections.
+
+    Parameters
+    ----------
+    UB : 3x3 element 2d array
+        Orientation matrix.
+    hkls : 2d array
+        Miller indices.
+
+    Returns
+    -------
+    d : 1d array
+        Interplanar spacing.
+
+    """
+
+    q = np.einsum("ij,nj->ni", UB, hkls)
+
+    with np.errstate(divide="ignore"):
+        return 1 / np.linalg.norm(q, axis=1)
+
+
+def enumerate_reflections(UB, d_min, d_max):
+    """
+    All reflections within a range of interplanar spacing.
+
+    Parameters
+    ----------
+    UB : 3x3 element 2d array
+        Orientation matrix.
+    d_min, d_max : float
+        Interplanar spacing limits.
+
+    Returns
+    -------
+    hkls : 2d array of int
+        Miller indices.
+    d : 1d array
+        Interplanar spacing.
+
+    """
+
+    h_max = np.floor(np.linalg.norm(np.linalg.inv(UB), axis=1) / d_min)
+
+    ranges = [np.arange(-n, n + 1) for n in h_max.astype(int)]
+
+    grid = np.meshgrid(*ranges, indexing="ij")
+
+    hkls = np.stack(grid, axis=-1).reshape(-1, 3)
+    hkls = hkls[np.any(hkls != 0, axis=1)]
+
+    d = d_spacing(UB, hkls)
+
+    mask = (d >= d_min) & (d <= d_max)
+
+    return hkls[mask], d[mask]
+
+
+class ReflectionPredictor:
+    """
+    Vectorized prediction of reflections observed at a goniometer setting.
+
+    Reflections within the interplanar spacing limits are enumerated once
+    per orientation matrix. Each prediction rotates them into the
+    laboratory frame, keeps those inside the wavelength band and tests
+    the scattered rays against the detector footprint.
+
+    Parameters
+    ----------
+    UB : 3x3 element 2d array
+        Orientation matrix.
+    d_min, d_max : float
+        Interplanar spacing limits.
+
+    """
+
+    def __init__(self, UB, d_min, d_max):
+        self.UB = np.array(UB, dtype=float)
+        self.d_min = d_min
+        self.d_max = d_max
+
+        self.hkls, self.d = enumerate_reflections(self.UB, d_min, d_max)
+
+        self.Q_sample = 2 * np.pi * np.einsum("ij,nj->ni", self.UB, self.hkls)
+
+    def matches(self, UB, d_min, d_max):
+        """
+        Whether the predictor was built for these parameters.
+
+        """
+
+        return (
+            np.allclose(self.UB, UB)
+            and np.isclose(self.d_min, d_min)
+            and np.isclose(self.d_max, d_max)
+        )
+
+    def predict(self, R, wavelength, footprint):
+        """
+        Reflections observed at a goniometer setting.
+
+        Parameters
+        ----------
+        R : 3x3 element 2d array
+            Goniometer rotation matrix.
+        wavelength : 2-element list
+            Wavelength band.
+        footprint : DetectorFootprint
+            Detector ray classifier.
+
+        Returns
+        -------
+        peaks : structured array
+            Observed reflections in descending interplanar spacing.
+
+        """
+
+        Q_lab = np.einsum("ij,nj->ni", R, self.Q_sample)
+
+        Q_sq = np.sum(self.Q_sample**2, axis=1)
+
+        lamda = -4 * np.pi * Q_lab[:, 2] / Q_sq
+
+        mask = (lamda > wavelength[0]) & (lamda < wavelength[1])
+
+        k = 2 * np.pi / lamda[mask]
+
+        kf = Q_lab[mask]
+        kf[:, 2] += k
+
+        pixels = footprint.pixels(kf)
+        hit = pixels >= 0
+
+        ind = np.flatnonzero(mask)[hit]
+
+        peaks = np.zeros(len(ind), dtype=peak_dtype)
+        peaks["h"], peaks["k"], peaks["l"] = self.hkls[ind].T
+        peaks["d"] = self.d[ind]
+        peaks["wavelength"] = lamda[ind]
+        peaks["detector"] = footprint.det_ID[pixels[hit]]
+
+        keys = [-peaks[col] for col in ["l", "k", "h", "d"]]
+
+        sort = np.lexsort(keys)
+
+        return peaks[sort]
@@ -0,0 +1,611 @@
+import numpy as np
+
+from NeuXtalViz.models.reflection_predictor import enumerate_reflections
+
+offset = 2**16
+
+
+def centering_mask(hkls, centering):
+    """
+    Reflections allowed by a lattice centering.
+
+    Parameters
+    ----------
+    hkls : 2d array of int
+        Miller indices.
+    centering : str
+        Lattice centering symbol.
+
+    Returns
+    -------
+    mask : 1d array of bool
+        Whether each reflection is allowed.
+
+    """
+
+    h, k, l = np.asarray(hkls, dtype=int).T
+
+    if centering == "I":
+        return (h + k + l) % 2 == 0
+    elif centering == "F":
+        return (h % 2 == k % 2) & (k % 2 == l % 2)
+    elif centering == "C":
+        return (h + k) % 2 == 0
+    elif centering == "A":
+        return (k + l) % 2 == 0
+    elif centering == "B":
+        return (h + l) % 2 == 0
+    elif centering == "Robv":
+        return (-h + k + l) % 3 == 0
+    elif centering == "Rrev":
+        return (h - k + l) % 3 == 0
+
+    return np.ones(len(h), dtype=bool)
+
+
+def encode(hkls):
+    """
+    Integer code of Miller indices ordered lexicographically.
+
+    """
+
+    h, k, l = (np.asarray(hkls, dtype=np.int64) + offset).T
+
+    return (h * 2 * offset + k) * 2 * offset + l
+
+
+def decode(codes):
+    """
+    Miller indices of integer codes.
+
+    """
+
+    codes = np.asarray(codes, dtype=np.int64)
+
+    l = codes % (2 * offset)
+    k = codes // (2 * offset) % (2 * offset)
+    h = codes // (2 * offset) ** 2
+
+    return np.column_stack([h, k, l]) - offset
+
+
+def equivalents(hkls, symmetry):
+    """
+    Symmetry equivalents of reflections.
+
+    Parameters
+    ----------
+    hkls : 2d array of int
+        Miller indices.
+    symmetry : 3d array of int
+        Point group operations acting on Miller indices.
+
+    Returns
+    -------
+    hkls : 3d array of int
+        Equivalents of each reflection under each operation.
+
+    """
+
+    return np.einsum("sij,nj->nsi", symmetry, hkls)
+
+
+def canonical_codes(hkls, symmetry, chunk_size=16384):
+    """
+    Asymmetric unit key of reflections.
+
+    The key is the code of the lexicographically largest equivalent, so
+    all members of an orbit share the same key. Reflections are processed
+    in chunks, so the equivalents of only one chunk are held at a time.
+
+    Parameters
+    ----------
+    hkls : 2d array of int
+        Miller indices.
+    symmetry : 3d array of int
+        Point group operations acting on Miller indices.
+    chunk_size : int, optional
+        Number of reflections processed at once. Default is 16384.
+
+    Returns
+    -------
+    codes : 1d array of int
+        Canonical code of each reflection.
+
+    """
+
+    hkls = np.asarray(hkls, dtype=np.int64).reshape(-1, 3)
+
+    codes = np.empty(len(hkls), dtype=np.int64)
+
+    for start in range(0, len(hkls), chunk_size):
+        chunk = hkls[start : start + chunk_size]
+
+        codes[start : start + chunk_size] = (
+            encode(equivalents(chunk, symmetry).reshape(-1, 3))
+            .reshape(len(chunk), -1)
+            .max(axis=1)
+        )
+
+    return codes
+
+
+def d_shells(d_min, d_max, n_shells):
+    """
+    Resolution shell limits spaced linearly in 1/d².
+
+    Parameters
+    ----------
+    d_min, d_max : float
+        Interplanar spacing limits.
+    n_shells : int
+        Number of shells.
+
+    Returns
+    -------
+    d : 1d array
+        Descending shell boundaries.
+
+    """
+
+    return 1 / np.sqrt(np.linspace(1 / d_max**2, 1 / d_min**2, n_shells + 1))
+
+
+class ReflectionStatistics:
+    """
+    Completeness and redundancy of observed reflections.
+
+    All reflections allowed by the centering within the spacing limits
+    are reduced once to asymmetric unit keys. Observations are then
+    counted per key with a single sorted lookup and ``bincount``, from
+    which every resolution shell follows by weighted bin counts.
+
+    Parameters
+    ----------
+    UB : 3x3 element 2d array
+        Orientation matrix.
+    symmetry : 3d array of int
+        Point group operations acting on Miller indices.
+    centering : str
+        Lattice centering symbol.
+    d_min, d_max : float
+        Interplanar spacing limits.
+    n_shells : int, optional
+        Number of resolution shells. Default is 4.
+
+    """
+
+    def __init__(self, UB, symmetry, centering, d_min, d_max, n_shells=4):
+        self.symmetry = np.asarray(symmetry, dtype=np.int64)
+        self.centering = centering
+
+        hkls, d = enumerate_reflections(UB, d_min, d_max)
+
+        mask = centering_mask(hkls, centering)
+
+        codes = canonical_codes(hkls[mask], self.symmetry)
+
+        self.keys, ind = np.unique(codes, return_index=True)
+        self.d = d[mask][ind]
+
+        self.shells = d_shells(d_min, d_max, n_shells)
+
+        shell = np.searchsorted(-self.shells, -self.d, side="right") - 1
+        self.shell = np.clip(shell, 0, n_shells - 1)
+
+        self.n_shells = n_shells
+
+    def key_indices(self, hkls):
+        """
+        Index into the asymmetric unit keys of each reflection.
+
+        Parameters
+        ----------
+        hkls : 2d array of int
+            Miller indices.
+
+        Returns
+        -------
+        ind : 1d array of int
+            Key index or -1 for reflections outside the allowed set.
+
+        """
+
+        hkls = np.asarray(hkls, dtype=np.int64).reshape(-1, 3)
+
+        ind = np.full(len(hkls), -1, dtype=int)
+
+        if len(hkls) == 0 or len(self.keys) == 0:
+            return ind
+
+        mask = centering_mask(hkls, self.centering)
+
+        codes = canonical_codes(hkls[mask], self.symmetry)
+
+        pos = np.searchsorted(self.keys, codes)
+        pos[pos == len(self.keys)] = 0
+
+        found = self.keys[pos] == codes
+
+        ind[np.flatnonzero(mask)[found]] = pos[found]
+
+        return ind
+
+    def counts(self, hkls):
+        """
+        Number of observations of each asymmetric unit key.
+
+        Parameters
+        ----------
+        hkls : 2d array of int
+            Miller indices of observed reflections.
+
+        Returns
+        -------
+        counts : 1d array of int
+            Observations per key.
+
+        """
+
+        ind = self.key_indices(hkls)
+
+        return np.bincount(ind[ind >= 0], minlength=len(self.keys))
+
+    def statistics(self, counts):
+        """
+        Overall and per-shell statistics of key observation counts.
+
+        Parameters
+        ----------
+        counts : 1d array of int
+            Observations per key.
+
+        Returns
+        -------
+        shells : list of str
+            Shell labels starting with ``Overall``.
+        unique : 1d array of int
+            Number of unique reflections observed.
+        completeness : 1d array
+            Fraction of unique reflections observed.
+        redundancy : 1d array
+            Mean observations per observed unique reflection.
+        multiple : 1d array of int
+            Number of unique reflections observed more than once.
+
+        """
+
+        n = self.n_shells
+
+        observed = counts > 0
+
+        unique = np.bincount(self.shell, weights=observed, minlength=n)
+        total = np.bincount(self.shell, weights=counts, minlength=n)
+        multiple = np.bincount(self.shell, weights=counts > 1, minlength=n)
+
+        return self.summarize(unique, total, multiple)
+
+    def summarize(self, unique, total, multiple):
+        """
+        Overall and per-shell statistics of per-shell sums.
+
+        Parameters
+        ----------
+        unique : 1d array of int
+            Number of unique reflections observed in each shell.
+        total : 1d array of int
+            Number of observations in each shell.
+        multiple : 1d array of int
+            Number of unique reflections observed more than once in each
+            shell.
+
+        Returns
+        -------
+        shells : list of str
+            Shell labels starting with ``Overall``.
+        unique : 1d array of int
+            Number of unique reflections observed.
+        completeness : 1d array
+            Fraction of unique reflections observed.
+        redundancy : 1d array
+            Mean observations per observed unique reflection.
+        multiple : 1d array of int
+            Number of unique reflections observed more than once.
+
+        """
+
+        n = self.n_shells
+
+        possible = np.bincount(self.shell, minlength=n)
+
+        possible = np.concatenate([[possible.sum()], possible])
+        unique = np.concatenate([[np.sum(unique)], unique]).astype(int)
+        total = np.concatenate([[np.sum(total)], total])
+        multiple = np.concatenate([[np.sum(multiple)], multiple]).astype(int)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            completeness = np.where(possible > 0, unique / possible, 0)
+            redundancy = np.where(unique > 0, total / unique, 0)
+
+        shells = ["Overall"]
+        for i in range(n):
+            shells.append(
+                "{:.2f}-{:.2f}".format(self.shells[i], self.shells[i + 1])
+            )
+
+        return shells, unique, completeness, redundancy, multiple
+
+    def missing(self, counts):
+        """
+        Unobserved asymmetric unit reflections.
+
+        Parameters
+        ----------
+        counts : 1d array of int
+            Observations per key.
+
+        Returns
+        -------
+        hkls : 2d array of int
+            Miller indices of the missing keys.
+        d : 1d array
+            Interplanar spacing of the missing keys.
+
+        """
+
+        mask = counts == 0
+
+        return decode(self.keys[mask]), self.d[mask]
+
+
+def expand_orbits(keys, counts, symmetry):
+    """
+    Members of the orbits of asymmetric unit keys.
+
+    Parameters
+    ----------
+    keys : 1d array of int
+        Canonical codes.
+    counts : 1d array of int
+        Observations of each key.
+    symmetry : 3d array of int
+        Point group operations acting on Miller indices.
+
+    Returns
+    -------
+    hkls : 2d array of int
+        Miller indices of the orbit members.
+    counts : 1d array of int
+        Observations of each member's orbit.
+
+    """
+
+    symmetry = np.asarray(symmetry, dtype=np.int64)
+
+    orbits = encode(equivalents(decode(keys), symmetry).reshape(-1, 3))
+
+    orbit = np.repeat(np.arange(len(keys)), len(symmetry))
+
+    codes, ind = np.unique(orbits, return_index=True)
+
+    return decode(codes), np.asarray(counts)[orbit[ind]]
+
+
+def coverage(hkls, symmetry, centering):
+    """
+    Symmetry-expanded coverage of observed reflections.
+
+    Every member of the orbit of an observed reflection is weighted by
+    the number of observations within that orbit.
+
+    Parameters
+    ----------
+    hkls : 2d array of int
+        Miller indices of observed reflections.
+    symmetry : 3d array of int
+        Point group operations acting on Miller indices.
+    centering : str
+        Lattice centering symbol.
+
+    Returns
+    -------
+    hkls : 2d array of int
+        Miller indices of the covered reflections.
+    counts : 1d array of int
+        Observations of each covered reflection's orbit.
+
+    """
+
+    hkls = np.asarray(hkls, dtype=np.int64).reshape(-1, 3)
+    hkls = hkls[centering_mask(hkls, centering)]
+
+    symmetry = np.asarray(symmetry, dtype=np.int64)
+
+    keys, counts = np.unique(
+        canonical_codes(hkls, symmetry), return_counts=True
+    )
+
+    return expand_orbits(keys, counts, symmetry)
+
+
+class CoverageCounter:
+    """
+    Running observation counts of a set of orientations.
+
+    The asymmetric unit key indices of each orientation are computed once
+    and kept. Adding, removing or toggling an orientation then adds or
+    subtracts only its own contributions to the key counts and to the
+    per-shell sums, so updates scale with the size of the orientation
+    rather than the whole plan.
+
+    Parameters
+    ----------
+    statistics : ReflectionStatistics
+        Statistics engine defining the keys and shells.
+
+    """
+
+    def __init__(self, statistics):
+        self.statistics = statistics
+
+        n = statistics.n_shells
+
+        self.counts = np.zeros(len(statistics.keys), dtype=int)
+
+        self.unique = np.zeros(n, dtype=int)
+        self.total = np.zeros(n, dtype=int)
+        self.multiple = np.zeros(n, dtype=int)
+
+        self.sources = []
+        self.indices = []
+        self.active = []
+
+    def __len__(self):
+        return len(self.sources)
+
+    def _update(self, ind, sign):
+        if len(ind) == 0:
+            return
+
+        keys, n = np.unique(ind, return_counts=True)
+
+        before = self.counts[keys]
+        after = before + sign * n
+
+        self.counts[keys] = after
+
+        shell = self.statistics.shell[keys]
+        m = self.statistics.n_shells
+
+        def change(values):
+            return np.bincount(shell, weights=values, minlength=m).astype(int)
+
+        self.unique += change((after > 0).astype(int) - (before > 0))
+        self.total += change(after - before)
+        self.multiple += change((after > 1).astype(int) - (before > 1))
+
+    def _indices(self, peaks):
+        hkls = np.column_stack([peaks[col] for col in ["h", "k", "l"]])
+
+        ind = self.statistics.key_indices(hkls)
+
+        return ind[ind >= 0]
+
+    def update(self, orientations, use=None):
+        """
+        Synchronize the counts with the current orientations.
+
+        Orientations are matched to the counted ones by identity, so only
+        new, replaced, removed or toggled orientations are processed.
+
+        Parameters
+        ----------
+        orientations : list of structured arrays
+            Reflections of each orientation with ``h``, ``k`` and ``l``
+            fields.
+        use : list of bool, optional
+            Orientations to include. Missing entries are excluded. Default
+            is all.
+
+        """
+
+        if use is None:
+            use = [True] * len(orientations)
+
+        use = list(use)[: len(orientations)]
+        use += [False] * (len(orientations) - len(use))
+
+        counted = {
+            id(source): (ind, active)
+            for source, ind, active in zip(
+                self.sources, self.indices, self.active
+            )
+        }
+
+        current = set(id(peaks) for peaks in orientations)
+
+        for source, ind, active in zip(
+            self.sources, self.indices, self.active
+        ):
+            if active and id(source) not in current:
+                self._update(ind, -1)
+
+        indices = []
+
+        for peaks, active in zip(orientations, use):
+            entry = counted.pop(id(peaks), None)
+
+            if entry is None:
+                ind, was_active = self._indices(peaks), False
+            else:
+                ind, was_active = entry
+
+            if active and not was_active:
+                self._update(ind, 1)
+            elif was_active and not active:
+                self._update(ind, -1)
+
+            indices.append(ind)
+
+        self.sources = list(orientations)
+        self.indices = indices
+        self.active = [bool(active) for active in use]
+
+    def summary(self):
+        """
+        Overall and per-shell statistics of the active orientations.
+
+        Returns
+        -------
+        shells : list of str
+            Shell labels starting with ``Overall``.
+        unique : 1d array of int
+            Number of unique reflections observed.
+        completeness : 1d array
+            Fraction of unique reflections observed.
+        redundancy : 1d array
+            Mean observations per observed unique reflection.
+        multiple : 1d array of int
+            Number of unique reflections observed more than once.
+
+        """
+
+        return self.statistics.summarize(
+            self.unique, self.total, self.multiple
+        )
+
+    def missing(self):
+        """
+        Unobserved asymmetric unit reflections of the active orientations.
+
+        Returns
+        -------
+        hkls : 2d array of int
+            Miller indices of the missing keys.
+        d : 1d array
+            Interplanar spacing of the missing keys.
+
+        """
+
+        return self.statistics.missing(self.counts)
+
+    def coverage(self):
+        """
+        Symmetry-expanded coverage of the active orientations.
+
+        Returns
+        -------
+        hkls : 2d array of int
+            Miller indices of the covered reflections.
+        counts : 1d array of int
+            Observations of each covered reflection's orbit.
+
+        """
+
+        observed = self.counts > 0
+
+        return expand_orbits(
+            self.statistics.keys[observed],
+            self.counts[observed],
+            self.statistics.symmetry,
+        )
@@ -0,0 +1,156 @@
+import numpy as np
+
+
+def prefix_sum(data, axis):
+    """
+    Cumulative sum along an axis with a leading zero plane.
+
+    Parameters
+    ----------
+    data : nd array
+        Binned values.
+    axis : int
+        Axis of accumulation.
+
+    Returns
+    -------
+    prefix : nd array
+        Prefix sums with one more element than ``data`` along ``axis``.
+
+    """
+
+    shape = list(data.shape)
+    shape[axis] += 1
+
+    prefix = np.zeros(shape, dtype=float)
+
+    index = [slice(None)] * data.ndim
+    index[axis] = slice(1, None)
+
+    np.cumsum(data, axis=axis, dtype=float, out=prefix[tuple(index)])
+
+    return prefix
+
+
+class SlabIntegrator:
+    """
+    Integrate a regularly binned histogram over slabs along any axis.
+
+    Prefix sums of the signal and squared error are accumulated along an
+    axis the first time it is integrated. Any slab offset or thickness then
+    only requires two planes of the prefix sums, with partially covered
+    bins weighted by their fractional overlap.
+
+    Parameters
+    ----------
+    signal : nd array
+        Binned signal.
+    error_sq : nd array
+        Binned squared error.
+    edges : list of 1d arrays
+        Bin boundaries of each dimension.
+
+    """
+
+    def __init__(self, signal, error_sq, edges):
+        self.signal = signal
+        self.error_sq = error_sq
+        self.edges = [np.asarray(edge, dtype=float) for edge in edges]
+
+        self._axis = None
+        self._prefix = None
+
+    def prefix_sums(self, axis):
+        """
+        Signal and squared error prefix sums along an axis.
+
+        Only the most recent axis is retained to bound memory.
+
+        Parameters
+        ----------
+        axis : int
+            Axis of accumulation.
+
+        Returns
+        -------
+        signal, error_sq : nd arrays
+            Prefix sums.
+
+        """
+
+        if self._axis != axis:
+            self._prefix = None
+            self._prefix = (
+                prefix_sum(self.signal, axis),
+                prefix_sum(self.error_sq, axis),
+            )
+            self._axis = axis
+
+        return self._prefix
+
+    def _cumulative(self, prefix, data, axis, value):
+        edges = self.edges[axis]
+
+        n = len(edges) - 1
+
+        value = np.clip(value, edges[0], edges[-1])
+
+        pos = (value - edges[0]) / (edges[-1] - edges[0]) * n
+
+        ind = min(int(np.floor(pos)), n - 1)
+
+        frac = pos - ind
+
+        return np.take(prefix, ind, axis=axis) + frac * np.take(
+            data, ind, axis=axis
+        )
+
+    def integrate(self, axis, limits):
+        """
+        Integrate between two limits along an axis.
+
+        Parameters
+        ----------
+        axis : int
+            Integrated axis.
+        limits : 2-element list
+            Lower and upper integration limits.
+
+        Returns
+        -------
+        signal, error_sq : nd arrays
+            Integrated values with ``axis`` removed.
+
+        """
+
+        lower, upper = sorted(limits)
+
+        prefix_signal, prefix_error_sq = self.prefix_sums(axis)
+
+        signal = self._cumulative(
+            prefix_signal, self.signal, axis, upper
+        ) - self._cumulative(prefix_signal, self.signal, axis, lower)
+
+        error_sq = self._cumulative(
+            prefix_error_sq, self.error_sq, axis, upper
+        ) - self._cumulative(prefix_error_sq, self.error_sq, axis, lower)
+
+        return signal, error_sq
+
+    def remaining_edges(self, axis):
+        """
+        Bin boundaries of the dimensions left after integration.
+
+        Parameters
+        ----------
+        axis : int
+            Integrated axis.
+
+        Returns
+        -------
+        edges : list of 1d arrays
+            Bin boundaries.
+
+        """
+
+        return [edge for i, edge in enumerate(self.edges) if i != axis]
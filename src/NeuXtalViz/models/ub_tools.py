@@ -1,5 +1,6 @@
 import os
-from collections import defaultdict
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from mantid.simpleapi import (
     SelectCellWithForm,
@@ -29,6 +30,7 @@ from mantid.simpleapi import (
     CreatePeaksWorkspace,
     ConvertQtoHKLMDHisto,
     CompactMD,
+    PlusMD,
     CopySample,
     CreateSampleWorkspace,
     CloneWorkspace,
@@ -82,6 +84,17 @@ import json
 
 from NeuXtalViz.models.base_model import NeuXtalVizModel
 from NeuXtalViz.config.instruments import beamlines
+from NeuXtalViz.models.detector_grouping import cached_grouping_pattern
+from NeuXtalViz.models.disk_cache import (
+    cache_file,
+    content_hash,
+    evict_entries,
+    file_hash,
+    load_arrays,
+    remove_entry,
+    save_arrays,
+)
+from NeuXtalViz.models.q_volume import coarsen_volume, normalize_volume
 
 lattice_group = {
     "Triclinic": "-1",
@@ -128,6 +141,15 @@ class UBModel(NeuXtalVizModel):
 
         self.peak_info = None
 
+        self.cache_size = 32 * 1024**3
+        self.Q_extent = None
+        self.Q_bins = 256
+        self.dataset_args = None
+        self.dataset_entry = None
+
+        self.save_executor = ThreadPoolExecutor(max_workers=1)
+        self.saving = None
+
         CreateSampleWorkspace(OutputWorkspace="ub_lattice")
 
     def has_Q(self):
@@ -253,55 +275,6 @@ class UBModel(NeuXtalVizModel):
                         InputWorkspaces="data", OutputWorkspace="data"
                     )
                 return True
-        else:
-            filenames = [filepath.format(IPTS, run) for run in runs]
-            if np.all([os.path.exists(filename) for filename in filenames]):
-                self.runs = runs
-                filenames = ",".join([filename for filename in filenames])
-                Load(
-                    Filename=filenames,
-                    FilterByTimeStop=time_stop,
-                    NumberOfBins=1,
-                    OutputWorkspace="data",
-                )
-                group = mtd["data"].isGroup()
-                if not group:
-                    GroupWorkspaces(
-                        InputWorkspaces="data", OutputWorkspace="data"
-                    )
-                input_ws = mtd["data"].getNames()[0]
-                PreprocessDetectorsToMD(
-                    InputWorkspace=input_ws, OutputWorkspace="detectors"
-                )
-                cols, rows = inst["BankPixels"]
-                c, r = [int(val) for val in grouping.split("x")]
-                shape = (-1, cols, rows)
-                # det_id = np.array(mtd['detectors'].column(4)).reshape(*shape)
-                det_map = np.array(mtd["detectors"].column(5)).reshape(*shape)
-                shape = det_map.shape
-                i, j, k = np.meshgrid(
-                    np.arange(shape[0]),
-                    np.arange(shape[1]),
-                    np.arange(shape[2]),
-                    indexing="ij",
-                )
-                keys = np.stack((i, j // c, k // r), axis=-1)
-                keys_flat = keys.reshape(-1, keys.shape[-1])
-                det_map_flat = det_map.ravel().astype(str)
-                grouped_ids = defaultdict(list)
-                for key, detector_id in zip(
-                    map(tuple, keys_flat), det_map_flat
-                ):
-                    grouped_ids[key].append(detector_id)
-                detector_list = ",".join(
-                    "+".join(group) for group in grouped_ids.values()
-                )
-                GroupDetectors(
-                    InputWorkspace="data",
-                    OutputWorkspace="data",
-                    GroupingPattern=detector_list,
-                )
-                return True
 
     def calibrate_data(self, instrument, det_cal, tube_cal):
         filepath = self.get_raw_file_path(instrument)
@@ -344,112 +317,921 @@ class UBModel(NeuXtalVizModel):
             input_ws_names = mtd["data"].getNames()
             return len(input_ws_names)
 
-    def convert_data(self, instrument, wavelength, lorentz, min_d=None):
+    def is_event_instrument(self, instrument):
+        return beamlines[instrument]["Facility"] == "SNS"
+
+    def runs_exist(self, instrument, IPTS, runs):
         filepath = self.get_raw_file_path(instrument)
 
-        if min_d is not None:
-            Q_max = 2 * np.pi / min_d
+        filenames = [filepath.format(IPTS, run) for run in runs]
 
-        if mtd.doesExist("data"):
-            input_ws_names = mtd["data"].getNames()
-            input_ws = input_ws_names[0]
+        return len(runs) > 0 and all(
+            [os.path.exists(filename) for filename in filenames]
+        )
 
-            Rs = []
+    def load_run(self, instrument, IPTS, run, time_stop, det_cal, tube_cal):
+        """
+        Load, group and calibrate one event run.
 
-            if "HFIR" in filepath:
-                r = mtd[input_ws].getExperimentInfo(0).run()
+        Parameters
+        ----------
+        instrument : str
+            Beamline name.
+        IPTS : int
+            Proposal number.
+        run : int
+            Run number.
+        time_stop : float
+            Time at which to stop loading events.
+        det_cal : str
+            Detector calibration file.
+        tube_cal : str
+            Tube calibration file, already loaded as ``tube_table``.
 
-                two_theta = r.getProperty("TwoTheta").value
-                az_phi = r.getProperty("Azimuthal").value
+        Returns
+        -------
+        ws : str
+            Name of the event workspace.
 
-                for ws in input_ws_names:
-                    r = mtd[ws].getExperimentInfo(0).run()
-                    Rs.append(
-                        [
-                            r.getGoniometer(i).getR()
-                            for i in range(r.getNumGoniometers())
-                        ]
-                    )
+        """
 
-                lamda = wavelength[0]
+        inst = beamlines[instrument]
 
-                counts = [
-                    np.swapaxes(mtd[ws].getSignalArray().copy(), 0, 1)
-                    for ws in input_ws_names
-                ]
+        ws = "data_{}".format(run)
+        detectors = "detectors_{}".format(run)
+
+        filename = self.get_raw_file_path(instrument).format(IPTS, run)
 
-                counts = [c.reshape(-1, c.shape[2]) for c in counts]
+        Load(
+            Filename=filename,
+            FilterByTimeStop=time_stop,
+            NumberOfBins=1,
+            OutputWorkspace=ws,
+        )
 
-                if min_d is None:
-                    k = 2 * np.pi / wavelength[0]
-                    Q_max = k * np.sin(0.5 * max(two_theta))
+        PreprocessDetectorsToMD(InputWorkspace=ws, OutputWorkspace=detectors)
 
-                ConvertHFIRSCDtoMDE(
-                    InputWorkspace="data",
-                    Wavelength=wavelength[0],
-                    LorentzCorrection=lorentz,
-                    MinValues=[-Q_max, -Q_max, -Q_max],
-                    MaxValues=[+Q_max, +Q_max, +Q_max],
-                    MaxRecursionDepth=5,
-                    OutputWorkspace="md",
-                )
+        cols, rows = inst["BankPixels"]
+        shape = (-1, cols, rows)
+        det_map = np.array(mtd[detectors].column(5)).reshape(*shape)
+        detector_list = cached_grouping_pattern(
+            instrument, det_map, inst["Grouping"]
+        )
+
+        GroupDetectors(
+            InputWorkspace=ws,
+            OutputWorkspace=ws,
+            GroupingPattern=detector_list,
+        )
+
+        goniometers = list(self.get_goniometers(instrument))
+        while len(goniometers) < 6:
+            goniometers.append(None)
+
+        SetGoniometer(
+            Workspace=ws,
+            Axis0=goniometers[0],
+            Axis1=goniometers[1],
+            Axis2=goniometers[2],
+            Average=True,
+        )
+
+        if tube_cal != "" and os.path.exists(tube_cal):
+            ApplyCalibration(Workspace=ws, CalibrationTable="tube_table")
+
+        if det_cal != "" and os.path.exists(det_cal):
+            if os.path.splitext(det_cal)[1] == ".xml":
+                LoadParameterFile(Workspace=ws, Filename=det_cal)
             else:
-                ConvertUnits(
-                    InputWorkspace="data",
-                    Target="Wavelength",
-                    OutputWorkspace="data",
-                )
+                LoadIsawDetCal(InputWorkspace=ws, Filename=det_cal)
 
-                CropWorkspace(
-                    InputWorkspace="data",
-                    XMin=wavelength[0],
-                    XMax=wavelength[1],
-                    OutputWorkspace="data",
-                )
+        return ws
 
-                CompressEvents(
-                    InputWorkspace="data",
-                    Tolerance=1e-4,
-                    OutputWorkspace="data",
-                )
+    def convert_run(self, run, wavelength, lorentz, Q_max=None):
+        """
+        Convert one loaded event run to Q-sample.
 
-                Rebin(
-                    InputWorkspace="data",
-                    OutputWorkspace="data",
-                    Params=[wavelength[0], 0.01, wavelength[1]],
-                )
+        The event workspace is deleted once converted, so only the MD
+        workspace and the detector arrays of the run are kept.
 
-                lamda = mtd[input_ws].extractX()[0]
-                lamda = 0.5 * (lamda[1:] + lamda[:-1])
+        Parameters
+        ----------
+        run : int
+            Run number.
+        wavelength : list
+            Wavelength band.
+        lorentz : bool
+            Apply the Lorentz correction.
+        Q_max : float, optional
+            Extent of the Q-sample volume. Default is the instrument
+            limit.
 
-                PreprocessDetectorsToMD(
-                    InputWorkspace=input_ws, OutputWorkspace="detectors"
-                )
+        Returns
+        -------
+        result : dict
+            MD workspace name, counts, goniometer matrix, wavelength bins,
+            detector angles and Q-sample extent of the run.
+
+        """
+
+        ws = "data_{}".format(run)
+        md = "md_{}".format(run)
+        detectors = "detectors_{}".format(run)
+
+        ConvertUnits(
+            InputWorkspace=ws, Target="Wavelength", OutputWorkspace=ws
+        )
+
+        CropWorkspace(
+            InputWorkspace=ws,
+            XMin=wavelength[0],
+            XMax=wavelength[1],
+            OutputWorkspace=ws,
+        )
+
+        CompressEvents(InputWorkspace=ws, Tolerance=1e-4, OutputWorkspace=ws)
+
+        Rebin(
+            InputWorkspace=ws,
+            OutputWorkspace=ws,
+            Params=[wavelength[0], 0.01, wavelength[1]],
+        )
+
+        lamda = mtd[ws].extractX()[0]
+        lamda = 0.5 * (lamda[1:] + lamda[:-1])
+
+        PreprocessDetectorsToMD(InputWorkspace=ws, OutputWorkspace=detectors)
+
+        two_theta = np.array(mtd[detectors].column("TwoTheta"))
+        az_phi = np.array(mtd[detectors].column("Azimuthal"))
+
+        if Q_max is None:
+            k = 2 * np.pi / min(wavelength)
+            Q_max = k * np.sin(0.5 * max(two_theta))
+
+        ConvertToMD(
+            InputWorkspace=ws,
+            QDimensions="Q3D",
+            dEAnalysisMode="Elastic",
+            Q3DFrames="Q_sample",
+            LorentzCorrection=lorentz,
+            MinValues=[-Q_max, -Q_max, -Q_max],
+            MaxValues=[+Q_max, +Q_max, +Q_max],
+            PreprocDetectorsWS=detectors,
+            OutputWorkspace=md,
+        )
+
+        result = {
+            "md": md,
+            "counts": mtd[ws].extractY().copy(),
+            "R": mtd[ws].run().getGoniometer().getR(),
+            "lamda": lamda,
+            "two_theta": two_theta,
+            "az_phi": az_phi,
+            "Q_max": Q_max,
+        }
+
+        DeleteWorkspace(Workspace=ws)
+        DeleteWorkspace(Workspace=detectors)
+
+        return result
+
+    def process_run(self, instrument, IPTS, run, time_stop, *args):
+        det_cal, tube_cal, wavelength, lorentz, Q_max = args
+
+        self.load_run(instrument, IPTS, run, time_stop, det_cal, tube_cal)
+
+        return self.convert_run(run, wavelength, lorentz, Q_max)
+
+    def bin_Q(self, md, Q_max):
+        """
+        Add an MD workspace to the Q-sample overview histogram.
+
+        The histogram has ``Q_bins`` bins along each axis.
+
+        Parameters
+        ----------
+        md : str
+            MD event workspace in Q-sample.
+        Q_max : float
+            Extent of the Q-sample volume.
+
+        """
+
+        exists = mtd.doesExist("Q3D")
+
+        bins = self.Q_bins
+
+        BinMD(
+            InputWorkspace=md,
+            AlignedDim0="Q_sample_x,{},{},{}".format(-Q_max, Q_max, bins),
+            AlignedDim1="Q_sample_y,{},{},{}".format(-Q_max, Q_max, bins),
+            AlignedDim2="Q_sample_z,{},{},{}".format(-Q_max, Q_max, bins),
+            OutputWorkspace="Q3D_runs" if exists else "Q3D",
+        )
+
+        if exists:
+            PlusMD(
+                LHSWorkspace="Q3D",
+                RHSWorkspace="Q3D_runs",
+                OutputWorkspace="Q3D",
+            )
+
+            DeleteWorkspace(Workspace="Q3D_runs")
+
+    def merge_runs(self, names):
+        """
+        Merge converted runs into the Q-sample workspace.
+
+        Parameters
+        ----------
+        names : list of str
+            MD workspaces of the runs in run order.
+
+        """
+
+        if mtd.doesExist("md"):
+            MergeMD(InputWorkspaces=["md"] + names, OutputWorkspace="md")
+        elif len(names) > 1:
+            MergeMD(InputWorkspaces=names, OutputWorkspace="md")
+        else:
+            RenameWorkspace(InputWorkspace=names[0], OutputWorkspace="md")
+            return
+
+        for name in names:
+            DeleteWorkspace(Workspace=name)
+
+    def convert_runs(
+        self,
+        instrument,
+        IPTS,
+        runs,
+        time_stop,
+        det_cal,
+        tube_cal,
+        wavelength,
+        lorentz,
+        Q_max=None,
+        n_workers=4,
+    ):
+        """
+        Load and convert event runs concurrently.
+
+        Runs are independent until they are merged, so each one is loaded,
+        calibrated and converted in a worker thread. Mantid algorithms
+        release the interpreter lock and share the workspace service,
+        which separate processes would not. Converted runs are added to the
+        histogram in run order as soon as all earlier runs have finished,
+        with at most twice as many runs as workers in progress. Merging
+        rebuilds the whole event workspace, so binned runs are only merged
+        once twice as many runs as workers are waiting, and at the end.
+        Repeated runs are converted once. If a run fails or the conversion
+        is stopped, queued runs are cancelled, binned runs are merged and
+        the workspaces of the others are deleted once running ones have
+        finished.
+
+        Parameters
+        ----------
+        instrument : str
+            Beamline name.
+        IPTS : int
+            Proposal number.
+        runs : list of int
+            Run numbers.
+        time_stop : float
+            Time at which to stop loading events.
+        det_cal, tube_cal : str
+            Detector and tube calibration files.
+        wavelength : list
+            Wavelength band.
+        lorentz : bool
+            Apply the Lorentz correction.
+        Q_max : float, optional
+            Extent of the Q-sample volume. Default is the instrument
+            limit.
+        n_workers : int, optional
+            Number of runs processed at once. Default is 4.
+
+        Yields
+        ------
+        binned : int
+            Number of runs added to the histogram so far.
+
+        Returns
+        -------
+        results : list of dict
+            Conversion result of each distinct run, which is also kept as
+            ``converted`` while runs are binned.
+
+        """
+
+        if tube_cal != "" and os.path.exists(tube_cal):
+            LoadNexus(Filename=tube_cal, OutputWorkspace="tube_table")
 
-                two_theta = mtd["detectors"].column("TwoTheta")
-                az_phi = mtd["detectors"].column("Azimuthal")
+        args = det_cal, tube_cal, wavelength, lorentz, Q_max
 
-                for ws in input_ws_names:
-                    Rs.append(mtd[ws].run().getGoniometer().getR())
+        runs = self.unique_runs(runs)
 
-                counts = [mtd[ws].extractY().copy() for ws in input_ws_names]
+        results = {}
+        batch = []
+        binned = 0
+
+        self.converted = []
+
+        n_workers = max(1, n_workers)
+
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            pending = {}
+            submitted = 0
+
+            try:
+                while binned < len(runs):
+                    while (
+                        submitted < len(runs)
+                        and submitted < binned + 2 * n_workers
+                    ):
+                        future = executor.submit(
+                            self.process_run,
+                            instrument,
+                            IPTS,
+                            runs[submitted],
+                            time_stop,
+                            *args,
+                        )
+                        pending[future] = submitted
+                        submitted += 1
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        results[pending.pop(future)] = future.result()
+
+                    if binned not in results:
+                        continue
+
+                    while binned in results:
+                        result = results.pop(binned)
+                        self.bin_Q(result["md"], result["Q_max"])
+                        self.converted.append(result)
+                        batch.append(result["md"])
+                        binned += 1
+
+                    if len(batch) >= 2 * n_workers:
+                        names, batch = batch, []
+                        self.merge_runs(names)
+
+                    yield binned
+
+            finally:
+                for future in pending:
+                    future.cancel()
+
+                wait(pending)
+
+                self.delete_run_workspaces(runs[binned:submitted])
+
+                if len(batch) > 0:
+                    self.merge_runs(batch)
+
+        return self.converted
+
+    def unique_runs(self, runs):
+        """
+        Run numbers without repeats, in order of first appearance.
+
+        Parameters
+        ----------
+        runs : list of int
+            Run numbers.
+
+        Returns
+        -------
+        runs : list of int
+            Distinct run numbers.
+
+        """
 
-                if min_d is None:
-                    k = 2 * np.pi / min(wavelength)
-                    Q_max = k * np.sin(0.5 * max(two_theta))
+        return list(dict.fromkeys(runs))
 
-                ConvertToMD(
-                    InputWorkspace="data",
-                    QDimensions="Q3D",
-                    dEAnalysisMode="Elastic",
-                    Q3DFrames="Q_sample",
-                    LorentzCorrection=lorentz,
-                    MinValues=[-Q_max, -Q_max, -Q_max],
-                    MaxValues=[+Q_max, +Q_max, +Q_max],
-                    PreprocDetectorsWS="detectors",
-                    OutputWorkspace="md",
+    def delete_run_workspaces(self, runs):
+        """
+        Delete the workspaces left by runs that were not binned.
+
+        Parameters
+        ----------
+        runs : list of int
+            Run numbers.
+
+        """
+
+        for run in runs:
+            for ws in ["data_{}", "detectors_{}", "md_{}"]:
+                if mtd.doesExist(ws.format(run)):
+                    DeleteWorkspace(Workspace=ws.format(run))
+
+    def process_runs(
+        self,
+        instrument,
+        IPTS,
+        runs,
+        time_stop,
+        det_cal,
+        tube_cal,
+        wavelength,
+        lorentz,
+        min_d=None,
+        n_workers=4,
+        bins=256,
+    ):
+        """
+        Convert a new dataset of event runs to Q-sample.
+
+        Parameters are those of ``convert_runs``, except that the extent
+        of the Q-sample volume is given by the minimum d-spacing
+        ``min_d`` and its overview histogram has ``bins`` bins along each
+        axis. If the conversion fails, the partial dataset is deleted.
+
+        Yields
+        ------
+        binned : int
+            Number of runs added to the histogram so far.
+
+        """
+
+        runs = self.unique_runs(runs)
+
+        if not self.runs_exist(instrument, IPTS, runs):
+            return
+
+        self.delete_dataset()
+
+        self.Q_extent = None if min_d is None else 2 * np.pi / min_d
+        self.Q_bins = bins
+
+        key = self.dataset_key(
+            instrument,
+            IPTS,
+            runs,
+            time_stop,
+            det_cal,
+            tube_cal,
+            wavelength,
+            lorentz,
+        )
+
+        args = self.dataset_settings(
+            instrument, IPTS, time_stop, det_cal, tube_cal
+        )
+
+        if self.load_dataset(key):
+            self.dataset_args = args
+            self.dataset_entry = key
+            yield len(runs)
+            return
+
+        try:
+            results = yield from self.convert_runs(
+                instrument,
+                IPTS,
+                runs,
+                time_stop,
+                det_cal,
+                tube_cal,
+                wavelength,
+                lorentz,
+                self.Q_extent,
+                n_workers,
+            )
+        except BaseException:
+            self.delete_dataset()
+            raise
+
+        self.runs = runs
+        self.lorentz = lorentz
+
+        self.update_Q(
+            results[0]["Q_max"],
+            wavelength,
+            [result["counts"] for result in results],
+            results[0]["two_theta"],
+            results[0]["az_phi"],
+            results[0]["lamda"],
+            [result["R"] for result in results],
+        )
+
+        self.dataset_args = args
+        self.dataset_entry = key
+
+        self.save_dataset(key)
+
+    def delete_dataset(self):
+        """
+        Delete the Q-sample workspace and its histogram.
+
+        """
+
+        self.wait_for_save()
+
+        for ws in ["md", "Q3D"]:
+            if mtd.doesExist(ws):
+                DeleteWorkspace(Workspace=ws)
+
+        self.dataset_args = None
+        self.dataset_entry = None
+
+    def dataset_settings(self, instrument, IPTS, time_stop, det_cal, tube_cal):
+        """
+        Settings an event dataset was loaded with.
+
+        Parameters
+        ----------
+        instrument : str
+            Beamline name.
+        IPTS : int
+            Proposal number.
+        time_stop : float
+            Time at which to stop loading events.
+        det_cal, tube_cal : str
+            Detector and tube calibration files.
+
+        Returns
+        -------
+        args : dict
+            Loading settings by name.
+
+        """
+
+        return {
+            "instrument": instrument,
+            "IPTS": IPTS,
+            "time_stop": time_stop,
+            "det_cal": det_cal,
+            "tube_cal": tube_cal,
+        }
+
+    def matches_dataset(self, instrument, IPTS, time_stop, det_cal, tube_cal):
+        """
+        Whether runs would be loaded as the current dataset was.
+
+        Parameters
+        ----------
+        instrument : str
+            Beamline name.
+        IPTS : int
+            Proposal number.
+        time_stop : float
+            Time at which to stop loading events.
+        det_cal, tube_cal : str
+            Detector and tube calibration files.
+
+        Returns
+        -------
+        match : bool
+            Whether the settings are those of the dataset.
+
+        """
+
+        args = self.dataset_settings(
+            instrument, IPTS, time_stop, det_cal, tube_cal
+        )
+
+        return self.dataset_args == args
+
+    def dataset_key(
+        self,
+        instrument,
+        IPTS,
+        runs,
+        time_stop,
+        det_cal,
+        tube_cal,
+        wavelength,
+        lorentz,
+    ):
+        """
+        Cache key of a converted dataset.
+
+        The key covers the runs, calibration file contents, wavelength
+        band, Lorentz correction and Q-sample extent. The histogram is
+        rebinned from the events when its bins differ, so they are not
+        part of the key.
+
+        Returns
+        -------
+        key : str
+            Hexadecimal digest.
+
+        """
+
+        inst = beamlines[instrument]
+
+        return content_hash(
+            self.get_instrument_name(instrument),
+            inst["Grouping"],
+            str(IPTS),
+            [int(run) for run in runs],
+            None if time_stop is None else float(time_stop),
+            file_hash(det_cal),
+            file_hash(tube_cal),
+            [float(wl) for wl in wavelength],
+            bool(lorentz),
+            self.Q_extent,
+        )
+
+    def save_dataset(self, key, replaces=None):
+        """
+        Store the converted dataset in the persistent cache.
+
+        The per-run arrays are captured at once, and the entry is written
+        by a background thread so that the dataset can be used meanwhile.
+        Anything changing the MD or histogram workspaces waits for the
+        writing to finish first.
+
+        Parameters
+        ----------
+        key : str
+            Cache entry key.
+        replaces : str, optional
+            Key of an entry superseded by this one, which is removed once
+            the new entry is complete.
+
+        """
+
+        self.wait_for_save()
+
+        arrays = {
+            "runs": np.array(self.runs),
+            "Rs": np.stack(self.Rs),
+            "two_theta": self.two_theta,
+            "az_phi": self.az_phi,
+            "lamda": self.lamda,
+            "wavelength": np.array(self.wavelength, dtype=float),
+            "lorentz": self.lorentz,
+            "Q_max": self.Q_max_cut,
+        }
+
+        for i, counts in enumerate(self.counts):
+            arrays["counts_{}".format(i)] = counts
+
+        self.saving = self.save_executor.submit(
+            self.write_dataset, key, arrays, replaces
+        )
+
+    def write_dataset(self, key, arrays, replaces=None):
+        """
+        Write a cache entry of the converted dataset.
+
+        The MD and histogram workspaces are written before the arrays, so
+        an entry is only complete, and used, once its arrays exist. Least
+        recently used entries are then evicted beyond the cache size.
+
+        Parameters
+        ----------
+        key : str
+            Cache entry key.
+        arrays : dict
+            Per-run arrays by name.
+        replaces : str, optional
+            Key of an entry superseded by this one.
+
+        """
+
+        for ws, suffix in [("md", ".md.nxs"), ("Q3D", ".Q3D.nxs")]:
+            filename = cache_file("Q", key, suffix)
+            tmp = filename + ".{}.tmp".format(os.getpid())
+            SaveMD(InputWorkspace=ws, Filename=tmp)
+            os.replace(tmp, filename)
+
+        save_arrays("Q", key, **arrays)
+
+        if replaces is not None and replaces != key:
+            remove_entry("Q", replaces)
+
+        evict_entries("Q", self.cache_size, keep=[key])
+
+    def wait_for_save(self):
+        """
+        Wait until the dataset being cached has been written.
+
+        """
+
+        if self.saving is not None:
+            wait([self.saving])
+            self.saving = None
+
+    def load_dataset(self, key):
+        """
+        Restore a converted dataset from the persistent cache.
+
+        The histogram is rebinned from the events if its bins are not
+        ``Q_bins``.
+
+        Parameters
+        ----------
+        key : str
+            Cache entry key.
+
+        Returns
+        -------
+        loaded : bool
+            Whether a complete entry was found.
+
+        """
+
+        md_file = cache_file("Q", key, ".md.nxs")
+        Q3D_file = cache_file("Q", key, ".Q3D.nxs")
+
+        if not (os.path.exists(md_file) and os.path.exists(Q3D_file)):
+            return False
+
+        arrays = load_arrays("Q", key)
+
+        if arrays is None:
+            return False
+
+        n_runs = len(arrays["runs"])
+
+        names = ["counts_{}".format(i) for i in range(n_runs)]
+
+        if not all(name in arrays for name in names):
+            return False
+
+        LoadMD(Filename=md_file, OutputWorkspace="md")
+        LoadMD(Filename=Q3D_file, OutputWorkspace="Q3D")
+
+        if mtd["Q3D"].getDimension(0).getNBins() != self.Q_bins:
+            DeleteWorkspace(Workspace="Q3D")
+            self.bin_Q("md", arrays["Q_max"].item())
+
+        self.runs = arrays["runs"].tolist()
+        self.lorentz = arrays["lorentz"].item()
+
+        self.update_Q(
+            arrays["Q_max"].item(),
+            arrays["wavelength"].tolist(),
+            [arrays[name] for name in names],
+            arrays["two_theta"],
+            arrays["az_phi"],
+            arrays["lamda"],
+            list(arrays["Rs"]),
+        )
+
+        return True
+
+    def can_add_runs(self, instrument):
+        return (
+            self.dataset_args is not None
+            and self.dataset_args["instrument"] == instrument
+            and self.is_event_instrument(instrument)
+            and self.has_Q()
+            and mtd.doesExist("Q3D")
+            and len(getattr(self, "runs", [])) > 0
+        )
+
+    def get_new_runs(self, runs):
+        return [run for run in self.unique_runs(runs) if run not in self.runs]
+
+    def get_number_runs(self):
+        return len(self.runs)
+
+    def add_runs(
+        self, instrument, IPTS, runs, time_stop, det_cal, tube_cal, n_workers=4
+    ):
+        """
+        Convert further event runs and add them to the current dataset.
+
+        Only runs not converted yet are processed, with the wavelength
+        band, Lorentz correction and Q-sample extent of the dataset. They
+        are merged into the MD workspace and accumulated into its
+        histogram, while the peaks table is kept. Nothing is added unless
+        the instrument, proposal, calibrations and stop time are those of
+        the dataset. If the conversion fails, the runs binned before the
+        failure are kept in the dataset. Otherwise, the extended dataset is
+        cached under the settings it was first converted with.
+
+        Parameters
+        ----------
+        instrument : str
+            Beamline name.
+        IPTS : int
+            Proposal number.
+        runs : list of int
+            Run numbers, of which those already converted are skipped.
+        time_stop : float
+            Time at which to stop loading events.
+        det_cal, tube_cal : str
+            Detector and tube calibration files.
+        n_workers : int, optional
+            Number of runs processed at once. Default is 4.
+
+        Yields
+        ------
+        binned : int
+            Number of new runs added to the histogram so far.
+
+        """
+
+        if not self.matches_dataset(
+            instrument, IPTS, time_stop, det_cal, tube_cal
+        ):
+            return
+
+        runs = self.get_new_runs(runs)
+
+        if not self.runs_exist(instrument, IPTS, runs):
+            return
+
+        self.wait_for_save()
+
+        self.converted = []
+
+        try:
+            yield from self.convert_runs(
+                instrument,
+                IPTS,
+                runs,
+                time_stop,
+                det_cal,
+                tube_cal,
+                self.wavelength,
+                self.lorentz,
+                self.Q_max_cut,
+                n_workers,
+            )
+        finally:
+            results = self.converted
+
+            if len(results) > 0:
+                self.runs = self.runs + runs[: len(results)]
+                self.counts = self.counts + [
+                    result["counts"] for result in results
+                ]
+                self.Rs = self.Rs + [result["R"] for result in results]
+
+                self.update_Q_volume()
+
+        key = self.dataset_key(
+            runs=self.runs,
+            wavelength=self.wavelength,
+            lorentz=self.lorentz,
+            **self.dataset_args,
+        )
+
+        self.save_dataset(key, replaces=self.dataset_entry)
+
+        self.dataset_entry = key
+
+    def convert_data(
+        self, instrument, wavelength, lorentz, min_d=None, bins=256
+    ):
+        self.wait_for_save()
+
+        if min_d is not None:
+            Q_max = 2 * np.pi / min_d
+
+        if mtd.doesExist("data"):
+            input_ws_names = mtd["data"].getNames()
+            input_ws = input_ws_names[0]
+
+            Rs = []
+
+            r = mtd[input_ws].getExperimentInfo(0).run()
+
+            two_theta = r.getProperty("TwoTheta").value
+            az_phi = r.getProperty("Azimuthal").value
+
+            for ws in input_ws_names:
+                r = mtd[ws].getExperimentInfo(0).run()
+                Rs.append(
+                    [
+                        r.getGoniometer(i).getR()
+                        for i in range(r.getNumGoniometers())
+                    ]
                 )
 
+            lamda = wavelength[0]
+
+            counts = [
+                np.swapaxes(mtd[ws].getSignalArray().copy(), 0, 1)
+                for ws in input_ws_names
+            ]
+
+            counts = [c.reshape(-1, c.shape[2]) for c in counts]
+
+            if min_d is None:
+                k = 2 * np.pi / wavelength[0]
+                Q_max = k * np.sin(0.5 * max(two_theta))
+
+            ConvertHFIRSCDtoMDE(
+                InputWorkspace="data",
+                Wavelength=wavelength[0],
+                LorentzCorrection=lorentz,
+                MinValues=[-Q_max, -Q_max, -Q_max],
+                MaxValues=[+Q_max, +Q_max, +Q_max],
+                MaxRecursionDepth=5,
+                OutputWorkspace="md",
+            )
+
             input_ws_names = mtd["md"].getNames()
             input_ws = input_ws_names[0]
 
@@ -461,87 +1243,192 @@ class UBModel(NeuXtalVizModel):
 
                 RenameWorkspace(InputWorkspace=input_ws, OutputWorkspace="md")
 
-            self.Q_max_cut = Q_max
+            if mtd.doesExist("Q3D"):
+                DeleteWorkspace(Workspace="Q3D")
 
-            self.Q = "md"
+            self.Q_bins = bins
 
-            BinMD(
-                InputWorkspace=self.Q,
-                AlignedDim0="Q_sample_x,{},{},256".format(-Q_max, Q_max),
-                AlignedDim1="Q_sample_y,{},{},256".format(-Q_max, Q_max),
-                AlignedDim2="Q_sample_z,{},{},256".format(-Q_max, Q_max),
-                OutputWorkspace="Q3D",
-            )
+            self.bin_Q("md", Q_max)
 
-            CreatePeaksWorkspace(
-                InstrumentWorkspace=self.Q,
-                NumberOfPeaks=0,
-                OutputWorkspace=self.table,
+            self.update_Q(
+                Q_max, wavelength, counts, two_theta, az_phi, lamda, Rs
             )
 
-            CopySample(
-                InputWorkspace=self.Q,
-                OutputWorkspace=self.cell,
-                CopyName=False,
-                CopyMaterial=False,
-                CopyEnvironment=False,
-                CopyShape=False,
+            self.dataset_args = {"instrument": instrument}
+
+    def update_Q(
+        self, Q_max, wavelength, counts, two_theta, az_phi, lamda, Rs
+    ):
+        """
+        Use the merged Q-sample workspace and store the per-run detector
+        data.
+
+        Parameters
+        ----------
+        Q_max : float
+            Extent of the Q-sample volume.
+        wavelength : list
+            Wavelength band.
+        counts : list of 2d arrays
+            Detector counts of each run.
+        two_theta, az_phi : 1d arrays
+            Scattering and azimuthal angles of each detector.
+        lamda : float or 1d array
+            Wavelength bin centres.
+        Rs : list
+            Goniometer matrices of each run.
+
+        """
+
+        self.Q_max_cut = Q_max
+
+        self.Q = "md"
+
+        CreatePeaksWorkspace(
+            InstrumentWorkspace=self.Q,
+            NumberOfPeaks=0,
+            OutputWorkspace=self.table,
+        )
+
+        CopySample(
+            InputWorkspace=self.Q,
+            OutputWorkspace=self.cell,
+            CopyName=False,
+            CopyMaterial=False,
+            CopyEnvironment=False,
+            CopyShape=False,
+        )
+
+        self.update_Q_volume()
+
+        self.wavelength = wavelength
+        self.counts = counts
+
+        self.two_theta = np.array(two_theta)
+        self.az_phi = np.array(az_phi)
+        self.lamda = lamda
+        self.Rs = Rs
+
+        kf_x = np.sin(two_theta) * np.cos(az_phi)
+        kf_y = np.sin(two_theta) * np.sin(az_phi)
+        kf_z = np.cos(two_theta)
+
+        self.nu = np.rad2deg(np.arcsin(kf_y))
+        self.gamma = np.rad2deg(np.arctan2(kf_x, kf_z))
+
+    def update_Q_volume(self):
+        """
+        Normalize the Q-sample histogram for display.
+
+        The histogram keeps its full extent so that further runs can be
+        added to it, and the empty border is cropped here instead.
+        Normalization works slab by slab on one copy of the occupied bins.
+
+        """
+
+        signal, axes, spacing = self.get_Q_histogram()
+
+        self.signal, (x, y, z) = normalize_volume(signal, axes, self.Q_max_cut)
+
+        self.spacing = spacing
+
+        self.min_lim = x[0], y[0], z[0]
+        self.max_lim = x[-1], y[-1], z[-1]
+
+    def get_Q_histogram(self):
+        """
+        Q-sample overview histogram.
+
+        Returns
+        -------
+        signal : 3d array
+            Histogram signal.
+        axes : 3-element list of 1d arrays
+            Bin centers along each axis.
+        spacing : 3-element tuple
+            Bin widths.
+
+        """
+
+        signal = mtd["Q3D"].getSignalArray()
+
+        dims = [mtd["Q3D"].getDimension(i) for i in range(3)]
+
+        axes = [
+            np.linspace(
+                dim.getMinimum() + dim.getBinWidth() / 2,
+                dim.getMaximum() - dim.getBinWidth() / 2,
+                dim.getNBins(),
             )
+            for dim in dims
+        ]
 
-            CompactMD(InputWorkspace="Q3D", OutputWorkspace="Q3D")
+        spacing = tuple([dim.getBinWidth() for dim in dims])
 
-            signal = mtd["Q3D"].getSignalArray().copy()
-            signal[np.isclose(signal, 0)] = np.nan
+        return signal, axes, spacing
 
-            threshold = np.nanpercentile(signal, 90)
-            signal[signal <= threshold] = np.nan
+    def get_Q_preview_bins(self):
+        """
+        Bins of the coarse previews of the Q-sample volume.
 
-            # threshold = np.nanpercentile(signal, 99)
-            # signal[signal >= threshold] = threshold
+        Returns
+        -------
+        levels : list of int
+            Bins along each axis from 64 doubling up to below ``Q_bins``.
 
-            dims = [mtd["Q3D"].getDimension(i) for i in range(3)]
+        """
 
-            x, y, z = [
-                np.linspace(
-                    dim.getMinimum() + dim.getBinWidth() / 2,
-                    dim.getMaximum() - dim.getBinWidth() / 2,
-                    dim.getNBins(),
-                )
-                for dim in dims
-            ]
+        levels, bins = [], 64
+        while bins < self.Q_bins:
+            levels.append(bins)
+            bins *= 2
 
-            Qx, Qy, Qz = np.meshgrid(x, y, z, indexing="ij")
+        return levels
 
-            mask = (Qx**2 + Qy**2 + Qz**2) > self.Q_max_cut**2
-            signal[mask] = np.nan
+    def get_Q_preview(self, bins):
+        """
+        Coarse display volume of the histogram accumulated so far.
 
-            self.spacing = tuple([dim.getBinWidth() for dim in dims])
+        Blocks of the histogram are summed down to the preview bins, so a
+        preview costs one pass over the histogram and a normalization of
+        the small volume. The normalized full resolution volume is left
+        untouched.
 
-            self.min_lim = x[0], y[0], z[0]
-            self.max_lim = x[-1], y[-1], z[-1]
+        Parameters
+        ----------
+        bins : int
+            Bins along each axis of the preview.
 
-            signal = np.log10(signal)
+        Returns
+        -------
+        Q_dict : dict
+            Volume signal, limits and spacing, or `None` if nothing has
+            been converted yet.
 
-            smin = np.nanmin(signal)
-            smax = np.nanmax(signal)
+        """
 
-            self.signal = np.round(
-                255 * (signal - smin) / (smax - smin)
-            ).astype(np.uint8)
+        if not mtd.doesExist("Q3D"):
+            return None
 
-            self.wavelength = wavelength
-            self.counts = counts
+        signal, axes, spacing = self.get_Q_histogram()
 
-            self.two_theta = np.array(two_theta)
-            self.lamda = lamda
-            self.Rs = Rs
+        factor = max(1, signal.shape[0] // bins)
 
-            kf_x = np.sin(two_theta) * np.cos(az_phi)
-            kf_y = np.sin(two_theta) * np.sin(az_phi)
-            kf_z = np.cos(two_theta)
+        signal, axes = coarsen_volume(signal, axes, factor)
+
+        Q_max = np.abs(axes[0]).max() + spacing[0] * factor / 2
+
+        volume, (x, y, z) = normalize_volume(signal, axes, Q_max)
 
-            self.nu = np.rad2deg(np.arcsin(kf_y))
-            self.gamma = np.rad2deg(np.arctan2(kf_x, kf_z))
+        if volume.size == 0:
+            return None
+
+        return {
+            "signal": volume,
+            "min_lim": (x[0], y[0], z[0]),
+            "max_lim": (x[-1], y[-1], z[-1]),
+            "spacing": tuple([width * factor for width in spacing]),
+        }
 
     def add_peak(self, ind, val, horz, vert):
         R = self.Rs[ind]
@@ -1866,8 +2753,13 @@ class UBModel(NeuXtalVizModel):
 
         """
 
+        self.wait_for_save()
+
         LoadMD(Filename=filename, OutputWorkspace=self.Q)
 
+        self.dataset_args = None
+        self.dataset_entry = None
+
     def save_Q(self, filename):
         """
         Save Q file.
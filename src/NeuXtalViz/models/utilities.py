@@ -3,11 +3,15 @@ from mantid.simpleapi import mtd
 import multiprocessing
 import numpy as np
 
+from NeuXtalViz.models.md_export import histo_dimensions, save_ascii
+
 
 def SaveMDToAscii(workspace, filename, exclude_integrated=True, format="%.6e"):
     """
     Save an MDHistoToWorkspace to an ASCII file (column format).
 
+    Rows are streamed in blocks without building the coordinate grid.
+
     workspace : str
       Name of workspace as string.
     filename : str
@@ -24,37 +28,24 @@ def SaveMDToAscii(workspace, filename, exclude_integrated=True, format="%.6e"):
     if ws.id() != "MDHistoWorkspace":
         raise ValueError("The workspace is not an MDHistoToWorkspace")
 
-    if exclude_integrated:
-        dims = ws.getNonIntegratedDimensions()
-    else:
-        dims = [ws.getDimension(i) for i in range(ws.getNumDims())]
-
-    dimarrays = [
-        np.linspace(
-            d.getMinimum() + (d.getX(1) - d.getX(0)) * 0.5,
-            d.getMaximum() - (d.getX(1) - d.getX(0)) * 0.5,
-            d.getNBins(),
-        )
+    dims = [ws.getDimension(i) for i in range(ws.getNumDims())]
+
+    edges = [
+        np.linspace(d.getMinimum(), d.getMaximum(), d.getNBoundaries())
         for d in dims
     ]
 
-    if len(dimarrays) > 1:
-        newdimarrays = np.meshgrid(*dimarrays, indexing="ij")
-    else:
-        newdimarrays = dimarrays
-
-    data = ws.getSignalArray() * 1.0
-    err = np.sqrt(ws.getErrorSquaredArray())
-
-    header = "Intensity Error " + " ".join([d.getName() for d in dims])
-    header += "\n shape: " + "x".join([str(d.getNBins()) for d in dims])
-
-    to_save = np.column_stack([data.flatten(), err.flatten()])
+    names = [d.getName() for d in dims]
 
-    for d in newdimarrays:
-        to_save = np.c_[to_save, d.flatten()]
+    signal, error_sq, edges, names = histo_dimensions(
+        ws.getSignalArray(),
+        ws.getErrorSquaredArray(),
+        edges,
+        names,
+        exclude_integrated,
+    )
 
-    np.savetxt(filename, to_save, fmt=format, header=header)
+    save_ascii(filename, signal, error_sq, edges, names, format)
 
 
 class ParallelTasks:
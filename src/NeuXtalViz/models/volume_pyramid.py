@@ -0,0 +1,90 @@
+import numpy as np
+
+import skimage.measure
+
+
+class VolumePyramid:
+    """
+    Multi-resolution mip pyramid of a 3d histogram.
+
+    Each level halves the number of bins along every axis by averaging
+    finite values in 2x2x2 blocks. The pyramid is computed once so that
+    a renderer can request the finest level fitting a voxel or memory
+    budget without touching the full resolution data.
+
+    Parameters
+    ----------
+    signal : 3d array
+        Full resolution signal.
+    spacing : 3-element 1d array
+        Bin widths of the full resolution signal.
+    min_size : int, optional
+        Levels are added until every axis of the coarsest level has at
+        most this many bins. Default is 16.
+
+    """
+
+    def __init__(self, signal, spacing, min_size=16):
+        self.signals = [signal]
+        self.spacings = [np.asarray(spacing, dtype=float)]
+
+        while max(self.signals[-1].shape) > min_size:
+            self.signals.append(
+                skimage.measure.block_reduce(
+                    self.signals[-1],
+                    block_size=(2, 2, 2),
+                    func=np.nanmean,
+                    cval=np.nan,
+                )
+            )
+            self.spacings.append(self.spacings[-1] * 2)
+
+    def __len__(self):
+        return len(self.signals)
+
+    def select_level(self, max_voxels=None, max_bytes=None):
+        """
+        Finest level within a render budget.
+
+        Parameters
+        ----------
+        max_voxels : int, optional
+            Maximum number of voxels. Default is no limit.
+        max_bytes : int, optional
+            Maximum number of bytes. Default is no limit.
+
+        Returns
+        -------
+        level : int
+            Pyramid level with zero being the full resolution. The coarsest
+            level is returned if no level fits the budget.
+
+        """
+
+        for level, signal in enumerate(self.signals):
+            fits_voxels = max_voxels is None or signal.size <= max_voxels
+            fits_bytes = max_bytes is None or signal.nbytes <= max_bytes
+            if fits_voxels and fits_bytes:
+                return level
+
+        return len(self.signals) - 1
+
+    def get_level(self, level):
+        """
+        Signal and bin widths of a pyramid level.
+
+        Parameters
+        ----------
+        level : int
+            Pyramid level.
+
+        Returns
+        -------
+        signal : 3d array
+            Signal of level.
+        spacing : 3-element 1d array
+            Bin widths of level.
+
+        """
+
+        return self.signals[level], self.spacings[level]
@@ -1,121 +1,106 @@
-from mantid.simpleapi import (
-    LoadMD,
-    CloneMDWorkspace,
-    IntegrateMDHistoWorkspace,
-    DivideMD,
-    CompactMD,
-    mtd,
-)
-
 import numpy as np
 import scipy.linalg
 
-import skimage.measure
-
 from NeuXtalViz.models.base_model import NeuXtalVizModel
-from NeuXtalViz.models.utilities import SaveMDToAscii
+from NeuXtalViz.models.md_export import save_histo
+from NeuXtalViz.models.md_histo_reader import MDHistoReader
+from NeuXtalViz.models.slab_integration import SlabIntegrator
+from NeuXtalViz.models.volume_pyramid import VolumePyramid
 
 
 class VolumeSlicerModel(NeuXtalVizModel):
     def __init__(self):
         super(VolumeSlicerModel, self).__init__()
 
-    def load_md_histo_workspace(self, filename):
-        LoadMD(Filename=filename, OutputWorkspace="histo")
+        self.integrator = None
+        self.slice_histo = None
+        self.cut_histo = None
 
-        signal = mtd["histo"].getSignalArray().copy()
-        signal_var = mtd["histo"].getErrorSquaredArray().copy()
-
-        mask = np.isfinite(signal) & np.isfinite(signal_var)
+    def load_md_histo_workspace(self, filename):
+        reader = MDHistoReader(filename)
 
-        signal[~mask] = 0
-        signal_var[~mask] = 0
+        bounds = reader.compact_bounds()
 
-        mtd["histo"].setSignalArray(signal)
-        mtd["histo"].setErrorSquaredArray(signal_var)
+        signal, signal_var, edges = reader.read(bounds)
 
-        CompactMD(InputWorkspace="histo", OutputWorkspace="volume")
+        self.shape = signal.shape
 
-        signal = mtd["volume"].getSignalArray()
+        self.names = reader.names
+        self.units = reader.units
 
-        self.shape = signal.shape
+        self.integrator = SlabIntegrator(signal, signal_var, edges)
+        self.slice_histo = None
+        self.cut_histo = None
 
-        dims = [mtd["volume"].getDimension(i) for i in range(3)]
+        self.spacing = np.array([edge[1] - edge[0] for edge in edges])
 
-        self.min_lim = np.array(
-            [dim.getMinimum() + dim.getBinWidth() * 0.5 for dim in dims]
-        )
+        self.min_lim = np.array([edge[0] for edge in edges])
+        self.max_lim = np.array([edge[-1] for edge in edges])
 
-        self.max_lim = np.array(
-            [dim.getMaximum() - dim.getBinWidth() * 0.5 for dim in dims]
-        )
+        self.min_lim += self.spacing * 0.5
+        self.max_lim -= self.spacing * 0.5
 
         self.labels = [
-            "{} ({})".format(dim.name, dim.getUnits()) for dim in dims
+            "{} ({})".format(name, unit)
+            for name, unit in zip(self.names, self.units)
         ]
 
-        self.spacing = np.array([dim.getBinWidth() for dim in dims])
+        self.pyramid = VolumePyramid(signal, self.spacing)
 
-        scale = 0.125 / self.spacing
-        scale[scale <= 1] = 1
-        scale = scale.round().astype(int)
+        self.set_B(reader.get_B())
+        self.set_W(reader.W)
 
-        blocks = [(scale[0], 1, 1), (1, scale[1], 1), (1, 1, scale[2])]
-
-        self.signals = []
-        self.spacings = []
-        for block in blocks:
-            self.spacings.append(self.spacing * np.array(block))
-            self.signals.append(
-                skimage.measure.block_reduce(
-                    signal, block_size=block, func=np.nanmean, cval=np.nan
-                )
-            )
-
-        self.set_B()
-        self.set_W()
+    def save_histo(self, histo, filename, fmt=None):
+        save_histo(
+            filename,
+            histo["signal"],
+            histo["error_sq"],
+            histo["edges"],
+            histo["names"],
+            fmt,
+        )
 
-    def save_slice(self, filename):
-        SaveMDToAscii("slice", filename)
+    def save_slice(self, filename, fmt=None):
+        self.save_histo(self.slice_histo, filename, fmt)
 
-    def save_cut(self, filename):
-        SaveMDToAscii("cut", filename)
+    def save_cut(self, filename, fmt=None):
+        self.save_histo(self.cut_histo, filename, fmt)
 
     def is_histo_loaded(self):
-        return mtd.doesExist("histo")
+        return self.integrator is not None
 
     def is_sliced(self):
-        return mtd.doesExist("slice")
+        return self.slice_histo is not None
 
     def is_cut(self):
-        return mtd.doesExist("cut")
-
-    def set_B(self):
-        if self.has_UB("histo"):
-            ei = mtd["histo"].getExperimentInfo(0)
-
-            B = ei.sample().getOrientedLattice().getB().copy()
+        return self.cut_histo is not None
 
+    def set_B(self, B):
+        if B is not None:
             self.set_UB(B)
 
-    def set_W(self):
-        ei = mtd["histo"].getExperimentInfo(0)
-
+    def set_W(self, W):
         self.W = np.eye(3)
 
-        if ei.run().hasProperty("W_MATRIX"):
-            self.W = ei.run().getLogData("W_MATRIX").value.reshape(3, 3)
+        if W is not None:
+            self.W = W.copy()
+
+    def get_histo_level(self, max_voxels=None, max_bytes=None):
+        return self.pyramid.select_level(max_voxels, max_bytes)
 
-    def get_histo_info(self, normal):
-        ind = normal.index(1)
+    def get_histo_info(self, normal, max_voxels=None, max_bytes=None):
+        level = self.get_histo_level(max_voxels, max_bytes)
+
+        signal, spacing = self.pyramid.get_level(level)
 
         histo_dict = {}
 
-        histo_dict["signal"] = self.signals[ind].copy()
+        histo_dict["signal"] = signal.copy()
+        histo_dict["level"] = level
 
         histo_dict["min_lim"] = self.min_lim
         histo_dict["max_lim"] = self.max_lim
-        histo_dict["spacing"] = self.spacings[ind]
+        histo_dict["spacing"] = spacing
         histo_dict["labels"] = self.labels
 
         P, T, S = self.get_transforms()
@@ -135,38 +120,36 @@ class VolumeSlicerModel(NeuXtalVizModel):
 
         self.integrate = integrate
 
-        pbin = [None if norm == 0 else integrate for norm in normal]
+        i = np.array(normal).tolist().index(1)
 
-        IntegrateMDHistoWorkspace(
-            InputWorkspace="volume",
-            P1Bin=pbin[0],
-            P2Bin=pbin[1],
-            P3Bin=pbin[2],
-            OutputWorkspace="slice",
-        )
+        signal, signal_var = self.integrator.integrate(i, integrate)
 
-        i = np.array(normal).tolist().index(1)
+        edges = self.integrator.edges.copy()
+        edges[i] = np.array(integrate)
 
-        form = "{} = ({:.2f},{:.2f})"
+        self.slice_histo = {
+            "signal": np.expand_dims(signal, i),
+            "error_sq": np.expand_dims(signal_var, i),
+            "edges": edges,
+            "names": self.names,
+            "units": self.units,
+        }
+
+        self.cut_histo = None
 
-        title = form.format(mtd["slice"].getDimension(i).name, *integrate)
+        form = "{} = ({:.2f},{:.2f})"
 
-        dims = mtd["slice"].getNonIntegratedDimensions()
+        title = form.format(self.names[i], *integrate)
 
-        x, y = [
-            np.linspace(
-                dim.getMinimum(), dim.getMaximum(), dim.getNBoundaries()
-            )
-            for dim in dims
-        ]
+        x, y = self.integrator.remaining_edges(i)
 
-        labels = ["{} ({})".format(dim.name, dim.getUnits()) for dim in dims]
+        labels = [label for j, label in enumerate(self.labels) if j != i]
 
         slice_dict["x"] = x
         slice_dict["y"] = y
         slice_dict["labels"] = labels
 
-        signal = mtd["slice"].getSignalArray().T.copy().squeeze()
+        signal = signal.T.copy()
 
         signal[signal <= 0] = np.nan
         signal[np.isinf(signal)] = np.nan
@@ -203,38 +186,45 @@ class VolumeSlicerModel(NeuXtalVizModel):
 
         integrate = [value - thickness, value + thickness]
 
-        pbin = [None if ax == 0 else integrate for ax in axis]
+        i = np.array(self.normal).tolist().index(1)
+        j = np.array(axis).tolist().index(1)
 
-        IntegrateMDHistoWorkspace(
-            InputWorkspace="slice",
-            P1Bin=pbin[0],
-            P2Bin=pbin[1],
-            P3Bin=pbin[2],
-            OutputWorkspace="cut",
+        histo = self.slice_histo
+
+        integrator = SlabIntegrator(
+            histo["signal"], histo["error_sq"], histo["edges"]
         )
 
-        i = np.array(self.normal).tolist().index(1)
-        j = np.array(axis).tolist().index(1)
+        signal, signal_var = integrator.integrate(j, integrate)
+
+        edges = histo["edges"].copy()
+        edges[j] = np.array(integrate)
+
+        self.cut_histo = {
+            "signal": np.expand_dims(signal, j),
+            "error_sq": np.expand_dims(signal_var, j),
+            "edges": edges,
+            "names": histo["names"],
+            "units": histo["units"],
+        }
 
         form = "{} = ({:.2f},{:.2f})"
 
-        title = form.format(mtd["slice"].getDimension(i).name, *self.integrate)
+        title = form.format(self.names[i], *self.integrate)
         title += " / "
-        title += form.format(mtd["cut"].getDimension(j).name, *integrate)
+        title += form.format(self.names[j], *integrate)
 
-        dim = mtd["cut"].getNonIntegratedDimensions()[0]
+        k = ({0, 1, 2} - {i, j}).pop()
 
-        x = np.linspace(
-            dim.getMinimum(), dim.getMaximum(), dim.getNBoundaries()
-        )
+        x = self.integrator.edges[k]
 
         x = 0.5 * (x[1:] + x[:-1])
 
-        label = "{} ({})".format(dim.name, dim.getUnits())
+        label = "{} ({})".format(self.names[k], self.units[k])
 
         cut_dict["x"] = x
-        cut_dict["y"] = mtd["cut"].getSignalArray().squeeze()
-        cut_dict["e"] = np.sqrt(mtd["cut"].getErrorSquaredArray().squeeze())
+        cut_dict["y"] = signal.squeeze()
+        cut_dict["e"] = np.sqrt(signal_var.squeeze())
         cut_dict["label"] = label
         cut_dict["value"] = value
         cut_dict["title"] = title
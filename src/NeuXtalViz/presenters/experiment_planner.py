@@ -1,3 +1,5 @@
+import os
+
 from NeuXtalViz.presenters.base_presenter import NeuXtalVizPresenter
 
 
@@ -13,6 +15,7 @@ class Experiment(NeuXtalVizPresenter):
         self.view.connect_switch_lattice_centering(self.switch_centering)
         self.view.connect_wavelength(self.update_wavelength)
         self.view.connect_optimize(self.optimize_coverage)
+        self.view.connect_cancel_optimize(self.cancel_optimize_coverage)
         self.view.connect_mesh(self.mesh_scan)
         self.view.connect_calculate_single(self.calculate_single)
         self.view.connect_calculate_double(self.calculate_double)
@@ -36,6 +39,7 @@ class Experiment(NeuXtalVizPresenter):
         self.switch_crystal()
 
         self.draw_idle = True
+        self.cancel_optimize = False
 
     def load_detector(self):
         inst = self.view.get_instrument()
@@ -380,13 +384,19 @@ class Experiment(NeuXtalVizPresenter):
             self.draw_idle = True
 
     def optimize_coverage(self):
+        self.cancel_optimize = False
+
         worker = self.view.worker(self.optimize_coverage_process)
         worker.connect_result(self.optimize_coverage_complete)
         worker.connect_finished(self.visualize)
         worker.connect_progress(self.update_processing)
+        worker.connect_update(self.view.plot_convergence)
 
         self.view.start_worker_pool(worker)
 
+    def cancel_optimize_coverage(self):
+        self.cancel_optimize = True
+
     def optimize_coverage_complete(self, result):
         title = self.view.get_title()
         if result is not None:
@@ -394,7 +404,7 @@ class Experiment(NeuXtalVizPresenter):
                 self.view.add_orientation(title, "CrystalPlan", angles)
             self.update_peaks()
 
-    def optimize_coverage_process(self, progress):
+    def optimize_coverage_process(self, progress, update):
         point_group = self.view.get_point_group()
         lattice_centering = self.view.get_lattice_centering()
         use = self.view.get_orientations_to_use()
@@ -402,15 +412,27 @@ class Experiment(NeuXtalVizPresenter):
         d_min = self.view.get_d_min()
         wavelength = self.view.get_wavelength()
         n_orient = self.view.get_settings()
+        optimizer = self.view.get_optimizer()
+        seed = self.view.get_seed()
+
+        options = {
+            "Genetic": {
+                "n_indiv": 100,
+                "n_gener": 50,
+                "n_elite": 2,
+                "mutation_rate": 0.15,
+            },
+            "Greedy": {"step": 5},
+            "Annealing": {"n_iter": 2000, "step": 10},
+        }
+
+        max_time = 600
+        patience = 10
 
-        n_elite = 2
-        n_gener = 10
-        n_indiv = 10
-        mutation_rate = 0.15
+        n_proc = max(1, min(8, (os.cpu_count() or 2) // 2))
 
         instrument = self.view.get_instrument()
         mode = self.view.get_mode()
-        axes = self.model.get_goniometer_axes(instrument, mode)
         limits = self.view.get_goniometer_limits()
 
         if self.model.has_UB():
@@ -420,24 +442,65 @@ class Experiment(NeuXtalVizPresenter):
 
             progress("Instrument initialized! ", 10)
 
+            axes, polarities = self.model.get_axes_polarities(instrument, mode)
+            self.model.generate_axes(axes, polarities)
+
             cp = self.model.crystal_plan(
                 use,
                 opt,
-                axes,
                 limits,
                 wavelength,
                 d_min,
                 point_group,
                 lattice_centering,
+                optimizer.lower(),
+                n_proc,
+                seed,
             )
 
             progress("Optimizing peaks coverage", 15)
 
-            values = cp.optimize(
-                n_orient, n_indiv, n_gener, n_elite, mutation_rate
+            steps = cp.iterate(
+                n_orient,
+                max_time,
+                patience,
+                cancel=lambda: self.cancel_optimize,
+                **options[optimizer],
             )
 
-            progress("Peaks coverage optimized!", 0)
+            n_steps = cp.n_steps(n_orient, **options[optimizer])
+
+            values, history = None, []
+
+            for step, (values, completeness) in enumerate(steps, 1):
+                history.append(completeness)
+
+                update(history.copy())
+
+                progress(
+                    "Completeness {:.1f}%".format(completeness),
+                    15 + 80 * min(step, n_steps) // n_steps,
+                )
+
+            progress("Calculating reflections", 95)
+
+            rows = self.view.get_number_of_orientations()
+
+            for i, angles in enumerate(values):
+                setting = self.model.get_setting(angles, limits)
+                self.model.add_orientation(
+                    setting, wavelength, d_min, rows + i
+                )
+
+            completeness = cp.trace[-1][1]
+            elapsed, evaluations = cp.time_to_target(completeness)
+
+            progress(
+                "Peaks coverage optimized! "
+                + "{:.1f}% after {:.1f} s ".format(completeness, elapsed)
+                + "and {} predictions".format(evaluations),
+                0,
+            )
 
             return values
 
@@ -514,6 +577,7 @@ class Experiment(NeuXtalVizPresenter):
             self.switch_group()
             self.view.set_lattice_centering(lc)
             self.view.add_settings(*table)
+            self.model.restore_predictions()
             self.add_settings()
 
     def add_settings(self):
@@ -543,7 +607,9 @@ class Experiment(NeuXtalVizPresenter):
 
         self.create_instrument()
 
-        for row in range(rows):
+        predicted = self.model.get_number_of_predictions()
+
+        for row in range(predicted, rows):
             progress("Calculating settings", 90 // rows * (row + 1) + 5)
 
             angles = self.view.get_angle_setting(row)
@@ -1,3 +1,5 @@
+import os
+
 import numpy as np
 
 from NeuXtalViz.presenters.base_presenter import NeuXtalVizPresenter
@@ -20,6 +22,7 @@ class UB(NeuXtalVizPresenter):
         self.view.connect_browse_tube(self.load_tube_calibration)
 
         self.view.connect_convert_Q(self.convert_Q)
+        self.view.connect_add_runs(self.add_runs)
         self.view.connect_find_peaks(self.find_peaks)
         self.view.connect_find_spacing(self.update_find_spacing)
         self.view.connect_find_distance(self.update_find_distance)
@@ -85,6 +88,8 @@ class UB(NeuXtalVizPresenter):
 
         self.slice_idle = True
         self.volume_idle = True
+        self.Q_previewed = False
+        self.Q_previews = 0
 
         self.view.connect_cluster(self.cluster)
 
@@ -145,10 +150,13 @@ class UB(NeuXtalVizPresenter):
             self.view.set_indices(hkl, int_hkl, int_mnp)
 
     def convert_Q(self):
+        self.Q_previewed = False
+
         worker = self.view.worker(self.convert_Q_process)
         worker.connect_result(self.convert_Q_complete)
         worker.connect_finished(self.visualize)
         worker.connect_progress(self.update_processing)
+        worker.connect_update(self.preview_Q)
 
         self.view.start_worker_pool(worker)
 
@@ -158,7 +166,27 @@ class UB(NeuXtalVizPresenter):
 
             self.update_instrument_view()
 
-    def convert_Q_process(self, progress):
+    def preview_Q(self, Q_dict):
+        if Q_dict["preview"] < self.Q_previews:
+            return
+
+        if self.Q_previewed:
+            self.view.update_Q_volume(Q_dict)
+        else:
+            self.view.add_Q_viz(Q_dict)
+            self.Q_previewed = True
+
+    def publish_Q_previews(self, update, merged, n_runs):
+        levels = self.model.get_Q_preview_bins()
+
+        for bins in levels[:1] if merged < n_runs else levels[1:]:
+            Q_dict = self.model.get_Q_preview(bins)
+            if Q_dict is not None:
+                self.Q_previews += 1
+                Q_dict["preview"] = self.Q_previews
+                update(Q_dict)
+
+    def convert_Q_process(self, progress, update):
         instrument = self.view.get_instrument()
         wavelength = self.view.get_wavelength()
         tube_cal = self.view.get_tube_calibration()
@@ -170,6 +198,7 @@ class UB(NeuXtalVizPresenter):
         lorentz = self.view.get_lorentz()
         time_stop = self.view.get_time_stop()
         d_min = self.view.get_convert_min_d()
+        bins = self.view.get_convert_bins()
 
         validate = [IPTS, runs, wavelength]
 
@@ -181,6 +210,43 @@ class UB(NeuXtalVizPresenter):
 
             progress("Processing...", 1)
 
+            if self.model.is_event_instrument(instrument):
+                n_workers = max(1, min(4, (os.cpu_count() or 2) // 2))
+
+                if not self.model.runs_exist(instrument, IPTS, runs):
+                    progress("Files do not exist.", 0)
+                    return
+
+                n_runs = len(self.model.unique_runs(runs))
+
+                progress("Data loading and converting...", 10)
+
+                for merged in self.model.process_runs(
+                    instrument,
+                    IPTS,
+                    runs,
+                    time_stop,
+                    det_cal,
+                    tube_cal,
+                    wavelength,
+                    lorentz,
+                    d_min,
+                    n_workers,
+                    bins,
+                ):
+                    progress(
+                        "Runs converted {}/{}...".format(merged, n_runs),
+                        10 + 89 * merged // n_runs,
+                    )
+
+                    self.publish_Q_previews(update, merged, n_runs)
+
+                self.view.set_data_list(self.model.get_number_runs())
+
+                progress("Data converted!", 0)
+
+                return mono
+
             progress("Data loading...", 10)
 
             data_load = self.model.load_data(
@@ -206,7 +272,9 @@ class UB(NeuXtalVizPresenter):
 
             progress("Data converting...", 70)
 
-            self.model.convert_data(instrument, wavelength, lorentz, d_min)
+            self.model.convert_data(
+                instrument, wavelength, lorentz, d_min, bins
+            )
 
             progress("Data converted...", 99)
 
@@ -217,6 +285,83 @@ class UB(NeuXtalVizPresenter):
         else:
             progress("Invalid parameters.", 0)
 
+    def add_runs(self):
+        self.Q_previewed = True
+
+        worker = self.view.worker(self.add_runs_process)
+        worker.connect_result(self.convert_Q_complete)
+        worker.connect_finished(self.visualize)
+        worker.connect_progress(self.update_processing)
+        worker.connect_update(self.preview_Q)
+
+        self.view.start_worker_pool(worker)
+
+    def add_runs_process(self, progress, update):
+        instrument = self.view.get_instrument()
+        wavelength = self.view.get_wavelength()
+        tube_cal = self.view.get_tube_calibration()
+        det_cal = self.view.get_detector_calibration()
+
+        IPTS = self.view.get_IPTS()
+        runs = self.view.get_runs()
+        time_stop = self.view.get_time_stop()
+
+        validate = [IPTS, runs, wavelength]
+
+        if all(elem is not None for elem in validate):
+            if not self.model.can_add_runs(instrument):
+                progress("Convert runs before adding more.", 0)
+                return
+
+            if not self.model.matches_dataset(
+                instrument, IPTS, time_stop, det_cal, tube_cal
+            ):
+                progress("Dataset was converted with different settings.", 0)
+                return
+
+            new_runs = self.model.get_new_runs(runs)
+
+            if len(new_runs) == 0:
+                progress("No new runs.", 0)
+                return
+
+            if not self.model.runs_exist(instrument, IPTS, new_runs):
+                progress("Files do not exist.", 0)
+                return
+
+            mono = np.isclose(wavelength[0], wavelength[1])
+
+            n_workers = max(1, min(4, (os.cpu_count() or 2) // 2))
+
+            n_runs = len(new_runs)
+
+            progress("Adding runs...", 10)
+
+            for merged in self.model.add_runs(
+                instrument,
+                IPTS,
+                new_runs,
+                time_stop,
+                det_cal,
+                tube_cal,
+                n_workers,
+            ):
+                progress(
+                    "Runs added {}/{}...".format(merged, n_runs),
+                    10 + 89 * merged // n_runs,
+                )
+
+                self.publish_Q_previews(update, merged, n_runs)
+
+            self.view.set_data_list(self.model.get_number_runs())
+
+            progress("Runs added!", 0)
+
+            return mono
+
+        else:
+            progress("Invalid parameters.", 0)
+
     def add_peak(self):
         if self.model.has_Q():
             ind = self.view.get_data_list()
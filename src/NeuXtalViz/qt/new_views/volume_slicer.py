@@ -39,6 +39,13 @@ cmaps = {
     "Modified": "modified",
 }
 
+export_filters = {
+    "CSV files (*.csv)": "ascii",
+    "NumPy files (*.npz)": "npz",
+    "HDF5 files (*.h5)": "hdf5",
+    "Columnar HDF5 files (*.h5)": "columnar",
+}
+
 opacities = {
     "Linear": {"Low->High": "linear", "High->Low": "linear_r"},
     "Geometric": {"Low->High": "geom", "High->Low": "geom_r"},
@@ -365,14 +372,14 @@ class VolumeSlicerView(NeuXtalVizWidget):
         self.save_cut_button.clicked.connect(self.save_cut)
 
     def save_slice(self):
-        filename = self.save_file_dialog()
+        filename, fmt = self.save_file_dialog()
         if filename:
-            self.view_model.save_slice(filename)
+            self.view_model.save_slice(filename, fmt)
 
     def save_cut(self):
-        filename = self.save_file_dialog()
+        filename, fmt = self.save_file_dialog()
         if filename:
-            self.view_model.save_cut(filename)
+            self.view_model.save_cut(filename, fmt)
 
     def save_file_dialog(self):
         options = QFileDialog.Options()
@@ -381,11 +388,11 @@ class VolumeSlicerView(NeuXtalVizWidget):
         file_dialog = QFileDialog()
         file_dialog.setFileMode(QFileDialog.AnyFile)
 
-        filename, _ = file_dialog.getSaveFileName(
-            self, "Save csv file", "", "CSV files (*.csv)", options=options
+        filename, file_filter = file_dialog.getSaveFileName(
+            self, "Save file", "", ";;".join(export_filters), options=options
         )
 
-        return filename
+        return filename, export_filters.get(file_filter)
 
     def update_colorbar_min(self):
         min_val = self.min_slider.value()
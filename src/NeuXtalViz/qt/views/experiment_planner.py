@@ -80,6 +80,11 @@ class ExperimentView(NeuXtalVizWidget):
 
         self.load_UB_button = QPushButton("Load UB", self)
         self.optimize_button = QPushButton("Optimize Coverage", self)
+        self.optimizer_combo = QComboBox(self)
+        self.optimizer_combo.addItem("Genetic")
+        self.optimizer_combo.addItem("Greedy")
+        self.optimizer_combo.addItem("Annealing")
+        self.cancel_button = QPushButton("Cancel", self)
         self.delete_button = QPushButton("Delete Highlighted", self)
         self.highlight_button = QPushButton("Highlight All", self)
 
@@ -125,6 +130,13 @@ class ExperimentView(NeuXtalVizWidget):
 
         self.settings_line.setValidator(validator)
 
+        seed_label = QLabel("Seed")
+        self.seed_line = QLineEdit("")
+
+        validator = QIntValidator(0, 2147483647)
+
+        self.seed_line.setValidator(validator)
+
         resize = QHeaderView.Stretch
 
         self.goniometer_table = QTableWidget()
@@ -188,10 +200,12 @@ class ExperimentView(NeuXtalVizWidget):
         goniometer_tab = QWidget()
         motor_tab = QWidget()
         plan_tab = QWidget()
+        optimization_tab = QWidget()
 
         goniometer_layout = QVBoxLayout()
         motor_layout = QVBoxLayout()
         plan_layout = QVBoxLayout()
+        optimization_layout = QVBoxLayout()
 
         mode_layout = QHBoxLayout()
         mode_layout.addWidget(self.mode_combo)
@@ -205,7 +219,11 @@ class ExperimentView(NeuXtalVizWidget):
         planning_layout.addStretch(1)
         planning_layout.addWidget(settings_label)
         planning_layout.addWidget(self.settings_line)
+        planning_layout.addWidget(self.optimizer_combo)
+        planning_layout.addWidget(seed_label)
+        planning_layout.addWidget(self.seed_line)
         planning_layout.addWidget(self.optimize_button)
+        planning_layout.addWidget(self.cancel_button)
 
         save_layout = QHBoxLayout()
         save_layout.addWidget(self.delete_button)
@@ -243,13 +261,23 @@ class ExperimentView(NeuXtalVizWidget):
         plan_layout.setStretch(1, 2)
         plan_layout.setStretch(2, 1)
 
+        self.canvas_opt = FigureCanvas(Figure(constrained_layout=True))
+
+        optimization_layout.addWidget(self.canvas_opt)
+
+        self.ax_opt = self.canvas_opt.figure.subplots(1, 1)
+        self.ax_opt.set_xlabel("Step")
+        self.ax_opt.set_ylabel("Completeness [%]")
+
         goniometer_tab.setLayout(goniometer_layout)
         motor_tab.setLayout(motor_layout)
         plan_tab.setLayout(plan_layout)
+        optimization_tab.setLayout(optimization_layout)
 
         values_tab.addTab(goniometer_tab, "Goniometers")
         values_tab.addTab(motor_tab, "Calibration/Motors")
         values_tab.addTab(plan_tab, "Plan")
+        values_tab.addTab(optimization_tab, "Optimization")
 
         result_layout.addWidget(values_tab)
 
@@ -456,6 +484,9 @@ class ExperimentView(NeuXtalVizWidget):
     def connect_optimize(self, optimize):
         self.optimize_button.clicked.connect(optimize)
 
+    def connect_cancel_optimize(self, cancel):
+        self.cancel_button.clicked.connect(cancel)
+
     def connect_mesh(self, mesh):
         self.mesh_button.clicked.connect(mesh)
 
@@ -568,7 +599,7 @@ class ExperimentView(NeuXtalVizWidget):
             self,
             "Load experiment file",
             "",
-            "Experiment files (*.nxs)",
+            "Experiment files (*.nxs);;Binary plan files (*.npz)",
             options=options,
         )
 
@@ -585,12 +616,12 @@ class ExperimentView(NeuXtalVizWidget):
             self,
             "Save experiment file",
             path,
-            "Experiment files (*.nxs)",
+            "Experiment files (*.nxs);;Binary plan files (*.npz)",
             options=options,
         )
 
         if filename is not None:
-            if not filename.endswith(".nxs"):
+            if not filename.endswith((".nxs", ".npz")):
                 filename += ".nxs"
 
         return filename
@@ -945,6 +976,13 @@ class ExperimentView(NeuXtalVizWidget):
         if self.settings_line.hasAcceptableInput():
             return int(self.settings_line.text())
 
+    def get_optimizer(self):
+        return self.optimizer_combo.currentText()
+
+    def get_seed(self):
+        if self.seed_line.hasAcceptableInput():
+            return int(self.seed_line.text())
+
     def get_optimized_settings(self):
         col = self.plan_table.columnCount() - 5
 
@@ -1264,6 +1302,21 @@ class ExperimentView(NeuXtalVizWidget):
         self.canvas_cov.draw_idle()
         self.canvas_cov.flush_events()
 
+    def plot_convergence(self, completeness):
+        self.ax_opt.clear()
+
+        x = np.arange(len(completeness))
+
+        self.ax_opt.plot(x, completeness, "-", color="C0")
+
+        self.ax_opt.minorticks_on()
+
+        self.ax_opt.set_xlabel("Step")
+        self.ax_opt.set_ylabel("Completeness [%]")
+
+        self.canvas_opt.draw_idle()
+        self.canvas_opt.flush_events()
+
     def plot_instrument(self, gamma_inst, nu_inst, gamma, nu, lamda):
         if self.cb_inst is not None:
             self.cb_inst.remove()
@@ -361,6 +361,13 @@ class UBView(NeuXtalVizWidget):
         self.convert_min_d_line = QLineEdit("0.7")
         self.convert_min_d_line.setValidator(validator)
 
+        bins_label = QLabel("Bins:", self)
+
+        self.convert_bins_combo = QComboBox(self)
+        self.convert_bins_combo.addItem("128")
+        self.convert_bins_combo.addItem("256")
+        self.convert_bins_combo.setCurrentIndex(1)
+
         validator = QIntValidator(1, 1000, self)
 
         self.filter_time_line = QLineEdit("")
@@ -389,18 +396,22 @@ class UBView(NeuXtalVizWidget):
         instrument_params_layout.addWidget(self.tube_browse_button, 2, 1)
 
         self.convert_to_q_button = QPushButton("Convert", self)
+        self.add_runs_button = QPushButton("Add Runs", self)
 
         self.lorentz_box = QCheckBox("Lorentz Correction", self)
         self.lorentz_box.setChecked(True)
 
         convert_to_q_action_layout = QHBoxLayout()
         convert_to_q_action_layout.addWidget(self.convert_to_q_button)
+        convert_to_q_action_layout.addWidget(self.add_runs_button)
         convert_to_q_action_layout.addWidget(self.lorentz_box)
         convert_to_q_action_layout.addWidget(filter_time_label)
         convert_to_q_action_layout.addWidget(self.filter_time_line)
         convert_to_q_action_layout.addStretch(1)
         convert_to_q_action_layout.addWidget(d_min_label)
         convert_to_q_action_layout.addWidget(self.convert_min_d_line)
+        convert_to_q_action_layout.addWidget(bins_label)
+        convert_to_q_action_layout.addWidget(self.convert_bins_combo)
         convert_to_q_action_layout.addLayout(wavelength_params_layout)
 
         convert_to_q_tab_layout.addLayout(experiment_params_layout)
@@ -1600,6 +1611,9 @@ class UBView(NeuXtalVizWidget):
     def connect_convert_Q(self, convert_Q):
         self.convert_to_q_button.clicked.connect(convert_Q)
 
+    def connect_add_runs(self, add_runs):
+        self.add_runs_button.clicked.connect(add_runs)
+
     def connect_find_peaks(self, find_peaks):
         self.find_button.clicked.connect(find_peaks)
 
@@ -2034,13 +2048,13 @@ class UBView(NeuXtalVizWidget):
         if self.convert_min_d_line.hasAcceptableInput():
             return float(self.convert_min_d_line.text())
 
-    def add_Q_viz(self, Q_dict):
-        self.clear_scene()
+    def get_convert_bins(self):
+        return int(self.convert_bins_combo.currentText())
 
+    def add_Q_volume(self, Q_dict):
         signal = Q_dict.get("signal")
         spacing = Q_dict.get("spacing")
         min_lim = Q_dict.get("min_lim")
-        max_lim = Q_dict.get("max_lim")
 
         grid = pv.ImageData(
             spacing=spacing, dimensions=signal.shape, origin=min_lim
@@ -2059,8 +2073,33 @@ class UBView(NeuXtalVizWidget):
             # log_scale=True,
             # shade=True,
             culling=True,
+            name="Q_volume",
         )
 
+    def update_Q_volume(self, Q_dict):
+        """
+        Swap the displayed Q-sample volume, keeping the rest of the scene
+        and the camera.
+
+        Parameters
+        ----------
+        Q_dict : dict
+            Volume signal, limits and spacing.
+
+        """
+
+        self.add_Q_volume(Q_dict)
+
+        self.plotter.render()
+
+    def add_Q_viz(self, Q_dict):
+        self.clear_scene()
+
+        min_lim = Q_dict.get("min_lim")
+        max_lim = Q_dict.get("max_lim")
+
+        self.add_Q_volume(Q_dict)
+
         transforms = Q_dict.get("transforms")
         intensities = Q_dict.get("intensities")
         indexings = Q_dict.get("indexings")
@@ -9,6 +9,7 @@ class WorkerSignals(QObject):
     error = Signal(tuple)
     progress = Signal(str, int)
     result = Signal(object)
+    update = Signal(object)
 
 
 class Worker(QRunnable):
@@ -38,6 +39,9 @@ class Worker(QRunnable):
     def emit_progress(self, message, progress):
         self.signals.progress.emit(message, progress)
 
+    def emit_update(self, data):
+        self.signals.update.emit(data)
+
     def connect_result(self, process):
         self.signals.result.connect(process)
 
@@ -47,6 +51,10 @@ class Worker(QRunnable):
     def connect_progress(self, process):
         self.signals.progress.connect(process)
 
+    def connect_update(self, process):
+        self.kwargs["update"] = self.emit_update
+        self.signals.update.connect(process)
+
 
 class ThreadPool(QThreadPool):
     def __init__(self):
@@ -48,6 +48,8 @@ class VolumeSlicerView:
 
         self.last_nxs_length = 0
         self.histo = None
+        self.refine_task = None
+        self.refine_delay = 0.5
         ensure_future(self.add_histo_loop())
 
         self.create_ui()
@@ -183,7 +185,25 @@ class VolumeSlicerView:
 
         self.slice_data()
 
-    def redraw_data(self, _=None):
+        if self.view_model.refine_pending():
+            self.refine_task = create_task(self.refine_when_idle())
+
+    async def refine_when_idle(self):
+        await sleep(self.refine_delay)
+
+        self.refine_task = None
+
+        if not self.redrawing and self.view_model.refine_pending():
+            self.redraw_data(refine=True)
+
+    def redraw_data(self, _=None, refine=False):
+        if self.refine_task is not None:
+            self.refine_task.cancel()
+            self.refine_task = None
+
+        if not refine:
+            self.view_model.cancel_refine()
+
         self.view_model.update_processing("Processing...", 1)
         self.view_model.update_processing("Updating volume...", 20)
 
@@ -89,6 +89,9 @@ class VolumeSlicerViewModel(NeuXtalVizViewModel):
 
         self.vs_controls = VolumeSlicerControls()
         self.draw_idle = True
+        self.draw_refine = False
+        self.preview_voxels = 64**3
+        self.render_voxels = 256**3
         self.slice_idle = True
         self.cut_idle = True
 
@@ -318,6 +321,8 @@ class VolumeSlicerViewModel(NeuXtalVizViewModel):
         return method
 
     def redraw_data_complete(self, result):
+        refine = False
+
         if result is not None:
             histo, normal, norm, value, trans = result
 
@@ -329,8 +334,18 @@ class VolumeSlicerViewModel(NeuXtalVizViewModel):
                 self.controls.parallel_projection
             )
 
+            level = self.model.get_histo_level(self.render_voxels)
+            refine = not self.draw_refine and level < histo["level"]
+
+        self.draw_refine = refine
         self.draw_idle = True
 
+    def refine_pending(self):
+        return self.draw_refine
+
+    def cancel_refine(self):
+        self.draw_refine = False
+
     def redraw_data_process(self, progress=lambda status, progress: None):
         if self.draw_idle and self.model.is_histo_loaded():
             self.draw_idle = False
@@ -341,7 +356,12 @@ class VolumeSlicerViewModel(NeuXtalVizViewModel):
 
             norm = self.get_normal()
 
-            histo = self.model.get_histo_info(norm)
+            if self.draw_refine:
+                max_voxels = self.render_voxels
+            else:
+                max_voxels = self.preview_voxels
+
+            histo = self.model.get_histo_info(norm, max_voxels)
 
             data = histo["signal"]
 
@@ -423,10 +443,10 @@ class VolumeSlicerViewModel(NeuXtalVizViewModel):
 
                 return cut_histo
 
-    def save_slice(self, filename):
+    def save_slice(self, filename, fmt=None):
         if self.model.is_sliced():
-            self.model.save_slice(filename)
+            self.model.save_slice(filename, fmt)
 
-    def save_cut(self, filename):
+    def save_cut(self, filename, fmt=None):
         if self.model.is_cut():
-            self.model.save_cut(filename)
+            self.model.save_cut(filename, fmt)
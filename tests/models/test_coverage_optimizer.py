@@ -0,0 +1,233 @@
+import itertools
+
+import numpy as np
+
+from NeuXtalViz.models.coverage_optimizer import (
+    CoverageEvaluator,
+    AnnealingOptimizer,
+    GeneCache,
+    GeneticOptimizer,
+    GreedyOptimizer,
+)
+from NeuXtalViz.models.detector_footprint import DetectorFootprint
+from NeuXtalViz.models.reflection_predictor import ReflectionPredictor
+from NeuXtalViz.models.reflection_statistics import ReflectionStatistics
+
+mmm = np.array(
+    [np.diag(signs) for signs in itertools.product([1, -1], repeat=3)]
+)
+
+
+def evaluator():
+    UB = np.diag([1 / 5, 1 / 6, 1 / 7])
+
+    gamma, nu = np.meshgrid(
+        np.arange(-150, 150, 1.0), np.arange(-30, 30, 1.0), indexing="ij"
+    )
+
+    footprint = DetectorFootprint(
+        gamma.ravel(), nu.ravel(), np.arange(gamma.size)
+    )
+
+    predictor = ReflectionPredictor(UB, 1, 8)
+
+    stats = ReflectionStatistics(UB, mmm, "P", 1, 8)
+
+    axes = np.array([[0, 1, 0], [0, 0, 1], [0, 1, 0]])
+
+    return CoverageEvaluator(
+        predictor, footprint, stats, axes, [1, 1, 1], [1, 3]
+    )
+
+
+def test_coverage_evaluator():
+    ev = evaluator()
+
+    settings = np.array([[0, 0, 0], [30, 0, 60]])
+
+    keys = ev.keys(settings)
+
+    assert len(keys) == 2
+
+    for ind in keys:
+        assert len(ind) > 0
+        assert np.all(np.diff(ind) > 0)
+
+    peaks = ev.predictor.predict(np.eye(3), [1, 3], ev.footprint)
+    hkls = np.column_stack([peaks[col] for col in ["h", "k", "l"]])
+
+    assert np.array_equal(keys[0], np.unique(ev.statistics.key_indices(hkls)))
+
+
+def test_genetic_optimizer():
+    ev = evaluator()
+
+    limits = [[0, 180], [0, 0], [0, 360]]
+
+    ga = GeneticOptimizer(ev, limits)
+
+    genes, keys = ga.initialization(3, 12)
+
+    assert genes.shape == (12, 3, 2)
+
+    selection = [[0, 1], [2, 3], [4, 5], [6, 7], [8, 9]]
+
+    genes, keys = ga.crossover(genes, keys, 2, [10, 11], selection)
+    genes, keys = ga.mutation(genes, keys, 0.5)
+
+    assert genes.shape == (12, 3, 2)
+
+    for gene, gene_keys in zip(genes, keys):
+        expected = ev.keys(ga.settings(gene))
+        assert all(np.array_equal(*pair) for pair in zip(gene_keys, expected))
+
+    values = ga.optimize(3, n_indiv=12, n_gener=5)
+
+    assert len(values) == 3
+
+    steps = ga.steps(3, n_indiv=12, n_gener=5)
+
+    assert len(list(steps)) == ga.n_steps(3, n_indiv=12, n_gener=5)
+
+    settings = ga.settings(values)
+
+    assert np.allclose(settings[:, 1], 0)
+    assert np.all((settings[:, 0] >= 0) & (settings[:, 0] <= 180))
+
+    best = ga.fitness([ev.keys(settings)])[0]
+
+    assert 0 < best <= 100
+
+    observed = np.arange(len(ev.statistics.keys))
+
+    full = GeneticOptimizer(ev, limits, observed=observed)
+
+    assert np.allclose(full.fitness([[np.array([], dtype=int)]]), 100)
+
+
+def test_gene_cache():
+    cache = GeneCache(max_bytes=3 * 80, decimals=1)
+
+    cache.bind("a")
+
+    for i in range(4):
+        cache.put([i, 0, 0.04], np.arange(10))
+
+    assert len(cache) == 3
+    assert cache.get([0, 0, 0]) is None
+    assert np.array_equal(cache.get([3, 0, 0.01]), np.arange(10))
+
+    cache.bind("a")
+
+    assert len(cache) == 3
+
+    cache.bind("b")
+
+    assert len(cache) == 0
+
+
+def test_genetic_optimizer_seed():
+    ev = evaluator()
+
+    limits = [[0, 180], [0, 0], [0, 360]]
+
+    state = np.random.get_state()[1].copy()
+
+    cache = GeneCache()
+
+    first = GeneticOptimizer(ev, limits, cache=cache, seed=7)
+    values = first.optimize(2, n_indiv=8, n_gener=3, mutation_rate=0.2)
+
+    n = len(cache)
+
+    second = GeneticOptimizer(ev, limits, cache=cache, seed=7)
+
+    assert (
+        second.optimize(2, n_indiv=8, n_gener=3, mutation_rate=0.2) == values
+    )
+    assert len(cache) == n
+
+    assert np.array_equal(np.random.get_state()[1], state)
+
+
+def test_greedy_optimizer():
+    ev = evaluator()
+
+    limits = [[0, 180], [0, 0], [0, 360]]
+
+    greedy = GreedyOptimizer(ev, limits)
+
+    genes = greedy.candidates(15)
+
+    assert genes.shape == (13 * 25, 2)
+    assert np.allclose(np.unique(np.diff(np.unique(genes[:, 0]))), 15)
+    assert np.all((genes[:, 0] >= 0) & (genes[:, 0] <= 180))
+
+    values = greedy.optimize(3, step=15)
+
+    assert len(values) == 3
+    assert len(list(greedy.steps(3, step=15))) == greedy.n_steps(3, step=15)
+    assert greedy.evaluations == len(genes)
+
+    first = max(len(ind) for ind in ev.keys(greedy.settings(genes)))
+
+    assert np.isclose(greedy.trace[0][1], 100 * first / greedy.n_keys)
+    assert np.all(np.diff([entry[1] for entry in greedy.trace]) > 0)
+
+    completeness = greedy.trace[-1][1]
+
+    assert greedy.time_to_target(completeness)[1] == len(genes)
+    assert greedy.time_to_target(completeness + 1) == (None, None)
+
+
+def test_annealing_optimizer():
+    ev = evaluator()
+
+    limits = [[0, 180], [0, 0], [0, 360]]
+
+    annealing = AnnealingOptimizer(ev, limits, seed=3)
+
+    values = annealing.optimize(3, n_iter=100)
+
+    steps = annealing.steps(3, n_iter=100)
+
+    assert len(list(steps)) == annealing.n_steps(3, n_iter=100)
+
+    keys = ev.keys(annealing.settings(values))
+
+    completeness = 100 * len(np.unique(np.concatenate(keys)))
+    completeness /= annealing.n_keys
+
+    assert np.isclose(annealing.trace[-1][1], completeness)
+
+
+def test_iterate():
+    ev = evaluator()
+
+    limits = [[0, 180], [0, 0], [0, 360]]
+
+    ga = GeneticOptimizer(ev, limits, seed=5)
+
+    steps = list(ga.iterate(2, n_indiv=8, n_gener=6))
+
+    assert len(steps) == 7
+    assert np.all(np.diff([completeness for _, completeness in steps]) >= 0)
+    assert ga.pool is None
+
+    ga = GeneticOptimizer(ev, limits, seed=5)
+
+    cancelled = list(ga.iterate(2, cancel=lambda: True, n_indiv=8))
+
+    assert len(cancelled) == 1
+
+    ga = GeneticOptimizer(ev, limits, seed=5)
+
+    timed = list(ga.iterate(2, max_time=0, n_indiv=8))
+
+    assert len(timed) == 1
+
+    ga = GeneticOptimizer(ev, limits, seed=5)
+
+    stale = list(ga.iterate(2, patience=2, tolerance=100, n_indiv=8))
+
+    assert len(stale) == 3
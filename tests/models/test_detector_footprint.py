@@ -0,0 +1,128 @@
+import numpy as np
+
+from NeuXtalViz.models.detector_footprint import (
+    DetectorFootprint,
+    FootprintRaster,
+    scattering_angles,
+    scattering_directions,
+)
+
+
+def test_scattering_directions():
+    directions = scattering_directions([0, 90, 0], [0, 0, 90])
+
+    assert np.allclose(directions, [[0, 0, 1], [1, 0, 0], [0, 1, 0]])
+
+
+def test_scattering_angles():
+    gamma, nu = scattering_angles(
+        3 * scattering_directions([10, -120, 0], [5, -20, 0])
+    )
+
+    assert np.allclose(gamma, [10, -120, 0])
+    assert np.allclose(nu, [5, -20, 0])
+
+
+def test_detector_footprint():
+    gamma, nu = np.meshgrid(
+        np.arange(30, 60, 0.5), np.arange(-10, 10, 0.5), indexing="ij"
+    )
+
+    gamma, nu = gamma.ravel(), nu.ravel()
+    det_ID = np.arange(len(gamma)) + 100
+
+    masked = (gamma == 45) & (nu == 0)
+
+    footprint = DetectorFootprint(gamma[~masked], nu[~masked], det_ID[~masked])
+
+    k = 2 * np.pi / 1.5
+
+    kf = k * scattering_directions([40, 40.1, 45, 90, -40], [5, 5.2, 0, 0, 5])
+
+    ids = footprint.detector_ids(kf)
+
+    expected = det_ID[(gamma == 40) & (nu == 5)][0]
+
+    assert ids[0] == expected
+    assert ids[1] == expected
+    assert np.all(ids[2:] == -1)
+
+    assert np.array_equal(footprint.hit(kf), ids >= 0)
+    assert len(footprint.hit(np.empty((0, 3)))) == 0
+
+
+def test_detector_footprint_tubes():
+    gamma, nu = np.meshgrid(
+        np.arange(30, 50, 0.56), np.arange(-5, 5, 0.078), indexing="ij"
+    )
+
+    gamma, nu = gamma.ravel(), nu.ravel()
+
+    footprint = DetectorFootprint(gamma, nu, np.arange(len(gamma)))
+
+    rng = np.random.default_rng(0)
+
+    ray_gamma = rng.uniform(gamma.min(), gamma.max(), 10000)
+    ray_nu = rng.uniform(nu.min(), nu.max(), 10000)
+
+    assert np.all(footprint.hit(scattering_directions(ray_gamma, ray_nu)))
+
+    miss = scattering_directions([29.5, 50.5, 40], [0, 0, 5.2])
+
+    assert not np.any(footprint.hit(miss))
+
+
+def test_footprint_raster():
+    gamma, nu = np.meshgrid(
+        np.arange(-150, 150, 1.0), np.arange(-20, 20, 1.0), indexing="ij"
+    )
+
+    gamma, nu = gamma.ravel(), nu.ravel()
+
+    keep = (np.abs(gamma) > 20) & ~((gamma == 90) & (nu == 0))
+
+    footprint = DetectorFootprint(
+        gamma[keep], nu[keep], np.arange(np.sum(keep))
+    )
+
+    raster = FootprintRaster(footprint, resolution=0.5)
+
+    rng = np.random.default_rng(0)
+
+    kf = rng.normal(size=(20000, 3))
+
+    assert np.array_equal(raster.hit(kf), footprint.hit(kf))
+    assert np.any(raster.state == 1) and np.any(raster.state == 0)
+
+
+def test_footprint_raster_fine_features():
+    gamma, nu = np.meshgrid(
+        np.round(np.arange(44, 54, 0.05), 2),
+        np.round(np.arange(-3, 3, 0.05), 2),
+        indexing="ij",
+    )
+
+    gamma, nu = gamma.ravel(), nu.ravel()
+
+    masked = (gamma == 45) & (nu == 1)
+    gap = (gamma >= 49.98) & (gamma <= 50.03)
+
+    keep = ~masked & ~gap
+
+    footprint = DetectorFootprint(
+        gamma[keep], nu[keep], np.arange(np.sum(keep))
+    )
+
+    raster = FootprintRaster(footprint)
+
+    kf = scattering_directions([45, 50, 50.01, 47], [1, 0, 2, 0])
+
+    assert np.array_equal(raster.hit(kf), [False, False, False, True])
+
+    rng = np.random.default_rng(1)
+
+    kf = scattering_directions(
+        rng.uniform(43, 55, 100000), rng.uniform(-4, 4, 100000)
+    )
+
+    assert np.array_equal(raster.hit(kf), footprint.hit(kf))
@@ -0,0 +1,33 @@
+import numpy as np
+
+from NeuXtalViz.models.detector_grouping import (
+    grouping_pattern,
+    cached_grouping_pattern,
+)
+
+
+def test_grouping_pattern():
+    det_map = np.arange(2 * 4 * 4).reshape(2, 4, 4)
+
+    pattern = grouping_pattern(det_map, "2x4")
+
+    groups = pattern.split(",")
+
+    assert len(groups) == 4
+    assert groups[0] == "0+1+2+3+4+5+6+7"
+    assert groups[-1] == "24+25+26+27+28+29+30+31"
+
+
+def test_cached_grouping_pattern(tmp_path, monkeypatch):
+    monkeypatch.setenv("NEUXTALVIZ_CACHE", str(tmp_path))
+
+    det_map = np.arange(2 * 4 * 4).reshape(2, 4, 4)
+    mask = det_map.ravel() % 3 != 0
+
+    pattern = cached_grouping_pattern("TOPAZ", det_map, "2x2", mask)
+
+    assert len(list(tmp_path.glob("grouping/*.txt"))) == 1
+    assert pattern == grouping_pattern(det_map, "2x2", mask)
+    assert "3" not in pattern.replace(",", "+").split("+")
+
+    assert pattern == cached_grouping_pattern("TOPAZ", det_map, "2x2", mask)
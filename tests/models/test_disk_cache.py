@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+
+from NeuXtalViz.models.disk_cache import (
+    cache_entries,
+    cache_file,
+    content_hash,
+    evict_entries,
+    file_hash,
+    load_arrays,
+    remove_entry,
+    save_arrays,
+)
+
+
+def test_content_hash():
+    a = np.arange(6.0)
+
+    assert content_hash("TOPAZ", a) == content_hash("TOPAZ", a.copy())
+    assert content_hash("TOPAZ", a) != content_hash("TOPAZ", a.reshape(2, 3))
+    assert content_hash("TOPAZ", a) != content_hash("CORELLI", a)
+
+
+def test_file_hash(tmp_path):
+    filename = tmp_path / "mask.xml"
+
+    assert file_hash(str(filename)) == ""
+
+    filename.write_text("<detids>1-10</detids>")
+
+    assert len(file_hash(str(filename))) == 40
+
+
+def test_arrays(tmp_path, monkeypatch):
+    monkeypatch.setenv("NEUXTALVIZ_CACHE", str(tmp_path))
+
+    key = content_hash("TOPAZ")
+
+    assert load_arrays("instrument", key) is None
+
+    det_ID = np.arange(10)
+    gamma = np.linspace(-90, 90, 10)
+
+    save_arrays("instrument", key, det_ID=det_ID, gamma=gamma)
+
+    arrays = load_arrays("instrument", key)
+
+    assert np.array_equal(arrays["det_ID"], det_ID)
+    assert np.allclose(arrays["gamma"], gamma)
+    assert len(list(tmp_path.glob("instrument/*.tmp"))) == 0
+
+
+def test_evict_entries(tmp_path, monkeypatch):
+    monkeypatch.setenv("NEUXTALVIZ_CACHE", str(tmp_path))
+
+    keys = [content_hash("TOPAZ", run) for run in range(3)]
+
+    for i, key in enumerate(keys):
+        save_arrays("Q", key, counts=np.zeros(1000))
+        with open(cache_file("Q", key, ".md.nxs"), "wb") as f:
+            f.write(b"\0" * 1000)
+        for filename in cache_entries("Q")[key]:
+            os.utime(filename, (i, i))
+
+    assert sorted(cache_entries("Q").keys()) == sorted(keys)
+
+    load_arrays("Q", keys[0])
+
+    size = sum(
+        os.path.getsize(filename) for filename in cache_entries("Q")[keys[0]]
+    )
+
+    evict_entries("Q", 2 * size, keep=[keys[2]])
+
+    assert sorted(cache_entries("Q").keys()) == sorted([keys[0], keys[2]])
+
+    evict_entries("Q", 0, keep=[keys[2]])
+
+    assert list(cache_entries("Q").keys()) == [keys[2]]
+
+
+def test_remove_entry(tmp_path, monkeypatch):
+    monkeypatch.setenv("NEUXTALVIZ_CACHE", str(tmp_path))
+
+    keys = [content_hash("TOPAZ", run) for run in range(2)]
+
+    for key in keys:
+        save_arrays("Q", key, counts=np.zeros(10))
+        with open(cache_file("Q", key, ".md.nxs"), "wb") as f:
+            f.write(b"\0" * 10)
+
+    remove_entry("Q", keys[0])
+
+    assert list(cache_entries("Q").keys()) == [keys[1]]
+    assert len(cache_entries("Q")[keys[1]]) == 2
@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+
+from NeuXtalViz.models.experiment_plan import (
+    ExperimentPlan,
+    load_plan_archive,
+    save_plan_archive,
+)
+from NeuXtalViz.models.peak_store import peak_dtype
+
+
+class Table:
+    def __init__(self):
+        self.names = []
+        self.types = []
+        self.rows = []
+
+    def addColumn(self, column_type, name):
+        self.types.append(column_type)
+        self.names.append(name)
+
+    def addRow(self, row):
+        self.rows.append(row)
+
+    def getColumnNames(self):
+        return self.names
+
+    def rowCount(self):
+        return len(self.rows)
+
+    def column(self, col):
+        return [row[col] for row in self.rows]
+
+
+def plan():
+    return ExperimentPlan(
+        "Title",
+        ["omega", "phi"],
+        ["a", "b", "c"],
+        [[10.123, 20], [30, 40], [50, 60]],
+        ["", "CrystalPlan", "Mesh Scan"],
+        ["PCharge", "seconds", "PCharge"],
+        [1.5, 60, 2],
+        [True, False, True],
+    )
+
+
+def test_workspace():
+    table = Table()
+
+    plan().to_workspace(table)
+
+    types = ["str", "float", "float", "str", "str", "float", "bool"]
+
+    assert table.types == types
+    assert table.rows[0] == ["a", 10.12, 20.0, "", "PCharge", 1.5, True]
+
+    restored = ExperimentPlan.from_workspace(table)
+
+    assert restored.names == ["omega", "phi"]
+    assert np.allclose(restored.settings, [[10.12, 20], [30, 40], [50, 60]])
+    assert restored.table()[5] == [True, False, True]
+
+
+def test_csv(tmp_path):
+    filename = os.path.join(tmp_path, "plan.csv")
+
+    plan().save_csv(filename)
+
+    restored = ExperimentPlan.load_csv(filename)
+
+    assert restored.pv == "Title"
+    assert restored.titles.tolist() == ["a", "c"]
+    assert np.allclose(restored.settings, [[10.12, 20], [50, 60]])
+    assert restored.comments.tolist() == ["", "Mesh Scan"]
+    assert np.allclose(restored.values, [1.5, 2])
+    assert np.all(restored.use)
+
+
+def test_plan_archive(tmp_path):
+    filename = os.path.join(tmp_path, "plan.npz")
+
+    peaks = np.zeros(4, dtype=peak_dtype)
+    peaks["h"] = [1, 2, 3, 4]
+    peaks["run"] = [0, 0, 2, 2]
+
+    save_plan_archive(
+        filename, plan(), peaks, UB=np.eye(3) / 5, point_group="mmm"
+    )
+
+    restored, stored, meta = load_plan_archive(filename)
+
+    assert restored.table() == plan().table()
+    assert np.array_equal(stored, peaks)
+    assert np.allclose(meta["UB"], np.eye(3) / 5)
+    assert meta["point_group"].item() == "mmm"
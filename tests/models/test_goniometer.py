@@ -0,0 +1,88 @@
+import numpy as np
+
+from scipy.spatial.transform import Rotation
+
+from NeuXtalViz.models.goniometer import (
+    angular_coverage,
+    compose_rotations,
+    iterate_rotations,
+    RotationCache,
+)
+
+
+def test_angular_coverage():
+    coverage = angular_coverage([[0, 90], [45, 45], [-10, 10]], 5)
+
+    assert len(coverage[0]) == 10
+    assert np.allclose(coverage[1], [45])
+    assert np.allclose(coverage[2], [-10, 0, 10])
+
+
+def test_compose_rotations():
+    axes = np.array([[0, 1, 0], [0, 0, 1], [0, 1, 0]])
+    polarities = np.array([1, 1, -1])
+
+    angles = np.array([[30, 10, 20], [-45, 60, 5]])
+
+    Rs = compose_rotations(axes, polarities, angles)
+
+    for R, setting in zip(Rs, angles):
+        expected = np.eye(3)
+        for axis, polarity, angle in zip(axes, polarities, setting):
+            rotvec = np.deg2rad(polarity * angle) * axis
+            expected = expected @ Rotation.from_rotvec(rotvec).as_matrix()
+        assert np.allclose(R, expected)
+
+
+def test_iterate_rotations():
+    axes = np.array([[0, 1, 0], [0, 0, 1], [0, 1, 0]])
+    polarities = np.array([1, 1, -1])
+    limits = [[0, 90], [-20, 20], [0, 0]]
+
+    chunks = list(iterate_rotations(axes, polarities, limits, 5, 7))
+
+    assert len(chunks) > 1
+
+    Rs = np.concatenate([chunk[0] for chunk in chunks])
+    angles = np.concatenate([chunk[1] for chunk in chunks])
+
+    grid = np.meshgrid(*angular_coverage(limits, 5), indexing="ij")
+    expected = np.reshape(grid, (3, -1)).T
+
+    assert np.allclose(angles, expected)
+    assert np.allclose(Rs, compose_rotations(axes, polarities, expected))
+
+
+def test_rotation_cache():
+    axes = np.array([[0, 1, 0], [0, 0, 1], [0, 1, 0]])
+    polarities = np.array([1, 1, -1])
+    limits = [[0, 90], [-20, 20], [0, 0]]
+
+    cache = RotationCache(max_bytes=10**6, chunk_size=7)
+
+    chunks = list(cache.iterate(axes, polarities, limits, 5))
+
+    assert len(cache) == 1
+    assert all(len(chunk[1]) <= 7 for chunk in chunks)
+
+    expected = list(iterate_rotations(axes, polarities, limits, 5))
+
+    Rs = np.concatenate([chunk[0] for chunk in chunks])
+    assert np.allclose(Rs, np.concatenate([chunk[0] for chunk in expected]))
+
+    cached = list(cache.iterate(axes, polarities, limits, 5))
+    assert np.shares_memory(
+        cached[0][0], cache.stacks[cache._key(axes, polarities, limits, 5)][0]
+    )
+
+    list(cache.iterate(axes, polarities, [[0, 180], [-20, 20], [0, 0]], 5))
+    list(cache.iterate(axes, polarities, [[0, 90], [0, 20], [0, 0]], 1))
+
+    assert cache.nbytes <= cache.max_bytes
+
+    n = len(cache)
+
+    cache.max_bytes = 0
+    list(cache.iterate(axes, polarities, [[0, 10], [0, 10], [0, 0]], 1))
+
+    assert len(cache) == n
@@ -0,0 +1,63 @@
+import os
+
+import h5py
+import numpy as np
+
+from NeuXtalViz.models.md_export import save_histo
+
+
+def reference_ascii(filename, signal, error_sq, edges, names):
+    centers = [0.5 * (edge[1:] + edge[:-1]) for edge in edges]
+    grids = np.meshgrid(*centers, indexing="ij")
+
+    header = "Intensity Error " + " ".join(names)
+    header += "\n shape: " + "x".join([str(n) for n in signal.shape])
+
+    to_save = np.column_stack([signal.flatten(), np.sqrt(error_sq.flatten())])
+    for grid in grids:
+        to_save = np.c_[to_save, grid.flatten()]
+
+    np.savetxt(filename, to_save, fmt="%.6e", header=header)
+
+
+def test_ascii_matches_savetxt(tmp_path):
+    rng = np.random.default_rng(1)
+
+    signal = rng.random((7, 1, 5))
+    error_sq = rng.random((7, 1, 5))
+    edges = [np.linspace(-1, 1, 8), np.array([0.1, 0.2]), np.linspace(0, 2, 6)]
+    names = ["H", "K", "L"]
+
+    filename = os.path.join(tmp_path, "slice.csv")
+    reference = os.path.join(tmp_path, "reference.csv")
+
+    save_histo(filename, signal, error_sq, edges, names)
+    reference_ascii(
+        reference,
+        signal[:, 0],
+        error_sq[:, 0],
+        [edges[0], edges[2]],
+        ["H", "L"],
+    )
+
+    with open(filename) as f, open(reference) as g:
+        assert f.read() == g.read()
+
+
+def test_binary_formats(tmp_path):
+    signal = np.arange(12.0).reshape(3, 4)
+    error_sq = signal.copy()
+    edges = [np.linspace(0, 3, 4), np.linspace(0, 4, 5)]
+    names = ["H", "K"]
+
+    filename = os.path.join(tmp_path, "slice.npz")
+    save_histo(filename, signal, error_sq, edges, names)
+    data = np.load(filename)
+    assert np.allclose(data["signal"], signal)
+    assert np.allclose(data["D1"], edges[1])
+
+    filename = os.path.join(tmp_path, "slice.h5")
+    save_histo(filename, signal, error_sq, edges, names, fmt="columnar")
+    with h5py.File(filename, "r") as f:
+        assert np.allclose(f["Intensity"][()], signal.flatten())
+        assert np.allclose(f["D1"][()], np.tile(np.arange(4) + 0.5, 3))
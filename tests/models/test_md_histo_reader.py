@@ -0,0 +1,49 @@
+import os
+
+import h5py
+import numpy as np
+
+from NeuXtalViz.models.md_histo_reader import MDHistoReader
+
+
+def write_histo(filename, signal, chunks=None):
+    with h5py.File(filename, "w") as f:
+        data = f.create_group("MDHistoWorkspace/data")
+        data.create_dataset("signal", data=signal, chunks=chunks)
+        data.create_dataset("errors_squared", data=signal**2, chunks=chunks)
+        for d, n in enumerate(signal.shape[::-1]):
+            dim = data.create_dataset(
+                "D{}".format(d), data=np.linspace(-1, 1, n + 1)
+            )
+            dim.attrs["long_name"] = "Q{}".format(d)
+            dim.attrs["units"] = "r.l.u."
+
+
+def test_compact_read(tmp_path):
+    signal = np.zeros((6, 5, 4))
+    signal[1:3, 2:4, 1:2] = 1.0
+    signal[4, 0, 0] = np.nan
+
+    for chunks in [None, (2, 5, 4)]:
+        filename = os.path.join(tmp_path, "histo.nxs")
+        write_histo(filename, signal, chunks)
+
+        reader = MDHistoReader(filename, chunk_size=2)
+
+        assert reader.names == ["Q0", "Q1", "Q2"]
+
+        bounds = reader.compact_bounds()
+
+        assert bounds == [(1, 2), (2, 4), (1, 3)]
+
+        sig, err_sq, edges = reader.read(bounds)
+
+        assert sig.shape == (1, 2, 2)
+        assert [len(edge) for edge in edges] == [2, 3, 3]
+        assert np.allclose(sig, 1)
+        assert np.allclose(err_sq, 1)
+
+        sig, err_sq, edges = reader.read()
+
+        assert sig.shape == (4, 5, 6)
+        assert np.isfinite(sig).all()
@@ -0,0 +1,107 @@
+import numpy as np
+
+from NeuXtalViz.models.detector_footprint import (
+    DetectorFootprint,
+    FootprintRaster,
+)
+from NeuXtalViz.models.goniometer import iterate_rotations
+from NeuXtalViz.models.orientation_index import OrientationIndex
+
+UB = np.array([[0.2, 0.01, 0], [0, 0.18, 0.02], [0.01, 0, 0.15]])
+
+wavelength = [0.5, 3.5]
+
+
+def settings_scan():
+    gamma, nu = np.meshgrid(
+        np.arange(-150, 150, 1.0), np.arange(-30, 30, 1.0), indexing="ij"
+    )
+
+    gamma, nu = gamma.ravel(), nu.ravel()
+
+    keep = np.abs(gamma) > 20
+
+    footprint = DetectorFootprint(
+        gamma[keep], nu[keep], np.arange(np.sum(keep))
+    )
+
+    axes = np.array([[0, 1, 0], [0, 0, 1], [0, 1, 0]])
+
+    limits = [[0, 180], [-30, 30], [0, 0]]
+
+    def chunks():
+        return iterate_rotations(axes, np.ones(3), limits, 5, chunk_size=100)
+
+    Rs, angles = [np.concatenate(arrays) for arrays in zip(*chunks())]
+
+    return footprint, chunks, Rs, angles
+
+
+def scan(footprint, Rs, hkl):
+    Q_sample = 2 * np.pi * UB @ hkl
+
+    Q_lab = Rs @ Q_sample
+
+    lamda = -4 * np.pi * Q_lab[:, 2] / (Q_sample @ Q_sample)
+
+    mask = (lamda > wavelength[0]) & (lamda < wavelength[1])
+
+    kf = Q_lab[mask]
+    kf[:, 2] += 2 * np.pi / lamda[mask]
+
+    mask[mask] = footprint.hit(kf)
+
+    return mask, lamda
+
+
+def test_reflections():
+    footprint, chunks, Rs, angles = settings_scan()
+
+    index = OrientationIndex(UB, chunks)
+
+    hkls = [[1, 2, 3], [-1, 2, 3], [2, 0, 1]]
+
+    settings, (gamma, nu, lamda) = index.reflections(
+        hkls, wavelength, FootprintRaster(footprint)
+    )
+
+    expected = [scan(footprint, Rs, np.array(hkl)) for hkl in hkls]
+
+    assert np.array_equal(
+        settings, np.vstack([angles[mask] for mask, _ in expected])
+    )
+    assert np.allclose(
+        lamda, np.concatenate([lamda[mask] for mask, lamda in expected])
+    )
+    assert len(gamma) == len(nu) == len(settings) > 0
+
+
+def test_pairs():
+    footprint, chunks, Rs, angles = settings_scan()
+
+    index = OrientationIndex(UB, chunks)
+
+    hkls_1 = [[1, 2, 3], [-1, 2, 3], [2, 0, 1]]
+    hkls_2 = [[0, 1, 1], [1, 1, 0]]
+
+    settings, values_1, values_2 = index.pairs(
+        hkls_1, hkls_2, wavelength, footprint
+    )
+
+    expected_settings, expected_1, expected_2 = [], [], []
+
+    for hkl_1 in hkls_1:
+        for hkl_2 in hkls_2:
+            mask_1, lamda_1 = scan(footprint, Rs, np.array(hkl_1))
+            mask_2, lamda_2 = scan(footprint, Rs, np.array(hkl_2))
+
+            mask = mask_1 & mask_2
+
+            expected_settings.append(angles[mask])
+            expected_1.append(lamda_1[mask])
+            expected_2.append(lamda_2[mask])
+
+    assert np.array_equal(settings, np.vstack(expected_settings))
+    assert np.allclose(values_1[2], np.concatenate(expected_1))
+    assert np.allclose(values_2[2], np.concatenate(expected_2))
+    assert len(settings) > 0
@@ -0,0 +1,68 @@
+import numpy as np
+
+from NeuXtalViz.models.peak_store import PeakStore, peak_dtype
+
+
+def peaks(n, h=0):
+    rows = np.zeros(n, dtype=peak_dtype)
+    rows["h"] = h
+    rows["k"] = np.arange(n)
+    rows["d"] = np.linspace(3, 1, n)
+    return rows
+
+
+def test_add_select():
+    store = PeakStore()
+
+    store.add(0, peaks(3, 1))
+    store.add(2, peaks(2, 3))
+
+    assert len(store) == 3
+    assert len(store.orientation(1)) == 0
+    assert len(store.peaks) == 5
+    assert np.array_equal(store.peaks["run"], [0, 0, 0, 2, 2])
+
+    store.add(1, peaks(4, 2))
+
+    assert len(store.peaks) == 9
+    assert np.array_equal(
+        store.select([True, False, True])["h"], [1] * 3 + [3] * 2
+    )
+
+    store.add(0, peaks(1, 5))
+
+    assert len(store.peaks) == 7
+    assert store.orientation(0)["h"][0] == 5
+
+
+def test_delete():
+    store = PeakStore()
+
+    for run in range(4):
+        store.add(run, peaks(run + 1, run))
+
+    cached = store.peaks
+
+    store.delete([1, 2])
+
+    assert store.peaks is not cached
+    assert len(store) == 2
+    assert np.array_equal(store.peaks["h"], [0, 3, 3, 3, 3])
+    assert np.array_equal(store.peaks["run"], [0, 1, 1, 1, 1])
+
+    store.clear()
+
+    assert len(store.peaks) == 0
+
+
+def test_restore():
+    store = PeakStore()
+
+    rows = np.concatenate([peaks(2, 1), peaks(3, 2)])
+    rows["run"] = [2, 0, 2, 0, 2]
+
+    store.restore(rows, 4)
+
+    assert len(store) == 4
+    assert [len(store.orientation(run)) for run in range(4)] == [2, 0, 3, 0]
+    assert np.array_equal(store.peaks["run"], [0, 0, 2, 2, 2])
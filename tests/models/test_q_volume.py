@@ -0,0 +1,72 @@
+import numpy as np
+
+from NeuXtalViz.models.q_volume import (
+    coarsen_volume,
+    crop_occupied,
+    histogram_percentile,
+    normalize_volume,
+)
+
+
+def test_crop_occupied():
+    occupied = np.zeros((6, 5, 4), dtype=bool)
+    occupied[1, 2, 3] = True
+    occupied[3, 1, 1] = True
+
+    assert crop_occupied(occupied) == (slice(1, 4), slice(1, 3), slice(1, 4))
+
+
+def test_histogram_percentile():
+    values = np.random.default_rng(1).random(10000)
+
+    hist, edges = np.histogram(values, bins=1000, range=(0, 1))
+
+    value = histogram_percentile(hist, edges, 90)
+
+    assert np.isclose(value, np.percentile(values, 90), atol=2e-3)
+
+
+def test_normalize_volume():
+    rng = np.random.default_rng(2)
+
+    axis = np.linspace(-4, 4, 32)
+
+    signal = rng.gamma(0.5, 10, (32, 32, 32))
+    signal[signal < 1] = 0
+    signal[:4] = 0
+
+    original = signal.copy()
+
+    volume, (x, y, z) = normalize_volume(signal, [axis] * 3, 3.5)
+
+    assert np.array_equal(signal, original)
+
+    assert volume.dtype == np.uint8
+    assert volume.shape == (28, 32, 32)
+    assert np.allclose(x, axis[4:])
+
+    Q_sq = x[:, None, None] ** 2 + y[:, None] ** 2 + z**2
+
+    inside = (original[4:] > 0) & (Q_sq <= 3.5**2)
+
+    assert not volume[~inside].any()
+    assert volume.max() == 255
+
+    kept = volume > 0
+    assert 0.05 < kept.sum() / inside.sum() < 0.1
+
+    ranks = np.argsort(original[4:][kept])
+    assert np.all(np.diff(volume[kept][ranks].astype(int)) >= 0)
+
+
+def test_coarsen_volume():
+    signal = np.random.default_rng(3).random((8, 8, 6))
+
+    axis = np.arange(8) + 0.5
+
+    coarse, (x, y, z) = coarsen_volume(signal, [axis, axis, axis[:6]], 4)
+
+    assert coarse.shape == (2, 2, 1)
+    assert np.isclose(coarse[1, 0, 0], signal[4:, :4, :4].sum())
+    assert np.allclose(x, [2, 6])
+    assert np.allclose(z, [2])
@@ -0,0 +1,69 @@
+import numpy as np
+
+from NeuXtalViz.models.detector_footprint import DetectorFootprint
+from NeuXtalViz.models.reflection_predictor import (
+    ReflectionPredictor,
+    enumerate_reflections,
+    d_spacing,
+)
+
+
+def test_enumerate_reflections():
+    UB = np.diag([1 / 5, 1 / 6, 1 / 7])
+
+    hkls, d = enumerate_reflections(UB, 1.5, 8)
+
+    ranges = [np.arange(-10, 11)] * 3
+    grid = np.stack(np.meshgrid(*ranges, indexing="ij"), axis=-1)
+    grid = grid.reshape(-1, 3)
+    grid = grid[np.any(grid != 0, axis=1)]
+
+    spacing = d_spacing(UB, grid)
+    expected = grid[(spacing >= 1.5) & (spacing <= 8)]
+
+    assert len(hkls) == len(expected)
+    assert set(map(tuple, hkls)) == set(map(tuple, expected))
+    assert np.allclose(d, d_spacing(UB, hkls))
+
+
+def test_reflection_predictor():
+    UB = np.diag([1 / 5, 1 / 6, 1 / 7])
+
+    predictor = ReflectionPredictor(UB, 1, 8)
+
+    assert predictor.matches(UB, 1, 8)
+    assert not predictor.matches(UB, 1.5, 8)
+
+    gamma, nu = np.meshgrid(
+        np.arange(-170, 170, 0.5), np.arange(-60, 60, 0.5), indexing="ij"
+    )
+
+    footprint = DetectorFootprint(
+        gamma.ravel(), nu.ravel(), np.arange(gamma.size)
+    )
+
+    R = np.eye(3)
+
+    peaks = predictor.predict(R, [1, 3], footprint)
+
+    assert len(peaks) > 0
+    assert np.all(np.diff(peaks["d"]) <= 0)
+    assert np.all((peaks["wavelength"] > 1) & (peaks["wavelength"] < 3))
+
+    hkls = np.column_stack([peaks["h"], peaks["k"], peaks["l"]])
+
+    assert len(np.unique(hkls, axis=0)) == len(hkls)
+
+    Q = 2 * np.pi * hkls @ UB.T
+    Q_sq = np.sum(Q**2, axis=1)
+
+    assert np.allclose(peaks["wavelength"], -4 * np.pi * Q[:, 2] / Q_sq)
+
+    two_theta = 2 * np.arcsin(peaks["wavelength"] / (2 * peaks["d"]))
+
+    k = 2 * np.pi / peaks["wavelength"]
+    kf = Q + k[:, None] * np.array([0, 0, 1])
+
+    assert np.allclose(np.arccos(kf[:, 2] / k), two_theta)
+
+    assert np.array_equal(peaks["detector"], footprint.detector_ids(kf))
@@ -0,0 +1,159 @@
+import itertools
+
+import numpy as np
+
+from NeuXtalViz.models.peak_store import peak_dtype
+from NeuXtalViz.models.reflection_statistics import (
+    CoverageCounter,
+    ReflectionStatistics,
+    canonical_codes,
+    centering_mask,
+    coverage,
+    decode,
+    encode,
+)
+
+mmm = np.array(
+    [np.diag(signs) for signs in itertools.product([1, -1], repeat=3)]
+)
+
+
+def test_encode():
+    hkls = np.array([[1, -2, 3], [-40, 0, 7], [0, 0, -1]])
+
+    assert np.array_equal(decode(encode(hkls)), hkls)
+
+    order = np.lexsort(hkls.T[::-1])
+    assert np.array_equal(np.argsort(encode(hkls)), order)
+
+
+def test_canonical_codes():
+    hkls = np.array([[1, -2, 3], [-1, 2, -3], [1, 2, 3], [2, 1, 3]])
+
+    codes = canonical_codes(hkls, mmm)
+
+    assert codes[0] == codes[1] == codes[2]
+    assert codes[3] != codes[0]
+    assert np.array_equal(decode(codes[:1]), [[1, 2, 3]])
+
+    assert np.array_equal(canonical_codes(hkls, mmm, chunk_size=3), codes)
+    assert len(canonical_codes(np.empty((0, 3)), mmm)) == 0
+
+
+def test_centering_mask():
+    hkls = np.array([[1, 1, 0], [1, 0, 0], [1, 1, 1], [2, 0, 0]])
+
+    assert np.array_equal(centering_mask(hkls, "I"), [1, 0, 0, 1])
+    assert np.array_equal(centering_mask(hkls, "F"), [0, 0, 1, 1])
+    assert np.array_equal(centering_mask(hkls, "C"), [1, 0, 1, 1])
+    assert np.array_equal(centering_mask(hkls, "P"), [1, 1, 1, 1])
+
+
+def test_statistics():
+    UB = np.diag([1 / 4, 1 / 5, 1 / 6])
+
+    stats = ReflectionStatistics(UB, mmm, "I", 1.5, 6, n_shells=3)
+
+    h, k, l = np.meshgrid(*[np.arange(-5, 6)] * 3, indexing="ij")
+    allowed = np.column_stack([h.ravel(), k.ravel(), l.ravel()])
+    allowed = allowed[np.any(allowed != 0, axis=1)]
+    d = 1 / np.linalg.norm(allowed @ UB.T, axis=1)
+    allowed = allowed[(d >= 1.5) & (d <= 6) & centering_mask(allowed, "I")]
+
+    orbits = {tuple(np.abs(hkl)) for hkl in allowed}
+
+    assert len(stats.keys) == len(orbits)
+
+    rng = np.random.default_rng(0)
+    observed = allowed[rng.integers(0, len(allowed), 200)]
+    observed = np.vstack([observed, [[1, 0, 0], [0, 0, 50]]])
+
+    counts = stats.counts(observed)
+
+    assert counts.sum() == 200
+
+    shells, unique, completeness, redundancy, multiple = stats.statistics(
+        counts
+    )
+
+    keys = {tuple(np.abs(hkl)) for hkl in observed[:200]}
+
+    assert len(shells) == 4
+    assert unique[0] == len(keys)
+    assert unique[1:].sum() == unique[0]
+    assert np.isclose(completeness[0], len(keys) / len(orbits))
+    assert np.isclose(redundancy[0], 200 / len(keys))
+    assert multiple[0] == np.sum(counts > 1)
+
+    hkls, d = stats.missing(counts)
+
+    assert len(hkls) == len(orbits) - len(keys)
+    assert not keys & {tuple(np.abs(hkl)) for hkl in hkls}
+
+
+def test_coverage():
+    observed = np.array([[2, 2, 3], [-2, 2, 3], [2, 0, 0], [1, 0, 0]])
+
+    hkls, counts = coverage(observed, mmm, "C")
+
+    covered = dict(zip(map(tuple, hkls), counts))
+
+    assert len(covered) == 8 + 2
+    assert covered[(-2, -2, 3)] == 2
+    assert covered[(-2, 0, 0)] == 1
+    assert (1, 0, 0) not in covered
+
+
+def test_coverage_counter():
+    UB = np.diag([1 / 4, 1 / 5, 1 / 6])
+
+    stats = ReflectionStatistics(UB, mmm, "P", 1.5, 6, n_shells=3)
+
+    rng = np.random.default_rng(1)
+
+    def orientation(n):
+        peaks = np.zeros(n, dtype=peak_dtype)
+        for col in ["h", "k", "l"]:
+            peaks[col] = rng.integers(-3, 4, n)
+        return peaks
+
+    def recount(orientations, use):
+        blocks = [peaks for peaks, a in zip(orientations, use) if a]
+        peaks = np.concatenate(blocks)
+        hkls = np.column_stack([peaks[col] for col in ["h", "k", "l"]])
+        return stats.counts(hkls)
+
+    def check(counter, orientations, use):
+        counts = recount(orientations, use)
+        assert np.array_equal(counter.counts, counts)
+        expected = stats.statistics(counts)
+        for value, ref in zip(counter.summary()[1:], expected[1:]):
+            assert np.allclose(value, ref)
+
+    orientations = [orientation(50) for _ in range(4)]
+
+    counter = CoverageCounter(stats)
+
+    counter.update(orientations)
+    check(counter, orientations, [True] * 4)
+
+    use = [True, False, True, True]
+    counter.update(orientations, use)
+    check(counter, orientations, use)
+
+    orientations[2] = orientation(30)
+    counter.update(orientations, use)
+    check(counter, orientations, use)
+
+    del orientations[0]
+    use = [True, True]
+    counter.update(orientations, use)
+    check(counter, orientations, use + [False])
+
+    assert len(counter) == 3
+    assert not counter.active[2]
+
+    hkls, counts = counter.coverage()
+
+    assert counts.sum() >= counter.counts.sum()
+    assert len(counter.missing()[0]) == np.sum(counter.counts == 0)
@@ -0,0 +1,37 @@
+import numpy as np
+
+from NeuXtalViz.models.slab_integration import SlabIntegrator
+
+
+def test_integrate_bin_aligned():
+    rng = np.random.default_rng(0)
+
+    signal = rng.random((4, 5, 6))
+    error_sq = rng.random((4, 5, 6))
+
+    edges = [np.linspace(-1, 1, n + 1) for n in signal.shape]
+
+    integrator = SlabIntegrator(signal, error_sq, edges)
+
+    sig, err_sq = integrator.integrate(1, [edges[1][1], edges[1][4]])
+
+    assert sig.shape == (4, 6)
+    assert np.allclose(sig, signal[:, 1:4, :].sum(axis=1))
+    assert np.allclose(err_sq, error_sq[:, 1:4, :].sum(axis=1))
+
+
+def test_integrate_fractional_and_clipped():
+    signal = np.ones((3, 4))
+    error_sq = np.ones((3, 4))
+
+    edges = [np.linspace(0, 3, 4), np.linspace(0, 4, 5)]
+
+    integrator = SlabIntegrator(signal, error_sq, edges)
+
+    sig, _ = integrator.integrate(0, [0.5, 2.25])
+
+    assert np.allclose(sig, 1.75)
+
+    sig, _ = integrator.integrate(1, [-10, 10])
+
+    assert np.allclose(sig, 4)
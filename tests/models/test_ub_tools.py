@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from mantid.simpleapi import CreateSingleValuedWorkspace, DeleteWorkspace, mtd
+
+from NeuXtalViz.models.ub_tools import UBModel
+
+
+def fake_conversion(ub, fail=None):
+    calls, binned, merged = [], [], []
+
+    def process_run(instrument, IPTS, run, time_stop, *args):
+        calls.append(run)
+        time.sleep(0.002 * (run % 5))
+        CreateSingleValuedWorkspace(OutputWorkspace="md_{}".format(run))
+        if run == fail:
+            raise RuntimeError("run {} failed".format(run))
+        return {"md": "md_{}".format(run), "counts": run, "R": run, "Q_max": 5}
+
+    def bin_Q(md, Q_max):
+        binned.append(md)
+
+    def merge_runs(names):
+        merged.append(list(names))
+        for name in names:
+            DeleteWorkspace(Workspace=name)
+
+    ub.process_run = process_run
+    ub.bin_Q = bin_Q
+    ub.merge_runs = merge_runs
+
+    return calls, binned, merged
+
+
+def test_convert_runs():
+    ub = UBModel()
+
+    calls, binned, merged = fake_conversion(ub)
+
+    runs = list(range(1, 21)) + [3, 7]
+
+    steps = list(
+        ub.convert_runs("TOPAZ", 1, runs, None, "", "", [1, 3], False, 5, 2)
+    )
+
+    assert sorted(calls) == list(range(1, 21))
+    assert binned == ["md_{}".format(run) for run in range(1, 21)]
+    assert [result["counts"] for result in ub.converted] == list(range(1, 21))
+
+    assert steps[-1] == 20
+    assert all(a < b for a, b in zip(steps[:-1], steps[1:]))
+
+    assert sum(merged, []) == binned
+    assert len(merged) < 20
+
+    assert not any(mtd.doesExist(name) for name in binned)
+
+
+def test_convert_runs_failure():
+    ub = UBModel()
+
+    calls, binned, merged = fake_conversion(ub, fail=2)
+
+    runs = list(range(1, 21))
+
+    with pytest.raises(RuntimeError):
+        list(
+            ub.convert_runs(
+                "TOPAZ", 1, runs, None, "", "", [1, 3], False, 5, 2
+            )
+        )
+
+    assert len(calls) < len(runs)
+    assert binned == ["md_{}".format(run) for run in range(1, len(binned) + 1)]
+    assert sum(merged, []) == binned
+
+    assert not any(mtd.doesExist("md_{}".format(run)) for run in runs)
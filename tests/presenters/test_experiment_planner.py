@@ -0,0 +1,74 @@
+from unittest import mock
+
+import numpy as np
+
+from NeuXtalViz.models.experiment_plan import (
+    ExperimentPlan,
+    load_plan_archive,
+    save_plan_archive,
+)
+from NeuXtalViz.models.peak_store import PeakStore, peak_dtype
+from NeuXtalViz.presenters.experiment_planner import Experiment
+
+
+def planner_model(store):
+    model = mock.MagicMock()
+    model.calculate_statistics.return_value = None
+    model.get_axes_polarities.return_value = ([[0, 1, 0]], [1])
+
+    model.remove_instrument.side_effect = store.clear
+    model.get_number_of_predictions.side_effect = lambda: len(store)
+
+    def load_experiment(filename):
+        store.clear()
+
+        plan, peaks, meta = load_plan_archive(filename)
+
+        def restore_predictions():
+            store.restore(peaks, len(plan))
+
+        model.restore_predictions.side_effect = restore_predictions
+
+        config = ("TOPAZ", "Ambient", [0.4, 3.5], 0.7, [], [], "", "")
+
+        return plan.table(), config, ("Cubic", "m-3m", "P")
+
+    model.load_experiment.side_effect = load_experiment
+
+    return model
+
+
+def test_load_plan_archive(tmp_path):
+    filename = str(tmp_path / "plan.npz")
+
+    plan = ExperimentPlan(
+        "Title",
+        ["omega"],
+        ["a", "b", "c"],
+        [[0], [30], [60]],
+        ["", "", ""],
+        ["PCharge"] * 3,
+        [1.0] * 3,
+        [True] * 3,
+    )
+
+    peaks = np.zeros(6, dtype=peak_dtype)
+    peaks["run"] = [0, 0, 1, 1, 2, 2]
+
+    save_plan_archive(filename, plan, peaks)
+
+    store = PeakStore()
+
+    model = planner_model(store)
+
+    view = mock.MagicMock()
+    view.load_experiment_file_dialog.return_value = filename
+    view.get_number_of_orientations.return_value = len(plan)
+
+    presenter = Experiment(view, model)
+
+    presenter.load_experiment()
+    presenter.add_settings_process(lambda *args: None)
+
+    assert len(store) == len(plan)
+    assert model.add_orientation.call_count == 0
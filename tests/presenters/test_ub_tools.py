@@ -0,0 +1,29 @@
+from unittest import mock
+
+from NeuXtalViz.presenters.ub_tools import UB
+
+
+def test_preview_Q():
+    view, model = mock.MagicMock(), mock.MagicMock()
+
+    model.get_Q_preview_bins.return_value = [64, 128]
+    model.get_Q_preview.side_effect = lambda bins: {"bins": bins}
+
+    presenter = UB(view, model)
+
+    queued = []
+
+    presenter.publish_Q_previews(queued.append, 1, 2)
+    presenter.publish_Q_previews(queued.append, 2, 2)
+
+    assert [Q_dict["bins"] for Q_dict in queued] == [64, 128]
+
+    for Q_dict in queued:
+        presenter.preview_Q(Q_dict)
+
+    view.add_Q_viz.assert_called_once_with(queued[-1])
+    view.update_Q_volume.assert_not_called()
+
+    presenter.publish_Q_previews(presenter.preview_Q, 2, 2)
+
+    assert view.update_Q_volume.call_count == 1